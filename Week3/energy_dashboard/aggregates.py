@@ -0,0 +1,163 @@
+"""
+Aggregate payloads shared by the Flask apps
+
+Each builder returns the JSON body of one dashboard endpoint. AggregateCache
+memoises them per dataset/model version so repeated requests, and the
+combined /api/dashboard payload, reuse one computation. Builders run outside
+the cache lock, so a slow aggregate never blocks the others; concurrent
+requests for the same one wait for a single in-flight build.
+"""
+
+import threading
+from concurrent.futures import Future
+
+from lazy_imports import lazy_import
+
+np = lazy_import('numpy')
+
+DASHBOARD_FIELDS = ('summary', 'hourly', 'daily', 'top_consumers', 'model_info')
+
+
+def _round(values, decimals):
+    return values.round(decimals) if decimals is not None else values
+
+
+def build_summary(df):
+    """Summary statistics of the data"""
+    return {
+        'total_records': int(len(df)),
+        'date_range': {
+            'start': df['date'].min().strftime('%Y-%m-%d'),
+            'end': df['date'].max().strftime('%Y-%m-%d')
+        },
+        'appliances': {
+            'mean': float(df['Appliances'].mean()),
+            'min': float(df['Appliances'].min()),
+            'max': float(df['Appliances'].max()),
+            'std': float(df['Appliances'].std())
+        },
+        'lights': {
+            'mean': float(df['lights'].mean()),
+            'min': float(df['lights'].min()),
+            'max': float(df['lights'].max())
+        },
+        'temperature': {
+            'mean': float(df['T1'].mean()),
+            'min': float(df['T1'].min()),
+            'max': float(df['T1'].max())
+        }
+    }
+
+
+def build_hourly(df, decimals=None):
+    """Hourly average consumption as columns"""
+    hourly = df.groupby('hour').agg({
+        'Appliances': 'mean',
+        'lights': 'mean'
+    })
+    return {
+        'hours': hourly.index.to_numpy(dtype=np.int64),
+        'appliances': _round(hourly['Appliances'], decimals).to_numpy(),
+        'lights': _round(hourly['lights'], decimals).to_numpy()
+    }
+
+
+def build_daily(df, decimals=None):
+    """Daily average consumption as columns"""
+    daily = df.groupby(df['date'].dt.normalize()).agg({
+        'Appliances': 'mean',
+        'lights': 'mean'
+    })
+    return {
+        'dates': np.datetime_as_string(daily.index.to_numpy(), unit='D'),
+        'appliances': _round(daily['Appliances'], decimals).to_numpy(),
+        'lights': _round(daily['lights'], decimals).to_numpy()
+    }
+
+
+def build_top_consumers(df, limit=6):
+    """Average and maximum temperature of the first rooms"""
+    temp_cols = [col for col in df.columns if col.startswith('T')]
+    return [
+        {
+            'name': col,
+            'avg_temp': float(df[col].mean()),
+            'max_temp': float(df[col].max())
+        }
+        for col in temp_cols[:limit]
+    ]
+
+
+def build_model_info(metrics, n_estimators=100):
+    """Model information body from training metrics"""
+    return {
+        'model_type': 'Random Forest Regressor',
+        'n_estimators': n_estimators,
+        'train_score': metrics['train_score'],
+        'test_score': metrics['test_score'],
+        'status': 'success'
+    }
+
+
+def parse_fields(raw):
+    """Validate a comma separated ?fields= value against DASHBOARD_FIELDS"""
+    if not raw:
+        return list(DASHBOARD_FIELDS)
+    fields = [field.strip() for field in raw.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in DASHBOARD_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown dashboard fields: {', '.join(unknown)}")
+    return fields
+
+
+class AggregateCache:
+    """Memoise aggregate payloads for one dataset/model version at a time"""
+
+    def __init__(self):
+        self._version = None
+        self._values = {}
+        self._inflight = {}  # (version, name) -> Future of the running build
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, version, name, build):
+        """Return the cached value for `name`, building it once per version"""
+        key = (version, name)
+        with self._lock:
+            if version != self._version:
+                self._version = version
+                self._values = {}
+            if name in self._values:
+                self.hits += 1
+                return self._values[name]
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                self.misses += 1
+                future = self._inflight[key] = Future()
+            else:
+                self.hits += 1
+        if not owner:
+            return future.result()
+
+        try:
+            value = build()
+        except Exception as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._inflight.pop(key, None)
+            # A build that finished after the version moved on is not cached
+            if version == self._version:
+                self._values[name] = value
+        future.set_result(value)
+        return value
+
+    def clear(self):
+        """Drop all cached values"""
+        with self._lock:
+            self._version = None
+            self._values = {}
@@ -0,0 +1,147 @@
+"""
+Streaming anomaly detection on energy readings
+
+Every reading is scored against two baselines kept per hour of the day:
+
+* the model residual (reading minus prediction), tracked as an
+  exponentially weighted mean and variance; a reading whose residual is
+  more than `z_threshold` deviations out is one the model did not expect.
+* a running upper quantile of the reading itself, updated by stochastic
+  approximation; a reading above it is unusually high for that hour.
+
+Both updates are O(1) per reading, and a reading is scored against the
+state before it is folded in. Predictions are passed in, so a backfill
+predicts the whole history in one vectorized call and only the cheap
+scoring loop runs per row. Alerts go to a bounded in-process queue for
+consumers and to a ring buffer served by /api/alerts.
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+
+
+class AnomalyDetector:
+    """Per-hour EWMA residual statistics and running quantiles over a stream of readings"""
+
+    def __init__(self, alpha=0.02, z_threshold=5.0, quantile=0.99, quantile_rate=1.0,
+                 warmup=30, max_alerts=500):
+        self.alpha = alpha
+        self.z_threshold = z_threshold
+        self.quantile = quantile
+        self.quantile_rate = quantile_rate
+        self.warmup = warmup
+        self.queue = queue.Queue(maxsize=max_alerts)
+        self._recent = deque(maxlen=max_alerts)
+        self._count = [0] * 24
+        self._mean = [0.0] * 24
+        self._var = [0.0] * 24
+        self._upper = [0.0] * 24
+        self._processed = 0
+        self._alerts_total = 0
+        self._rows_per_second = None
+        self._lock = threading.Lock()
+
+    def update(self, times, hours, values, predictions):
+        """Score and absorb a batch of readings in order; returns the new alerts.
+
+        `times` are display strings, `hours` the hour of day of each reading
+        and `predictions` the model's estimate for it.
+        """
+        started = time.perf_counter()
+        alerts = []
+        alpha, z_threshold, warmup = self.alpha, self.z_threshold, self.warmup
+        tau, rate = self.quantile, self.quantile_rate
+        with self._lock:
+            count, mean, var, upper = self._count, self._mean, self._var, self._upper
+            for when, hour, value, predicted in zip(times, hours, values, predictions):
+                hour, value, predicted = int(hour), float(value), float(predicted)
+                if value != value:
+                    # A missing reading would poison the running statistics
+                    continue
+                residual = value - predicted
+                n = count[hour]
+                std = var[hour] ** 0.5
+                if n >= warmup:
+                    z = (residual - mean[hour]) / std if std > 0 else 0.0
+                    if abs(z) > z_threshold:
+                        alerts.append(self._alert('residual', when, hour, value, predicted,
+                                                  f"{value:.0f} Wh at {when} is {z:+.1f} deviations "
+                                                  f"from the model's {predicted:.0f} Wh", z=z))
+                    elif value > upper[hour]:
+                        alerts.append(self._alert('baseline', when, hour, value, predicted,
+                                                  f"{value:.0f} Wh at {when} is above the "
+                                                  f"{hour:02d}:00 baseline of {upper[hour]:.0f} Wh",
+                                                  baseline=upper[hour]))
+
+                # Plain averages until warm, then exponential forgetting
+                n += 1
+                count[hour] = n
+                weight = max(alpha, 1.0 / n)
+                delta = residual - mean[hour]
+                mean[hour] += weight * delta
+                var[hour] = (1 - weight) * (var[hour] + weight * delta * delta)
+                if n == 1:
+                    upper[hour] = value
+                else:
+                    # Moves up by tau steps and down by (1 - tau) steps, settling at the tau quantile
+                    step = rate * (std or 1.0)
+                    upper[hour] += step * tau if value > upper[hour] else -step * (1 - tau)
+
+            self._processed += len(times)
+            self._alerts_total += len(alerts)
+            self._recent.extend(alerts)
+            elapsed = time.perf_counter() - started
+            if len(times) and elapsed > 0:
+                self._rows_per_second = len(times) / elapsed
+        for alert in alerts:
+            self._enqueue(alert)
+        return alerts
+
+    def _alert(self, kind, when, hour, value, predicted, message, **scores):
+        return dict({
+            'kind': kind,
+            'time': when,
+            'hour': hour,
+            'value': value,
+            'predicted': predicted,
+            'message': message
+        }, **scores)
+
+    def _enqueue(self, alert):
+        # Drop the oldest alert when no consumer keeps up
+        while True:
+            try:
+                self.queue.put_nowait(alert)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def recent(self, limit=50):
+        """Most recent alerts, newest first"""
+        with self._lock:
+            return list(self._recent)[::-1][:limit]
+
+    def baselines(self):
+        """Per-hour residual mean and deviation and the running upper quantile"""
+        with self._lock:
+            return [
+                {'hour': hour, 'readings': self._count[hour], 'residual_mean': self._mean[hour],
+                 'residual_std': self._var[hour] ** 0.5, 'upper_quantile': self._upper[hour]}
+                for hour in range(24)
+            ]
+
+    def stats(self):
+        """Readings processed, alerts raised and the throughput of the last batch"""
+        with self._lock:
+            return {
+                'processed': self._processed,
+                'alerts_total': self._alerts_total,
+                'quantile': self.quantile,
+                'z_threshold': self.z_threshold,
+                'last_batch_rows_per_second': self._rows_per_second
+            }
@@ -0,0 +1,174 @@
+"""
+ASGI variant of the Energy Dashboard API
+
+Serves the routes of app.py from the same state and handlers (energy_api),
+so the two cannot drift apart. Two routes are native here: predictions
+await the shared micro-batcher (503 + Retry-After when it is saturated,
+concurrent identical requests share one result), and /api/stream sends
+server-sent events from the event loop instead of holding a thread per
+client. Both are timed into the same /metrics histograms as Flask routes.
+Every other route, including the cached aggregates that need the Flask
+app's ETag/304, compression and Arrow negotiation, is delegated to the
+Flask app itself.
+Run with an ASGI server, for example:
+    uvicorn app_asgi:app --host 0.0.0.0 --port 5000 --workers 4
+"""
+
+import asyncio
+import json
+import logging
+import sys
+import time
+import warnings
+from contextlib import asynccontextmanager
+
+warnings.filterwarnings('ignore')
+
+try:
+    from starlette.applications import Starlette  # type: ignore
+    from starlette.middleware.wsgi import WSGIMiddleware  # type: ignore
+    from starlette.requests import Request  # type: ignore
+    from starlette.responses import Response, StreamingResponse  # type: ignore
+    from starlette.routing import Mount, Route  # type: ignore
+except Exception:
+    print("Error: 'starlette' is not installed or could not be imported.")
+    print("Install it with: python -m pip install starlette uvicorn")
+    sys.exit(1)
+
+import energy_api as shared
+from app import app as flask_app
+from concurrency import BoundedExecutor, Overloaded, RequestCoalescer
+from config import ASGI_CONFIG, BATCHING_CONFIG
+from readiness import NotReady
+from serialization import dumps
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+executor = BoundedExecutor(
+    max_workers=ASGI_CONFIG['max_workers'],
+    max_pending=ASGI_CONFIG['max_pending']
+)
+coalescer = RequestCoalescer()
+
+
+def json_response(payload, status_code=200, headers=None):
+    """JSON response encoded through serialization.dumps"""
+    return Response(dumps(payload), status_code=status_code,
+                    media_type='application/json', headers=headers)
+
+
+def error_response(message, status_code=500):
+    """JSON error body in the same shape as the Flask apps"""
+    return json_response({'error': message}, status_code=status_code)
+
+
+def overloaded_response():
+    """503 telling the client to back off while the worker pool is saturated"""
+    return json_response(
+        {'error': 'Server busy, retry shortly'},
+        status_code=503,
+        headers={'Retry-After': str(ASGI_CONFIG['retry_after'])}
+    )
+
+
+def not_ready_response(error):
+    """503 while warm-up is still running, as Readiness.unavailable in the Flask app"""
+    return json_response(
+        {'error': str(error), 'ready': False},
+        status_code=503,
+        headers={'Retry-After': str(shared.readiness.retry_after)}
+    )
+
+
+def timed(path, endpoint):
+    """Record a native route in the request metrics of the Flask app, under its route template"""
+    async def wrapper(request):
+        started = time.perf_counter()
+        response = await endpoint(request)
+        shared.metrics.request_latency.observe(time.perf_counter() - started, request.method, path)
+        shared.metrics.requests.inc(request.method, path, str(response.status_code))
+        return response
+    return wrapper
+
+
+async def api_predict(request: Request):
+    """API endpoint for energy prediction"""
+    try:
+        shared.readiness.check('model')
+    except NotReady as e:
+        return not_ready_response(e)
+    try:
+        data = await request.json()
+        if not isinstance(data, dict):
+            return error_response('Expected a JSON object of feature values', status_code=400)
+    except Exception:
+        return error_response('Invalid JSON body', status_code=400)
+
+    try:
+        batcher = shared.prediction_batcher
+        if batcher.pending >= ASGI_CONFIG['max_pending']:
+            raise Overloaded(f"{batcher.pending} rows already queued")
+        try:
+            row = shared.prediction_row(data)
+        except (ValueError, TypeError) as e:
+            return error_response(str(e), status_code=400)
+        key = ('predict', shared.model_version, json.dumps(data, sort_keys=True))
+        values = await asyncio.wait_for(
+            coalescer.run(key, lambda: asyncio.wrap_future(batcher.submit(row))),
+            BATCHING_CONFIG['timeout_s']
+        )
+        explain = request.query_params.get('explain') in ('1', 'true')
+        if explain:
+            result = await executor.run(shared.prediction_result, data, row, values, explain)
+        else:
+            result = shared.prediction_result(data, row, values)
+        return json_response(result)
+    except (Overloaded, asyncio.TimeoutError):
+        return overloaded_response()
+    except Exception as e:
+        logger.error(f"Error in api_predict: {str(e)}")
+        return error_response(str(e))
+
+
+async def api_stream(request):
+    """Server-sent events with new readings, changed aggregates and predictions"""
+    return StreamingResponse(
+        shared.update_hub.astream(),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """Warm up in the background as app.py does; /readyz reports progress"""
+    shared.start_warm_up()
+    yield
+    executor.shutdown()
+
+
+app = Starlette(
+    routes=[
+        Route('/api/predict', timed('/api/predict', api_predict), methods=['POST']),
+        Route('/api/stream', timed('/api/stream', api_stream)),
+        # Everything else is served by the Flask app's own handlers
+        Mount('/', app=WSGIMiddleware(flask_app))
+    ],
+    lifespan=lifespan
+)
+
+
+if __name__ == '__main__':
+    try:
+        import uvicorn  # type: ignore
+    except Exception:
+        print("Error: 'uvicorn' is not installed or could not be imported.")
+        print("Install it with: python -m pip install uvicorn")
+        sys.exit(1)
+
+    uvicorn.run('app_asgi:app', host=ASGI_CONFIG['host'], port=ASGI_CONFIG['port'],
+                workers=ASGI_CONFIG['workers'])
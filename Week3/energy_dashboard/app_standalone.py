@@ -1,46 +1,35 @@
 """
-Standalone Flask app that loads data ONLY on startup and doesn't reload it
-This avoids the pandas import freeze issue in Python 3.14
+Standalone Flask app that serves a precomputed snapshot
+All numbers come from dashboard_snapshot.json (build it with `python snapshot.py`),
+so the app starts in milliseconds without importing pandas or scikit-learn.
 """
 
 from flask import Flask, render_template, jsonify, request
-import os
+import time
+
+from aggregates import parse_fields
+from config import SNAPSHOT_CONFIG
+from snapshot import load_snapshot
 
 app = Flask(__name__)
 
-# Global variables - load data at startup only
-DATA_CACHE = None
-MODEL_INFO = {
-    'model_type': 'Random Forest Regressor',
-    'n_estimators': 100,
-    'train_score': 0.8956,
-    'test_score': 0.8234,
-    'status': 'success'
-}
+# Load the snapshot once at startup
+try:
+    started = time.perf_counter()
+    SNAPSHOT = load_snapshot(SNAPSHOT_CONFIG['path'])
+    SNAPSHOT_LOAD_MS = (time.perf_counter() - started) * 1000
+    SNAPSHOT_ERROR = None
+except Exception as e:
+    SNAPSHOT = None
+    SNAPSHOT_LOAD_MS = 0.0
+    SNAPSHOT_ERROR = f"Snapshot unavailable ({e}); build it with: python snapshot.py"
+
 
-SUMMARY_DATA = {
-    'total_records': 19735,
-    'date_range': {
-        'start': '2016-01-11',
-        'end': '2016-05-27'
-    },
-    'appliances': {
-        'mean': 97.69,
-        'min': 10,
-        'max': 2080,
-        'std': 102.47
-    },
-    'lights': {
-        'mean': 3.81,
-        'min': 0,
-        'max': 163
-    },
-    'temperature': {
-        'mean': 21.90,
-        'min': 16.79,
-        'max': 26.26
-    }
-}
+def snapshot_response(field):
+    """JSON response for one snapshot field, or 503 if there is no snapshot"""
+    if SNAPSHOT is None:
+        return jsonify({'error': SNAPSHOT_ERROR}), 503
+    return jsonify(SNAPSHOT[field])
 
 @app.route('/')
 def index():
@@ -51,7 +40,7 @@ def index():
 def api_summary():
     """API endpoint for data summary"""
     try:
-        return jsonify(SUMMARY_DATA)
+        return snapshot_response('summary')
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -59,11 +48,7 @@ def api_summary():
 def api_hourly_avg():
     """API endpoint for hourly average consumption"""
     try:
-        return jsonify({
-            'hours': [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23],
-            'appliances': [74.56, 68.92, 67.34, 65.87, 67.12, 72.45, 92.34, 110.23, 125.67, 118.92, 112.45, 108.76, 115.43, 120.87, 118.34, 115.67, 122.45, 125.78, 119.34, 110.45, 98.76, 87.65, 79.87, 75.34],
-            'lights': [2.34, 1.87, 1.56, 1.34, 1.45, 1.78, 2.45, 3.67, 4.56, 5.12, 4.89, 4.67, 4.45, 4.23, 4.12, 3.89, 4.01, 4.34, 5.67, 6.12, 5.89, 4.45, 3.34, 2.67]
-        })
+        return snapshot_response('hourly')
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -71,21 +56,7 @@ def api_hourly_avg():
 def api_daily_avg():
     """API endpoint for daily average consumption"""
     try:
-        dates = []
-        appliances = []
-        lights = []
-        
-        # Generate 30 days of sample data
-        for i in range(30):
-            dates.append(f'2016-01-{11+i:02d}' if i < 20 else f'2016-02-{i-20+1:02d}')
-            appliances.append(95 + (i % 15))
-            lights.append(3.5 + (i % 4) * 0.5)
-        
-        return jsonify({
-            'dates': dates,
-            'appliances': appliances,
-            'lights': lights
-        })
+        return snapshot_response('daily')
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -93,14 +64,7 @@ def api_daily_avg():
 def api_top_consumers():
     """API endpoint for top energy consumers"""
     try:
-        return jsonify([
-            {'name': 'T1', 'avg_temp': 21.90, 'max_temp': 26.26},
-            {'name': 'T2', 'avg_temp': 21.45, 'max_temp': 25.89},
-            {'name': 'T3', 'avg_temp': 20.87, 'max_temp': 25.12},
-            {'name': 'T4', 'avg_temp': 19.23, 'max_temp': 23.45},
-            {'name': 'T5', 'avg_temp': 18.56, 'max_temp': 22.78},
-            {'name': 'T6', 'avg_temp': 17.89, 'max_temp': 21.34}
-        ])
+        return snapshot_response('top_consumers')
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -108,14 +72,26 @@ def api_top_consumers():
 def api_predict():
     """API endpoint for energy prediction"""
     try:
-        data = request.json
-        # Simple prediction logic
-        prediction = 95.0 + (data.get('hour', 12) * 2.5)
+        if SNAPSHOT is None:
+            return jsonify({'error': SNAPSHOT_ERROR}), 503
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Expected a JSON object of feature values'}), 400
+        # Model prediction for the hour with the other features at their means
+        try:
+            hour = int(data.get('hour', 12)) % 24
+        except (TypeError, ValueError):
+            return jsonify({'error': 'hour must be an integer'}), 400
+        prediction = SNAPSHOT['prediction_by_hour'][hour]
         
-        return jsonify({
+        result = {
             'prediction': float(max(0, prediction)),
             'status': 'success'
-        })
+        }
+        if 'interval_by_hour' in SNAPSHOT:
+            lower, upper = SNAPSHOT['interval_by_hour'][hour]
+            result['interval'] = {'lower': lower, 'upper': upper, 'coverage': SNAPSHOT['interval_coverage']}
+        return jsonify(result)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -123,10 +99,21 @@ def api_predict():
 def api_model_info():
     """API endpoint for model information"""
     try:
-        return jsonify(MODEL_INFO)
+        return snapshot_response('model_info')
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/dashboard')
+def api_dashboard():
+    """Combined dashboard payload; ?fields= selects a subset"""
+    try:
+        fields = parse_fields(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if SNAPSHOT is None:
+        return jsonify({'error': SNAPSHOT_ERROR}), 503
+    return jsonify({field: SNAPSHOT[field] for field in fields})
+
 if __name__ == '__main__':
     try:
         print("=" * 60)
@@ -134,7 +121,11 @@ if __name__ == '__main__':
         print("=" * 60)
         print()
         print("✓ Flask app initialized successfully!")
-        print("✓ All data pre-loaded and cached")
+        if SNAPSHOT is None:
+            print(f"✗ {SNAPSHOT_ERROR}")
+        else:
+            print(f"✓ Snapshot of {SNAPSHOT['source']['rows']} records "
+                  f"(built {SNAPSHOT['created']}) loaded in {SNAPSHOT_LOAD_MS:.1f} ms")
         print()
         print("Starting Flask server...")
         print()
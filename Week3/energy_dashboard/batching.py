@@ -0,0 +1,194 @@
+"""
+Micro-batching for model predictions
+
+Concurrent /api/predict requests each carry one feature row. MicroBatcher
+queues those rows, waits at most `max_wait_ms` (or until `max_batch_size`
+rows are queued), then runs a single vectorized scaler.transform /
+model.predict for the whole batch and hands every caller its own result.
+predict_fn returns one value per row, or one row of values per row (for
+example a prediction with its interval), which callers receive as a tuple.
+Rows that are not finite numbers are rejected by submit before they are
+queued; if a batch still fails, its rows are retried one at a time so only
+the failing row's caller sees the error. Whatever goes wrong, every queued
+future is resolved or failed and the batching thread keeps running.
+"""
+
+import threading
+import time
+import queue
+from collections import deque
+from concurrent.futures import Future
+
+from lazy_imports import lazy_import
+
+np = lazy_import('numpy')
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+class MicroBatcher:
+    """Collect single-row prediction requests into vectorized batches"""
+
+    def __init__(self, predict_fn, max_batch_size=64, max_wait_ms=2.0, timeout_s=None,
+                 wait_samples=10000):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.timeout = timeout_s
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._rows = 0
+        self._size_counts = [0] * len(BATCH_SIZE_BUCKETS)
+        self._waits = deque(maxlen=wait_samples)
+        self._max_wait_seen = 0.0
+
+    @property
+    def pending(self):
+        """Rows waiting for the next batch"""
+        return self._queue.qsize()
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name='predict-batcher', daemon=True
+                    )
+                    self._thread.start()
+
+    @staticmethod
+    def validate(row):
+        """Row as a 1-D float64 array; raises ValueError unless every value is a finite number"""
+        try:
+            row = np.asarray(row, dtype=np.float64)
+        except (TypeError, ValueError):
+            raise ValueError("Feature values must be numbers")
+        if row.ndim != 1:
+            raise ValueError("Expected a single row of feature values")
+        if not np.isfinite(row).all():
+            raise ValueError("Feature values must be finite")
+        return row
+
+    def submit(self, row):
+        """Queue one feature row; returns a Future resolving to its prediction"""
+        row = self.validate(row)
+        self._ensure_started()
+        future = Future()
+        self._queue.put((row, future, time.perf_counter()))
+        return future
+
+    def predict(self, row, timeout=None):
+        """Blocking helper: submit a row and wait for its prediction.
+
+        Raises concurrent.futures.TimeoutError after `timeout` seconds
+        (`timeout_s` by default).
+        """
+        return self.submit(row).result(timeout=self.timeout if timeout is None else timeout)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0
+                                 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._execute(batch)
+            except Exception as e:
+                # Keep the batcher alive and leave no caller waiting
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _execute(self, batch):
+        started = time.perf_counter()
+        # Callers that gave up (e.g. a cancelled asyncio wrapper) are dropped from the batch
+        batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        rows, futures, enqueued = zip(*batch)
+        for future, result in zip(futures, self._predict(rows)):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+        self._record(len(batch), [started - t for t in enqueued])
+
+    def _predict(self, rows):
+        """One result or exception per row; a failing batch is retried row by row"""
+        try:
+            return self._results(self.predict_fn(np.vstack(rows)), len(rows))
+        except Exception as e:
+            if len(rows) == 1:
+                return [e]
+        # Isolate the failing rows so one bad request does not fail the batch
+        results = []
+        for row in rows:
+            try:
+                results.append(self._results(self.predict_fn(row[np.newaxis]), 1)[0])
+            except Exception as e:
+                results.append(e)
+        return results
+
+    @staticmethod
+    def _results(predictions, count):
+        if len(predictions) != count:
+            raise ValueError(f"predict_fn returned {len(predictions)} results for {count} rows")
+        return [float(prediction) if np.ndim(prediction) == 0
+                else tuple(float(value) for value in prediction)
+                for prediction in predictions]
+
+    def _record(self, size, waits):
+        bucket = next((i for i, edge in enumerate(BATCH_SIZE_BUCKETS) if size <= edge),
+                      len(BATCH_SIZE_BUCKETS) - 1)
+        with self._stats_lock:
+            self._batches += 1
+            self._rows += size
+            self._size_counts[bucket] += 1
+            self._waits.extend(waits)
+            self._max_wait_seen = max(self._max_wait_seen, max(waits))
+
+    def stats(self):
+        """Batch size distribution and queue wait times"""
+        with self._stats_lock:
+            waits = np.fromiter(self._waits, dtype=np.float64) * 1000.0
+            batches = self._batches
+            rows = self._rows
+            size_counts = list(self._size_counts)
+            max_wait = self._max_wait_seen * 1000.0
+
+        histogram = {}
+        lower = 1
+        for edge, count in zip(BATCH_SIZE_BUCKETS, size_counts):
+            histogram[str(edge) if lower == edge else f"{lower}-{edge}"] = count
+            lower = edge + 1
+
+        if len(waits):
+            p50, p95, p99 = np.percentile(waits, [50, 95, 99])
+            wait_stats = {
+                'mean': float(waits.mean()),
+                'p50': float(p50),
+                'p95': float(p95),
+                'p99': float(p99),
+                'max': max_wait
+            }
+        else:
+            wait_stats = {'mean': 0.0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000.0,
+            'batches': batches,
+            'rows': rows,
+            'mean_batch_size': rows / batches if batches else 0.0,
+            'batch_size_histogram': histogram,
+            'queue_wait_ms': wait_stats,
+            'queued': self.pending
+        }
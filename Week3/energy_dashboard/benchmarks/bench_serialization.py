@@ -0,0 +1,118 @@
+"""
+Benchmark payload build time and size for /api/hourly-avg and /api/daily-avg
+
+Compares the original list-building + json path against the NumPy/orjson
+path in serialization.py and, when pyarrow is installed, the Arrow IPC path.
+
+Run from the energy_dashboard directory:
+    python benchmarks/bench_serialization.py --app app_enhanced --repeat 200
+"""
+
+import argparse
+import importlib
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import jsonify  # noqa: E402
+
+import energy_api  # noqa: E402
+from serialization import ARROW_MIMETYPE, arrow_available  # noqa: E402
+
+
+def legacy_hourly(df):
+    """Original /api/hourly-avg body: Python lists through jsonify"""
+    hourly = df.groupby('hour').agg({
+        'Appliances': 'mean',
+        'lights': 'mean'
+    }).reset_index()
+    return jsonify({
+        'hours': hourly['hour'].astype(int).tolist(),
+        'appliances': hourly['Appliances'].round(2).tolist(),
+        'lights': hourly['lights'].round(2).tolist()
+    })
+
+
+def legacy_daily(df):
+    """Original /api/daily-avg body: frame copy, date objects and str() per day"""
+    df_copy = df.copy()
+    df_copy['day_date'] = df_copy['date'].dt.date
+    daily = df_copy.groupby('day_date').agg({
+        'Appliances': 'mean',
+        'lights': 'mean'
+    }).reset_index()
+    return jsonify({
+        'dates': [str(d) for d in daily['day_date'].tolist()],
+        'appliances': daily['Appliances'].round(2).tolist(),
+        'lights': daily['lights'].round(2).tolist()
+    })
+
+
+def endpoint_body(module, view, path, accept):
+    """Call an endpoint view directly and return the encoded body"""
+    energy_api.aggregate_cache.clear()  # measure the build, not a cache hit
+    with module.app.test_request_context(path, headers={'Accept': accept}):
+        return module.app.make_response(view()).get_data()
+
+
+def time_call(fn, repeat):
+    """Return (median seconds, body) over `repeat` calls"""
+    timings = []
+    body = b''
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--app', default='app_enhanced', choices=['app', 'app_enhanced'])
+    parser.add_argument('--repeat', type=int, default=100)
+    parser.add_argument('--output', help='Optional path for JSON results')
+    args = parser.parse_args()
+
+    # Both apps serve the views of energy_api; the app sets the rounding
+    module = importlib.import_module(args.app)
+    df = energy_api.load_and_prepare_data()
+
+    cases = {
+        '/api/hourly-avg': (legacy_hourly, energy_api.api_hourly_avg),
+        '/api/daily-avg': (legacy_daily, energy_api.api_daily_avg),
+    }
+
+    results = []
+    for path, (legacy, view) in cases.items():
+        variants = [
+            ('legacy-json', lambda: endpoint_body(module, lambda: legacy(df), path, 'application/json')),
+            ('numpy-json', lambda: endpoint_body(module, view, path, 'application/json')),
+        ]
+        if arrow_available():
+            variants.append(('arrow-ipc', lambda: endpoint_body(module, view, path, ARROW_MIMETYPE)))
+
+        for name, fn in variants:
+            fn()  # warm up
+            seconds, body = time_call(fn, args.repeat)
+            results.append({
+                'endpoint': path,
+                'variant': name,
+                'median_ms': round(seconds * 1000, 3),
+                'bytes': len(body)
+            })
+
+    print(f"{'endpoint':<18} {'variant':<12} {'median ms':>10} {'bytes':>8}")
+    for row in results:
+        print(f"{row['endpoint']:<18} {row['variant']:<12} {row['median_ms']:>10.3f} {row['bytes']:>8}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'app': args.app, 'rows': len(df), 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""
+Startup benchmark: time-to-first-response for / and /api/summary
+
+Launches a Flask app in a fresh interpreter and polls both endpoints from the
+moment the process is spawned. The 'lazy' mode starts the way the apps'
+__main__ blocks now do (server first, data load and training in the
+background); the 'eager' mode loads data and trains before serving, as the
+apps used to. Module import time is measured separately.
+
+Run from the energy_dashboard directory:
+    python benchmarks/bench_startup.py --app app_enhanced --runs 3
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from load_test import APP_DIR, free_port  # noqa: E402
+
+try:
+    import requests  # type: ignore
+except Exception:
+    print("Error: 'requests' is not installed or could not be imported.")
+    print("Install it with: python -m pip install requests")
+    sys.exit(1)
+
+SERVER = {
+    'lazy': """
+import importlib, sys
+module = importlib.import_module(sys.argv[1])
+import energy_api
+energy_api.start_warm_up()
+module.app.run(host='127.0.0.1', port=int(sys.argv[2]), debug=False, threaded=True)
+""",
+    'eager': """
+import importlib, sys
+module = importlib.import_module(sys.argv[1])
+import energy_api
+energy_api.load_and_prepare_data()
+energy_api.train_model()
+energy_api.precompute_aggregates()
+module.app.run(host='127.0.0.1', port=int(sys.argv[2]), debug=False, threaded=True)
+"""
+}
+
+IMPORT_TIMER = """
+import importlib, sys, time
+start = time.perf_counter()
+importlib.import_module(sys.argv[1])
+print(time.perf_counter() - start)
+"""
+
+PATHS = ('/', '/api/summary')
+
+
+def import_seconds(app_name):
+    """Seconds to import the app module in a fresh interpreter"""
+    output = subprocess.check_output([sys.executable, '-c', IMPORT_TIMER, app_name],
+                                     cwd=APP_DIR, stderr=subprocess.DEVNULL)
+    return float(output.decode().strip().splitlines()[-1])
+
+
+def first_response(base_url, path, started, timeout, results):
+    """Poll `path` until it answers 200; store seconds since `started`"""
+    deadline = started + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if requests.get(base_url + path, timeout=timeout).status_code == 200:
+                results[path] = time.perf_counter() - started
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.02)
+    results[path] = None
+
+
+def startup_run(app_name, mode, timeout):
+    """One cold start; returns {path: seconds to first 200}"""
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    log = tempfile.TemporaryFile()
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, '-c', SERVER[mode], app_name, str(port)],
+                               cwd=APP_DIR, stdout=log, stderr=subprocess.STDOUT)
+    results = {}
+    try:
+        threads = [threading.Thread(target=first_response, args=(base_url, path, started, timeout, results))
+                   for path in PATHS]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        log.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--app', default='app_enhanced', choices=['app', 'app_enhanced'])
+    parser.add_argument('--modes', default='lazy,eager', help='Comma separated: lazy, eager')
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--timeout', type=float, default=600.0)
+    parser.add_argument('--output', help='Optional path for JSON results')
+    args = parser.parse_args()
+
+    imports = [import_seconds(args.app) for _ in range(args.runs)]
+    print(f"import {args.app}: median {statistics.median(imports) * 1000:.0f} ms over {args.runs} runs")
+
+    results = {'app': args.app, 'import_ms': round(statistics.median(imports) * 1000, 1), 'modes': {}}
+    print(f"\n{'mode':<8} {'path':<14} {'median s':>10} {'min s':>8} {'max s':>8}")
+    for mode in [m.strip() for m in args.modes.split(',') if m.strip()]:
+        runs = [startup_run(args.app, mode, args.timeout) for _ in range(args.runs)]
+        results['modes'][mode] = {}
+        for path in PATHS:
+            times = [run[path] for run in runs if run.get(path) is not None]
+            if not times:
+                print(f"{mode:<8} {path:<14} {'timeout':>10}")
+                continue
+            results['modes'][mode][path] = {
+                'median_s': round(statistics.median(times), 3),
+                'min_s': round(min(times), 3),
+                'max_s': round(max(times), 3)
+            }
+            print(f"{mode:<8} {path:<14} {statistics.median(times):>10.2f} "
+                  f"{min(times):>8.2f} {max(times):>8.2f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+"""
+Micro-benchmarks for the data and model hot paths in utils.py
+
+Times each EnergyDataHandler / EnergyPredictionModel method and
+create_visualizations on datasets scaled 1x, 10x and 100x the UCI file, and
+records peak Python-heap memory (tracemalloc) for one call of each. Scaled
+datasets repeat the source rows over consecutive periods with slightly
+jittered sensor values, so date ranges and group counts grow with the data.
+
+Run from the energy_dashboard directory:
+    python benchmarks/bench_utils.py --scales 1,10 --output results/utils.json
+    python benchmarks/bench_utils.py --scales 100 --skip train,train_out_of_core,predict,get_feature_importance
+
+Training the 100-tree forest at 100x takes a long time; use --skip or
+--scales to keep a run short. --compare flags functions that got slower.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import DATA_PATH  # noqa: E402
+from synthetic_data import SyntheticEnergyGenerator  # noqa: E402
+from utils import EnergyDataHandler, EnergyPredictionModel, create_visualizations  # noqa: E402
+
+warnings.filterwarnings('ignore')
+
+DATE_FORMAT = '%d-%m-%Y %H:%M'
+
+FUNCTIONS = [
+    'load_data',
+    'get_summary_stats',
+    'get_hourly_pattern',
+    'get_daily_pattern',
+    'create_visualizations',
+    'prepare_features',
+    'train',
+    'train_out_of_core',
+    'predict',
+    'get_feature_importance',
+]
+
+# Functions too expensive to repeat; they run once, traced
+SINGLE_RUN = {'train', 'train_out_of_core'}
+
+SAMPLE_FEATURES = {'T1': 21.5, 'RH_1': 45.0, 'hour': 18}
+
+
+def scaled_dataset(source, factor, path, seed=42, synthetic=False):
+    """Write a dataset `factor` times the size of the source CSV to `path`"""
+    raw = pd.read_csv(source)
+    if synthetic:
+        return SyntheticEnergyGenerator(raw, seed=seed).write(path, periods=len(raw) * factor)
+
+    dates = pd.to_datetime(raw['date'], format=DATE_FORMAT)
+    period = dates.max() - dates.min() + pd.Timedelta(minutes=10)
+    sensors = [col for col in raw.columns if col not in ('date', 'Appliances', 'lights')]
+    noise_scale = raw[sensors].std().to_numpy() * 0.01
+    rng = np.random.default_rng(seed)
+
+    for k in range(factor):
+        chunk = raw.copy()
+        chunk['date'] = (dates + period * k).dt.strftime(DATE_FORMAT)
+        if k:
+            chunk[sensors] = raw[sensors].to_numpy() + rng.normal(0, noise_scale, (len(raw), len(sensors)))
+        chunk.to_csv(path, mode='w' if k == 0 else 'a', header=k == 0, index=False)
+    return len(raw) * factor
+
+
+def measure(fn, repeat):
+    """Return (best seconds, peak traced MiB, all timings) for `fn`.
+
+    The first call runs under tracemalloc to capture peak allocations; the
+    remaining calls are untraced so tracing overhead does not skew timings.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    traced_seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    timings = []
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    seconds = min(timings) if timings else traced_seconds
+    return seconds, peak / (1024 * 1024), timings or [traced_seconds]
+
+
+def bench_scale(csv_path, rows, factor, functions, repeat):
+    """Benchmark the selected functions on one dataset"""
+    results = []
+    handler = EnergyDataHandler(csv_path)
+    handler.load_data()
+    model = EnergyPredictionModel(handler.df)
+
+    cases = {
+        'load_data': lambda: EnergyDataHandler(csv_path).load_data(),
+        'get_summary_stats': handler.get_summary_stats,
+        'get_hourly_pattern': handler.get_hourly_pattern,
+        'get_daily_pattern': handler.get_daily_pattern,
+        'create_visualizations': lambda: create_visualizations(handler.df),
+        'prepare_features': model.prepare_features,
+        'train': model.train,
+        'train_out_of_core': lambda: EnergyPredictionModel(None).train_out_of_core(csv_path),
+        'predict': lambda: model.predict(SAMPLE_FEATURES),
+        'get_feature_importance': model.get_feature_importance,
+    }
+
+    for name in functions:
+        if name in ('predict', 'get_feature_importance') and model.model is None:
+            model.train()  # needed even when 'train' itself is skipped
+        seconds, peak_mib, timings = measure(cases[name], 1 if name in SINGLE_RUN else repeat)
+        row = {
+            'function': name,
+            'scale': factor,
+            'rows': rows,
+            'best_ms': round(seconds * 1000, 3),
+            'median_ms': round(statistics.median(timings) * 1000, 3),
+            'peak_mib': round(peak_mib, 2)
+        }
+        results.append(row)
+        print(f"{factor:>5}x {rows:>10} {name:<24} {row['best_ms']:>12.2f} "
+              f"{row['median_ms']:>12.2f} {row['peak_mib']:>10.2f}", flush=True)
+    return results
+
+
+def compare(results, baseline_path, threshold):
+    """Print timing deltas against a baseline; returns True on regression"""
+    with open(baseline_path) as f:
+        baseline = {(row['function'], row['scale']): row for row in json.load(f)['results']}
+
+    regressed = False
+    print(f"\nComparison with {baseline_path} (threshold {threshold:.0%})")
+    for row in results:
+        old = baseline.get((row['function'], row['scale']))
+        if not old or not old['best_ms']:
+            continue
+        time_delta = row['best_ms'] / old['best_ms'] - 1
+        mem_delta = row['peak_mib'] / old['peak_mib'] - 1 if old['peak_mib'] else 0.0
+        flag = time_delta > threshold
+        regressed = regressed or flag
+        print(f"  {row['function']:<24} {row['scale']:>4}x  time {time_delta:+7.1%}  "
+              f"memory {mem_delta:+7.1%}{'  REGRESSION' if flag else ''}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--data', default=DATA_PATH, help='Source CSV to scale')
+    parser.add_argument('--scales', default='1,10,100', help='Comma separated scale factors')
+    parser.add_argument('--skip', default='', help='Comma separated functions to leave out')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--workdir', help='Keep scaled CSVs here instead of a temp dir')
+    parser.add_argument('--synthetic', action='store_true',
+                        help='Scale with synthetic_data.py instead of repeating the source rows')
+    parser.add_argument('--output', help='Optional path for JSON results')
+    parser.add_argument('--compare', help='Earlier JSON results to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='Relative slowdown counted as a regression')
+    args = parser.parse_args()
+
+    scales = [int(s) for s in args.scales.split(',') if s.strip()]
+    skip = {name.strip() for name in args.skip.split(',') if name.strip()}
+    unknown = skip - set(FUNCTIONS)
+    if unknown:
+        parser.error(f"Unknown functions: {', '.join(sorted(unknown))}")
+    functions = [name for name in FUNCTIONS if name not in skip]
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='energy-bench-')
+    os.makedirs(workdir, exist_ok=True)
+
+    print(f"{'scale':>6} {'rows':>10} {'function':<24} {'best ms':>12} {'median ms':>12} {'peak MiB':>10}")
+    results = []
+    try:
+        for factor in scales:
+            csv_path = os.path.join(workdir, f"energydata_x{factor}.csv")
+            if factor == 1:
+                csv_path = args.data
+                rows = sum(1 for _ in open(csv_path)) - 1
+            elif os.path.exists(csv_path) and args.workdir:
+                rows = sum(1 for _ in open(csv_path)) - 1
+            else:
+                rows = scaled_dataset(args.data, factor, csv_path, synthetic=args.synthetic)
+            results.extend(bench_scale(csv_path, rows, factor, functions, args.repeat))
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump({'data': args.data, 'repeat': args.repeat, 'results': results}, f, indent=2)
+        print(f"\nSaved results to {args.output}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
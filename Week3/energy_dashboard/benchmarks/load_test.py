@@ -0,0 +1,275 @@
+"""
+Load test and latency benchmark for the Energy Dashboard API
+
+Starts app.py, app_enhanced.py or app_asgi.py against a local dataset, drives
+every endpoint at a fixed concurrency and reports throughput plus
+p50/p95/p99 latency. Results are saved as JSON; pass --compare with an
+earlier result file to flag regressions between versions.
+
+Run from the energy_dashboard directory:
+    python benchmarks/load_test.py --app app_enhanced --concurrency 16 --duration 10 \
+        --output results/app_enhanced.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+try:
+    import requests  # type: ignore
+except Exception:
+    print("Error: 'requests' is not installed or could not be imported.")
+    print("Install it with: python -m pip install requests")
+    sys.exit(1)
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENDPOINTS = [
+    ('GET', '/api/summary'),
+    ('GET', '/api/hourly-avg'),
+    ('GET', '/api/daily-avg'),
+    ('GET', '/api/top-consumers'),
+    ('POST', '/api/predict'),
+    ('GET', '/api/model-info'),
+]
+
+# Serve a Flask app the way its __main__ block does, minus the debug reloader
+FLASK_SERVER = """
+import importlib, sys
+module = importlib.import_module(sys.argv[1])
+import energy_api
+energy_api.load_and_prepare_data()
+energy_api.train_model()
+energy_api.precompute_aggregates()
+module.app.run(host='127.0.0.1', port=int(sys.argv[2]), debug=False, threaded=True)
+"""
+
+
+def free_port():
+    """Ask the OS for an unused local port"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(app_name, port, data_path):
+    """Launch the app under test in a subprocess"""
+    env = dict(os.environ)
+    if data_path:
+        env['ENERGY_DATA_PATH'] = os.path.abspath(data_path)
+    if app_name == 'app_asgi':
+        cmd = [sys.executable, '-m', 'uvicorn', 'app_asgi:app',
+               '--host', '127.0.0.1', '--port', str(port), '--log-level', 'warning']
+    else:
+        cmd = [sys.executable, '-c', FLASK_SERVER, app_name, str(port)]
+    # Server logs go to a temp file so a full pipe can never stall the app
+    log = tempfile.TemporaryFile()
+    process = subprocess.Popen(cmd, cwd=APP_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+    process.log = log
+    return process
+
+
+def wait_until_ready(base_url, process, timeout):
+    """Poll /api/summary until the server answers 200"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            process.log.seek(0)
+            output = process.log.read().decode(errors='replace')
+            raise RuntimeError(f"Server exited early:\n{output}")
+        try:
+            if requests.get(f"{base_url}/api/summary", timeout=2).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"Server not ready after {timeout}s")
+
+
+def predict_body(rng):
+    """Varied prediction inputs so identical-request coalescing cannot skew results"""
+    return {
+        'T1': round(rng.uniform(16, 26), 2),
+        'RH_1': round(rng.uniform(30, 60), 2),
+        'hour': rng.randint(0, 23)
+    }
+
+
+def run_endpoint(base_url, method, path, concurrency, duration, warmup):
+    """Closed-loop load on one endpoint; returns latency samples and error count"""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    stop_at = time.monotonic() + warmup + duration
+    measure_from = time.monotonic() + warmup
+
+    def worker(seed):
+        session = requests.Session()
+        rng = random.Random(seed)
+        local, local_errors = [], 0
+        url = base_url + path
+        while True:
+            now = time.monotonic()
+            if now >= stop_at:
+                break
+            start = time.perf_counter()
+            try:
+                if method == 'POST':
+                    resp = session.post(url, json=predict_body(rng), timeout=30)
+                else:
+                    resp = session.get(url, timeout=30)
+                ok = resp.status_code == 200
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - start
+            if now >= measure_from:
+                if ok:
+                    local.append(elapsed)
+                else:
+                    local_errors += 1
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors[0]
+
+
+def summarize(method, path, latencies, errors, duration):
+    """Throughput and latency percentiles for one endpoint"""
+    ms = np.asarray(latencies) * 1000.0
+    row = {
+        'endpoint': f"{method} {path}",
+        'requests': int(len(ms)),
+        'errors': int(errors),
+        'throughput_rps': round(len(ms) / duration, 2),
+    }
+    if len(ms):
+        p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+        row.update({
+            'mean_ms': round(float(ms.mean()), 3),
+            'p50_ms': round(float(p50), 3),
+            'p95_ms': round(float(p95), 3),
+            'p99_ms': round(float(p99), 3),
+            'max_ms': round(float(ms.max()), 3),
+        })
+    return row
+
+
+def git_revision():
+    """Short commit hash of the code under test, if available"""
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=APP_DIR,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+
+def compare(results, baseline_path, threshold):
+    """Print per-endpoint deltas against a baseline; returns True on regression"""
+    with open(baseline_path) as f:
+        baseline = {row['endpoint']: row for row in json.load(f)['results']}
+
+    regressed = False
+    print(f"\nComparison with {baseline_path} (threshold {threshold:.0%})")
+    for row in results:
+        old = baseline.get(row['endpoint'])
+        if not old or 'p95_ms' not in old or 'p95_ms' not in row:
+            continue
+        p95_delta = row['p95_ms'] / old['p95_ms'] - 1 if old['p95_ms'] else 0.0
+        rps_delta = row['throughput_rps'] / old['throughput_rps'] - 1 if old['throughput_rps'] else 0.0
+        flag = p95_delta > threshold or rps_delta < -threshold
+        regressed = regressed or flag
+        print(f"  {row['endpoint']:<26} p95 {p95_delta:+7.1%}  rps {rps_delta:+7.1%}"
+              f"{'  REGRESSION' if flag else ''}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the Energy Dashboard API')
+    parser.add_argument('--app', default='app_enhanced', choices=['app', 'app_enhanced', 'app_asgi'])
+    parser.add_argument('--data', help='CSV to serve (defaults to config.DATA_PATH)')
+    parser.add_argument('--base-url', help='Benchmark an already running server instead')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per endpoint')
+    parser.add_argument('--warmup', type=float, default=1.0, help='Unmeasured seconds per endpoint')
+    parser.add_argument('--endpoints', help='Comma separated paths to limit the run')
+    parser.add_argument('--startup-timeout', type=float, default=600.0)
+    parser.add_argument('--output', help='Path for JSON results')
+    parser.add_argument('--compare', help='Earlier JSON results to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='Relative p95/throughput change counted as a regression')
+    args = parser.parse_args()
+
+    endpoints = ENDPOINTS
+    if args.endpoints:
+        wanted = {path.strip() for path in args.endpoints.split(',')}
+        endpoints = [ep for ep in ENDPOINTS if ep[1] in wanted]
+
+    process = None
+    base_url = args.base_url
+    try:
+        if base_url is None:
+            port = free_port()
+            base_url = f"http://127.0.0.1:{port}"
+            started = time.monotonic()
+            process = start_server(args.app, port, args.data)
+            wait_until_ready(base_url, process, args.startup_timeout)
+            print(f"{args.app} ready in {time.monotonic() - started:.1f}s at {base_url}")
+
+        results = []
+        for method, path in endpoints:
+            latencies, errors = run_endpoint(base_url, method, path, args.concurrency,
+                                             args.duration, args.warmup)
+            results.append(summarize(method, path, latencies, errors, args.duration))
+    finally:
+        if process is not None:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    print(f"\n{'endpoint':<26} {'req':>7} {'err':>5} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for row in results:
+        print(f"{row['endpoint']:<26} {row['requests']:>7} {row['errors']:>5} "
+              f"{row['throughput_rps']:>9.1f} {row.get('p50_ms', 0):>9.2f} "
+              f"{row.get('p95_ms', 0):>9.2f} {row.get('p99_ms', 0):>9.2f}")
+
+    report = {
+        'app': args.app if args.base_url is None else args.base_url,
+        'revision': git_revision(),
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'concurrency': args.concurrency,
+        'duration': args.duration,
+        'data': args.data,
+        'results': results
+    }
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved results to {args.output}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
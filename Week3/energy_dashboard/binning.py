@@ -0,0 +1,54 @@
+"""
+Fixed-size summaries of large columns for plotting
+
+Histograms, 2-D density grids and least-squares fits are computed once on
+the full data, so a figure carries at most `bins` (or `bins` x `bins`)
+values however many rows there are, instead of every reading.
+"""
+
+from lazy_imports import lazy_import
+
+np = lazy_import('numpy')
+
+
+def _finite(*columns):
+    values = np.column_stack([np.asarray(col, dtype=np.float64) for col in columns])
+    return values[np.isfinite(values).all(axis=1)]
+
+
+def histogram(values, bins=50):
+    """Counts over `bins` equal-width bins spanning the data"""
+    values = _finite(values)[:, 0]
+    counts, edges = np.histogram(values, bins=bins)
+    return {
+        'edges': edges,
+        'centers': (edges[:-1] + edges[1:]) / 2,
+        'widths': np.diff(edges),
+        'counts': counts
+    }
+
+
+def density_grid(x, y, bins=40):
+    """Row counts on a `bins` x `bins` grid; counts[i, j] is y bin i, x bin j"""
+    values = _finite(x, y)
+    counts, x_edges, y_edges = np.histogram2d(values[:, 0], values[:, 1], bins=bins)
+    return {
+        'x_centers': (x_edges[:-1] + x_edges[1:]) / 2,
+        'y_centers': (y_edges[:-1] + y_edges[1:]) / 2,
+        # histogram2d indexes by x first; heatmaps expect rows of y
+        'counts': counts.T
+    }
+
+
+def linear_fit(x, y):
+    """Ordinary least squares line y = slope * x + intercept with its R²"""
+    values = _finite(x, y)
+    slope, intercept = np.polyfit(values[:, 0], values[:, 1], 1)
+    residuals = values[:, 1] - (slope * values[:, 0] + intercept)
+    total = ((values[:, 1] - values[:, 1].mean()) ** 2).sum()
+    return {
+        'slope': float(slope),
+        'intercept': float(intercept),
+        'r2': float(1 - (residuals ** 2).sum() / total) if total else 0.0,
+        'x_range': [float(values[:, 0].min()), float(values[:, 0].max())]
+    }
@@ -0,0 +1,75 @@
+"""
+Async helpers for the ASGI app
+
+BoundedExecutor runs blocking, CPU-bound work (pandas aggregations, model
+calls) on a fixed thread pool and rejects new work once too much is queued,
+so overload turns into fast 503s instead of unbounded latency.
+RequestCoalescer lets concurrent identical requests share one computation.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Overloaded(Exception):
+    """Raised when the executor already has `max_pending` jobs queued"""
+
+
+class BoundedExecutor:
+    """Thread pool with a cap on queued plus running jobs"""
+
+    def __init__(self, max_workers=4, max_pending=64, thread_name_prefix='asgi-worker'):
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix=thread_name_prefix
+        )
+        self._pending = 0
+
+    @property
+    def pending(self):
+        """Jobs queued or running"""
+        return self._pending
+
+    async def run(self, fn, *args, **kwargs):
+        """Run `fn` on the pool, raising Overloaded if the queue is full.
+
+        Only called from the event loop thread, so the counter needs no lock.
+        """
+        if self._pending >= self.max_pending:
+            raise Overloaded(f"{self._pending} jobs already pending")
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, functools.partial(fn, *args, **kwargs)
+            )
+        finally:
+            self._pending -= 1
+
+    def shutdown(self):
+        """Stop accepting work without waiting for running jobs"""
+        self._executor.shutdown(wait=False)
+
+
+class RequestCoalescer:
+    """Share one in-flight computation between callers with the same key"""
+
+    def __init__(self):
+        self._inflight = {}
+
+    @property
+    def inflight(self):
+        """Number of distinct computations currently running"""
+        return len(self._inflight)
+
+    async def run(self, key, factory):
+        """Await the computation for `key`, starting it with `factory()` if needed"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shield so one disconnected caller does not cancel the work for the rest
+        return await asyncio.shield(task)
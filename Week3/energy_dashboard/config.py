@@ -10,7 +10,12 @@ FLASK_DEBUG = True
 SECRET_KEY = 'your-secret-key-here'
 
 # Data Configuration
-DATA_PATH = '../energydata_complete.csv'
+DATA_PATH = os.environ.get('ENERGY_DATA_PATH', '../energydata_complete.csv')
+
+# Readiness Configuration
+READINESS_CONFIG = {
+    'retry_after': 5   # seconds sent in Retry-After while still warming up
+}
 
 # Model Configuration
 MODEL_CONFIG = {
@@ -25,6 +30,107 @@ MODEL_CONFIG = {
 API_PORT = 5000
 API_HOST = '0.0.0.0'
 
+# ASGI Configuration (app_asgi.py)
+ASGI_CONFIG = {
+    'host': '0.0.0.0',
+    'port': 5000,
+    'workers': 1,         # uvicorn worker processes
+    'max_workers': 4,     # threads for explanations per process
+    'max_pending': 64,    # queued + running jobs before answering 503
+    'retry_after': 1      # seconds sent in Retry-After when overloaded
+}
+
+# Prediction Micro-batching Configuration
+BATCHING_CONFIG = {
+    'max_batch_size': 64,   # rows per vectorized scaler.transform/model.predict call
+    'max_wait_ms': 2.0,     # how long the first queued row waits for company
+    'timeout_s': 10.0       # longest a request waits for its prediction before 503
+}
+
+# Live Readings Configuration (POST /api/readings)
+READINGS_CONFIG = {
+    'consolidate_rows': 1000,   # buffered readings appended to the dataset in one concat
+    'publish_interval_s': 1.0   # aggregates pushed to stream clients at most this often
+}
+
+# HTTP Cache Configuration
+HTTP_CACHE_CONFIG = {
+    'max_age': 0,  # 0 sends "no-cache" so clients revalidate with If-None-Match
+    'compress_min_bytes': 1024,
+    'compress_level': 6
+}
+
+# Profiling Configuration (debug only; nothing is registered when disabled)
+PROFILING_CONFIG = {
+    'enabled': os.environ.get('ENERGY_PROFILING') == '1',
+    'header': 'X-Profile',        # requests sending this header are profiled
+    'sample_interval_ms': 2.0,    # stack sampling period
+    'memory_frames': 16,          # tracemalloc traceback depth
+    'max_profiles': 20,           # profiles kept for /debug/profiles
+    'profile_training': False,    # also capture every train_model() call
+    'request_threads': ['predict-batcher']  # threads sampled with the request thread; None samples every thread
+}
+
+# Out-of-core Training Configuration (out_of_core.py)
+OUT_OF_CORE_CONFIG = {
+    'chunk_rows': 100000,   # CSV rows parsed at a time
+    'sample_rows': 200000,  # training reservoir per round; each tree sees at most this many rows
+    'eval_rows': 50000,     # held-out reservoir used for the test metrics
+    'rounds': 1,            # passes that each draw a fresh reservoir and add n_estimators / rounds trees
+    'track_memory': True    # report tracemalloc high-water marks per pass
+}
+
+# Permutation Importance Configuration (importance.py)
+IMPORTANCE_CONFIG = {
+    'n_repeats': 5,        # shuffles per feature on the held-out split
+    'random_state': 42,
+    'n_jobs': None         # worker processes; None uses up to 4 cores, 1 runs in-process
+}
+
+# Prediction Interval Configuration (intervals.py)
+INTERVAL_CONFIG = {
+    'coverage': 0.8,       # central share of the leaf target distribution, e.g. 0.8 = 10th-90th percentile
+    'max_leaf_values': 32  # targets indexed per leaf; larger leaves keep evenly spaced order statistics
+}
+
+# Scenario Sweep Configuration (scenarios.py)
+SCENARIO_CONFIG = {
+    'max_features': 3,      # features varied at once
+    'max_points': 100000,   # largest grid evaluated
+    'default_steps': 10,    # values per axis for 'min:max' ranges
+    'chunk_rows': 10000,    # grid rows built and predicted at a time
+    'cache_size': 64        # grids kept per process (LRU, keyed by model version)
+}
+
+# Anomaly Detection Configuration (anomalies.py)
+ANOMALY_CONFIG = {
+    'alpha': 0.02,          # EWMA weight of each reading in its hour's residual statistics
+    'z_threshold': 5.0,     # residual deviations from the hour's mean that raise an alert
+    'quantile': 0.99,       # running per-hour quantile of readings that raises an alert
+    'quantile_rate': 1.0,   # quantile step size in residual deviations
+    'warmup': 30,           # readings per hour before that hour raises alerts
+    'max_alerts': 500       # alerts kept for /api/alerts and the in-process queue
+}
+
+# Lite Dashboard Configuration (dashboard_lite.py)
+LITE_DASHBOARD_CONFIG = {
+    'cache_ttl': 30,        # seconds analytics are served without refetching
+    'stale_ttl': 300,       # extra seconds stale analytics are served while refreshing
+    'failure_ttl': 10,      # seconds a failed fetch is remembered before the API is retried
+    'deadline': 3.0,        # overall budget in seconds for assembling analytics
+    'request_timeout': 3,   # per-request timeout in seconds
+    'max_workers': 5,       # concurrent upstream requests / pooled connections
+    'alerts': 5             # most recent anomaly alerts shown
+}
+
+# Snapshot Configuration (snapshot.py; read by app_standalone.py and dashboard_lite.py)
+SNAPSHOT_CONFIG = {
+    'path': os.environ.get('ENERGY_SNAPSHOT_PATH',
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dashboard_snapshot.json')),
+    'decimals': 2,          # rounding of the hourly and daily series
+    'cost_per_kwh': 0.12    # tariff used for the lite dashboard cost estimate
+}
+
 # Streamlit Configuration
 STREAMLIT_PORT = 8501
 
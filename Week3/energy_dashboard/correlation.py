@@ -0,0 +1,98 @@
+"""
+Incremental correlation matrix from sufficient statistics
+
+CorrelationStore keeps the row count, column sums and the cross-product
+matrix of every numeric column. Any subset's Pearson correlation is then an
+O(k^2) lookup instead of a pass over the data, and appending rows only adds
+their sums. Values are shifted by the first batch's column means before
+accumulating, which keeps the sum-of-squares arithmetic accurate for
+columns with a large mean such as pressure.
+"""
+
+import threading
+
+from lazy_imports import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+
+class CorrelationStore:
+    """Column sums and cross products of the numeric columns of a frame"""
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self._index = {col: i for i, col in enumerate(self.columns)}
+        k = len(self.columns)
+        self.n = 0
+        self.skipped = 0
+        self._shift = None
+        self._sums = np.zeros(k)
+        self._cross = np.zeros((k, k))
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_frame(cls, df):
+        """Store over every numeric column of `df`, filled with its rows"""
+        store = cls(df.select_dtypes(include=[np.number]).columns)
+        store.update(df)
+        return store
+
+    def update(self, df):
+        """Add rows; rows with a missing value in any tracked column are skipped"""
+        values = df[self.columns].to_numpy(dtype=np.float64)
+        complete = ~np.isnan(values).any(axis=1)
+        values = values[complete]
+        with self._lock:
+            self.skipped += int((~complete).sum())
+            if not len(values):
+                return
+            if self._shift is None:
+                self._shift = values.mean(axis=0)
+            centered = values - self._shift
+            self._sums += centered.sum(axis=0)
+            self._cross += centered.T @ centered
+            self.n += len(values)
+
+    def check_columns(self, columns):
+        """Raise ValueError for columns the store does not track"""
+        unknown = [col for col in columns if col not in self._index]
+        if unknown:
+            raise ValueError(f"Unknown or non-numeric columns: {', '.join(unknown)}")
+
+    def corr(self, columns=None):
+        """Pearson correlation matrix (numpy array) of `columns`, in that order"""
+        columns = self.columns if columns is None else list(columns)
+        self.check_columns(columns)
+        idx = [self._index[col] for col in columns]
+        with self._lock:
+            if self.n < 2:
+                raise ValueError("At least two rows are needed for a correlation")
+            sums = self._sums[idx]
+            cross = self._cross[np.ix_(idx, idx)]
+            n = self.n
+        cov = cross - np.outer(sums, sums) / n
+        std = np.sqrt(np.diag(cov))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Constant columns have no defined correlation, as in DataFrame.corr
+            matrix = cov / np.outer(std, std)
+        matrix = np.clip(matrix, -1.0, 1.0)
+        np.fill_diagonal(matrix, np.where(std > 0, 1.0, np.nan))
+        return matrix
+
+    def frame(self, columns=None):
+        """Correlation matrix as a labelled DataFrame"""
+        columns = self.columns if columns is None else list(columns)
+        return pd.DataFrame(self.corr(columns), index=columns, columns=columns)
+
+    def payload(self, columns=None, decimals=4):
+        """JSON body for /api/correlation"""
+        columns = self.columns if columns is None else list(columns)
+        matrix = self.corr(columns).round(decimals)
+        return {
+            'columns': columns,
+            # NaN is not valid JSON
+            'matrix': [[None if np.isnan(v) else float(v) for v in row] for row in matrix],
+            'rows': self.n,
+            'skipped_rows': self.skipped
+        }
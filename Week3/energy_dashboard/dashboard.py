@@ -33,13 +33,17 @@ except Exception:
     print("Error: 'plotly' is not installed or could not be imported.")
     print("Install it with: python -m pip install plotly")
     sys.exit(1)
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
+import math
 import warnings
 warnings.filterwarnings('ignore')
 
+from config import DATA_PATH, IMPORTANCE_CONFIG, SCENARIO_CONFIG
+from binning import density_grid, histogram, linear_fit
+from correlation import CorrelationStore
+from importance import permutation_importance
+from scenarios import INTEGER_FEATURES, axis_values, evaluate_grid
+from http_cache import file_fingerprint
+
 # Page configuration
 st.set_page_config(
     page_title="Energy Dashboard",
@@ -63,10 +67,13 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Load data
-@st.cache_data
-def load_data():
-    df = pd.read_csv('../energydata_complete.csv')
+# Data, model and per-view aggregates are cached once per dataset version
+# (file size + mtime), so widget interactions only re-render charts.
+
+@st.cache_resource
+def load_data(version):
+    """Shared, read-only DataFrame; views must never add or modify columns"""
+    df = pd.read_csv(DATA_PATH)
     df['date'] = pd.to_datetime(df['date'], format='%d-%m-%Y %H:%M')
     df = df.sort_values('date').reset_index(drop=True)
     
@@ -78,12 +85,20 @@ def load_data():
     
     return df
 
-@st.cache_data
-def prepare_model():
-    df = load_data()
+@st.cache_resource
+def prepare_model(version):
+    """Fitted model and scaler, shared across reruns and sessions without pickling"""
+    # Imported here so views that never touch the model skip scikit-learn
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.model_selection import train_test_split
+    from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
+    
+    df = load_data(version)
     
     feature_cols = [col for col in df.columns if col not in ['date', 'Appliances']]
-    X = df[feature_cols].fillna(df[feature_cols].mean())
+    feature_means = df[feature_cols].mean()
+    X = df[feature_cols].fillna(feature_means)
     y = df['Appliances']
     
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
@@ -100,14 +115,141 @@ def prepare_model():
     metrics = {
         'mae': mean_absolute_error(y_test, predictions),
         'rmse': np.sqrt(mean_squared_error(y_test, predictions)),
-        'r2': r2_score(y_test, predictions)
+        'r2': r2_score(y_test, predictions),
+        'mean_consumption': y.mean()
     }
     
-    return df, model, scaler, feature_cols, metrics
+    return {
+        'model': model,
+        'scaler': scaler,
+        'feature_cols': feature_cols,
+        'feature_means': feature_means,
+        'metrics': metrics,
+        'X_test': X_test_scaled,
+        'y_test': y_test.to_numpy()
+    }
+
+@st.cache_resource
+def feature_importance(version):
+    """Top 10 held-out permutation importances, computed once per dataset version"""
+    trained = prepare_model(version)
+    result = permutation_importance(trained['model'], trained['X_test'], trained['y_test'],
+                                    trained['feature_cols'], **IMPORTANCE_CONFIG)
+    return pd.DataFrame(result['features']).rename(columns={
+        'feature': 'Feature', 'importance_mean': 'Importance', 'importance_std': 'Std'
+    }).head(10)
+
+@st.cache_data
+def scenario_grid(version, spec):
+    """Predictions over a what-if grid; `spec` is ((feature, min, max, steps), ...)"""
+    trained = prepare_model(version)
+    model, scaler = trained['model'], trained['scaler']
+    axes = {name: axis_values(low, high, steps, name in INTEGER_FEATURES) for name, low, high, steps in spec}
+    grid = evaluate_grid(lambda X: np.maximum(model.predict(scaler.transform(X)), 0),
+                         trained['feature_means'].to_numpy(), trained['feature_cols'], axes,
+                         SCENARIO_CONFIG['chunk_rows'])
+    return axes, grid
+
+def box_stats(series):
+    """Precomputed Tukey box plot statistics, so the browser is not sent every reading"""
+    q1, median, q3 = series.quantile([0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    inside = series[(series >= q1 - 1.5 * iqr) & (series <= q3 + 1.5 * iqr)]
+    return {
+        'q1': q1, 'median': median, 'q3': q3,
+        'lowerfence': inside.min(), 'upperfence': inside.max(),
+        'mean': series.mean(), 'sd': series.std()
+    }
+
+@st.cache_data
+def overview_data(version):
+    df = load_data(version)
+    stats = df[['Appliances', 'lights', 'T1']].agg(['mean', 'std', 'min', 'max'])
+    
+    hourly = df.groupby('hour').agg({
+        'Appliances': 'mean',
+        'lights': 'mean'
+    }).reset_index()
+    
+    daily = df.groupby(df['date'].dt.date.rename('day_date')).agg({
+        'Appliances': 'mean',
+        'lights': 'mean'
+    }).reset_index().tail(30)
+    
+    temp_cols = [col for col in df.columns if col.startswith('T')][:8]
+    room_temps = pd.DataFrame({
+        'Room': temp_cols,
+        'Avg Temp': [df[col].mean() for col in temp_cols],
+        'Max Temp': [df[col].max() for col in temp_cols],
+        'Min Temp': [df[col].min() for col in temp_cols]
+    })
+    
+    return {
+        'stats': stats,
+        'records': len(df),
+        'hourly': hourly,
+        'daily': daily,
+        'room_boxes': {col: box_stats(df[col]) for col in temp_cols},
+        'room_temps': room_temps
+    }
+
+@st.cache_resource
+def correlation_store(version):
+    """Sufficient statistics of every numeric column; any subset is an O(k²) lookup"""
+    return CorrelationStore.from_frame(load_data(version))
+
+@st.cache_data
+def analytics_data(version):
+    df = load_data(version)
+    return {
+        'weekday': df.groupby('weekday')['Appliances'].mean(),
+        'monthly': df.groupby('month')['Appliances'].mean()
+    }
+
+# (x, y) column pairs shown in the Deep Dive relationships section
+DEEP_DIVE_PAIRS = [('T1', 'Appliances'), ('RH_1', 'lights')]
+
+@st.cache_data
+def deep_dive_data(version):
+    """Histograms, density grids and fits whose size does not grow with the data"""
+    df = load_data(version)
+    columns = ['Appliances', 'lights', 'T1', 'RH_1', 'hour']
+    return {
+        'histograms': {col: histogram(df[col], bins=50) for col in ['Appliances', 'lights']},
+        'pairs': {
+            (x, y): {'grid': density_grid(df[x], df[y], bins=40), 'fit': linear_fit(df[x], df[y])}
+            for x, y in DEEP_DIVE_PAIRS
+        },
+        # Fixed sample so the overlay points do not change on every rerun
+        'sample': df[columns].sample(min(1000, len(df)), random_state=42),
+        'stats': df[['Appliances', 'lights', 'T1', 'RH_1', 'T_out', 'Press_mm_hg']].describe().round(3)
+    }
+
+def histogram_figure(hist, title, color):
+    fig = go.Figure(go.Bar(x=hist['centers'], y=hist['counts'], width=hist['widths'],
+                           marker=dict(color=color)))
+    fig.update_layout(title=title, yaxis_title="Count", bargap=0)
+    return fig
 
-# Load data and model
-df = load_data()
-model, scaler, feature_cols, metrics = prepare_model()[1:]
+def relationship_figure(data, pair, title, colorscale):
+    """Density heatmap over all rows with the sampled points and the OLS line on top"""
+    x, y = pair
+    grid, fit, sample = data['pairs'][pair]['grid'], data['pairs'][pair]['fit'], data['sample']
+    fig = go.Figure(go.Heatmap(x=grid['x_centers'], y=grid['y_centers'], z=grid['counts'],
+                               colorscale='Greys', showscale=False, name='Rows'))
+    fig.add_trace(go.Scatter(x=sample[x], y=sample[y], mode='markers', name='Sample',
+                             marker=dict(size=4, color=sample['hour'], colorscale=colorscale,
+                                         colorbar=dict(title='hour'))))
+    fig.add_trace(go.Scatter(x=fit['x_range'],
+                             y=[fit['slope'] * v + fit['intercept'] for v in fit['x_range']],
+                             mode='lines', name=f"OLS (R²={fit['r2']:.3f})",
+                             line=dict(color='#ef4444', width=3)))
+    fig.update_layout(title=title, xaxis_title=x, yaxis_title=y)
+    return fig
+
+# Load data; the model is trained only when the predictions view needs it
+data_version = file_fingerprint(DATA_PATH)
+df = load_data(data_version)
 
 # Header
 st.markdown("# ⚡ Energy Consumption Dashboard")
@@ -117,27 +259,30 @@ st.markdown("Advanced analytics and predictions for building energy usage")
 with st.sidebar:
     st.header("🔧 Controls")
     view = st.radio("Select View", 
-        ["📊 Overview", "📈 Analytics", "🤖 AI Predictions", "🔍 Deep Dive"])
+        ["📊 Overview", "📈 Analytics", "🤖 AI Predictions", "🧪 Scenarios", "🔍 Deep Dive"])
 
 if view == "📊 Overview":
+    overview = overview_data(data_version)
+    stats = overview['stats']
+    
     # Key Metrics
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Avg Appliances", f"{df['Appliances'].mean():.2f} Wh", 
-                 f"{(df['Appliances'].std()):.2f} σ")
+        st.metric("Avg Appliances", f"{stats.loc['mean', 'Appliances']:.2f} Wh", 
+                 f"{stats.loc['std', 'Appliances']:.2f} σ")
     
     with col2:
-        st.metric("Avg Lights", f"{df['lights'].mean():.2f} Wh",
-                 f"{(df['lights'].std()):.2f} σ")
+        st.metric("Avg Lights", f"{stats.loc['mean', 'lights']:.2f} Wh",
+                 f"{stats.loc['std', 'lights']:.2f} σ")
     
     with col3:
-        st.metric("Avg Temperature", f"{df['T1'].mean():.2f}°C",
-                 f"Range: {df['T1'].min():.1f}°C - {df['T1'].max():.1f}°C")
+        st.metric("Avg Temperature", f"{stats.loc['mean', 'T1']:.2f}°C",
+                 f"Range: {stats.loc['min', 'T1']:.1f}°C - {stats.loc['max', 'T1']:.1f}°C")
     
     with col4:
-        st.metric("Total Records", f"{len(df):,}",
-                 f"{(len(df)/60):.1f} days")
+        st.metric("Total Records", f"{overview['records']:,}",
+                 f"{(overview['records']/60):.1f} days")
     
     st.divider()
     
@@ -146,10 +291,7 @@ if view == "📊 Overview":
     
     with col1:
         # Hourly pattern
-        hourly = df.groupby('hour').agg({
-            'Appliances': 'mean',
-            'lights': 'mean'
-        }).reset_index()
+        hourly = overview['hourly']
         
         fig = go.Figure()
         fig.add_trace(go.Scatter(
@@ -179,11 +321,7 @@ if view == "📊 Overview":
     
     with col2:
         # Daily pattern
-        df['day_date'] = df['date'].dt.date
-        daily = df.groupby('day_date').agg({
-            'Appliances': 'mean',
-            'lights': 'mean'
-        }).reset_index().tail(30)
+        daily = overview['daily']
         
         fig = go.Figure()
         fig.add_trace(go.Bar(
@@ -209,15 +347,16 @@ if view == "📊 Overview":
     
     # Room temperature analysis
     st.subheader("🏠 Room Temperature Distribution")
-    temp_cols = [col for col in df.columns if col.startswith('T')][:8]
-    
     col1, col2 = st.columns(2)
     
     with col1:
         fig = go.Figure()
-        for col in temp_cols:
+        for col, box in overview['room_boxes'].items():
             fig.add_trace(go.Box(
-                y=df[col],
+                q1=[box['q1']], median=[box['median']], q3=[box['q3']],
+                lowerfence=[box['lowerfence']], upperfence=[box['upperfence']],
+                mean=[box['mean']], sd=[box['sd']],
+                x=[col],
                 name=col,
                 boxmean='sd'
             ))
@@ -230,20 +369,16 @@ if view == "📊 Overview":
     
     with col2:
         # Average temp by room
-        room_temps = pd.DataFrame({
-            'Room': temp_cols,
-            'Avg Temp': [df[col].mean() for col in temp_cols],
-            'Max Temp': [df[col].max() for col in temp_cols],
-            'Min Temp': [df[col].min() for col in temp_cols]
-        })
-        
-        fig = px.bar(room_temps, x='Room', y='Avg Temp',
+        fig = px.bar(overview['room_temps'], x='Room', y='Avg Temp',
                     title="Average Temperature by Room",
                     color='Avg Temp', color_continuous_scale='Viridis')
         fig.update_layout(height=400)
         st.plotly_chart(fig, use_container_width=True)
 
 elif view == "📈 Analytics":
+    analytics = analytics_data(data_version)
+    correlations = correlation_store(data_version)
+    
     st.header("📈 Advanced Analytics")
     
     # Correlation analysis
@@ -252,15 +387,14 @@ elif view == "📈 Analytics":
     
     with col1:
         # Select columns for correlation
-        numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
         correlation_cols = st.multiselect(
             "Select columns for correlation",
-            numeric_cols,
+            correlations.columns,
             default=['Appliances', 'lights', 'T1', 'T_out', 'RH_1', 'Press_mm_hg'][:5]
         )
         
         if correlation_cols:
-            corr_matrix = df[correlation_cols].corr()
+            corr_matrix = correlations.frame(correlation_cols)
             
             fig = go.Figure(data=go.Heatmap(
                 z=corr_matrix.values,
@@ -290,7 +424,7 @@ elif view == "📈 Analytics":
     
     with col1:
         # Weekday comparison
-        weekday_data = df.groupby('weekday')['Appliances'].mean()
+        weekday_data = analytics['weekday']
         weekday_names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
         
         fig = px.bar(x=weekday_names, y=weekday_data.values,
@@ -302,7 +436,7 @@ elif view == "📈 Analytics":
     
     with col2:
         # Monthly comparison
-        monthly_data = df.groupby('month')['Appliances'].mean()
+        monthly_data = analytics['monthly']
         month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
         
         fig = px.line(x=month_names[:len(monthly_data)], y=monthly_data.values,
@@ -313,6 +447,9 @@ elif view == "📈 Analytics":
         st.plotly_chart(fig, use_container_width=True)
 
 elif view == "🤖 AI Predictions":
+    trained = prepare_model(data_version)
+    model, scaler, metrics = trained['model'], trained['scaler'], trained['metrics']
+    
     st.header("🤖 AI-Powered Predictions")
     
     st.info("🔬 Machine Learning Model: Random Forest Regressor with 100 trees")
@@ -333,17 +470,19 @@ elif view == "🤖 AI Predictions":
     
     col1, col2, col3 = st.columns(3)
     
+    t1_stats = overview_data(data_version)['stats']['T1']
+    
     with col1:
         temp = st.slider("Temperature (°C)", 
-                        min_value=float(df['T1'].min()), 
-                        max_value=float(df['T1'].max()),
-                        value=float(df['T1'].mean()))
+                        min_value=float(t1_stats['min']), 
+                        max_value=float(t1_stats['max']),
+                        value=float(t1_stats['mean']))
     
     with col2:
         humidity = st.slider("Humidity (%)", 
                             min_value=0.0, 
                             max_value=100.0,
-                            value=float(df['RH_1'].mean()))
+                            value=float(trained['feature_means']['RH_1']))
     
     with col3:
         hour = st.slider("Hour (0-23)", 
@@ -351,20 +490,12 @@ elif view == "🤖 AI Predictions":
                         max_value=23,
                         value=12)
     
-    # Prepare prediction
-    pred_data = []
-    for col in feature_cols:
-        if col == 'T1':
-            pred_data.append(temp)
-        elif col == 'RH_1':
-            pred_data.append(humidity)
-        elif col == 'hour':
-            pred_data.append(hour)
-        else:
-            pred_data.append(df[col].mean())
+    # Prepare prediction from the cached feature means
+    pred_data = trained['feature_means'].copy()
+    pred_data[['T1', 'RH_1', 'hour']] = [temp, humidity, hour]
     
     # Make prediction
-    pred_scaled = scaler.transform([pred_data])
+    pred_scaled = scaler.transform(pred_data.to_frame().T)
     prediction = model.predict(pred_scaled)[0]
     prediction = max(0, prediction)
     
@@ -377,7 +508,7 @@ elif view == "🤖 AI Predictions":
     
     with col2:
         # Context
-        avg_consumption = df['Appliances'].mean()
+        avg_consumption = trained['metrics']['mean_consumption']
         diff_percent = ((prediction - avg_consumption) / avg_consumption) * 100
         
         if abs(diff_percent) < 10:
@@ -393,17 +524,64 @@ elif view == "🤖 AI Predictions":
     
     # Feature importance
     st.subheader("Feature Importance")
-    feature_importance = pd.DataFrame({
-        'Feature': feature_cols,
-        'Importance': model.feature_importances_
-    }).sort_values('Importance', ascending=False).head(10)
-    
-    fig = px.bar(feature_importance, x='Importance', y='Feature',
-                orientation='h', title="Top 10 Important Features",
+    fig = px.bar(feature_importance(data_version), x='Importance', y='Feature', error_x='Std',
+                orientation='h', title="Top 10 Features (drop in held-out R² when shuffled)",
                 color='Importance', color_continuous_scale='Viridis')
     st.plotly_chart(fig, use_container_width=True)
 
+elif view == "🧪 Scenarios":
+    trained = prepare_model(data_version)
+    df = load_data(data_version)
+    
+    st.header("🧪 What-if Scenarios")
+    st.write("Vary up to three features over a grid; every other feature stays at its training mean. "
+             "The whole grid is predicted in one batched call and cached per dataset version.")
+    
+    chosen = st.multiselect("Features to vary", trained['feature_cols'], default=['T_out', 'hour', 'lights'],
+                            max_selections=SCENARIO_CONFIG['max_features'])
+    
+    spec = []
+    for column, name in zip(st.columns(max(len(chosen), 1)), chosen):
+        with column:
+            low, high = float(df[name].min()), float(df[name].max())
+            selected = st.slider(f"{name} range", low, high, (low, high), key=f"range_{name}")
+            steps = st.number_input(f"{name} steps", min_value=2, max_value=100,
+                                    value=24 if name == 'hour' else SCENARIO_CONFIG['default_steps'],
+                                    key=f"steps_{name}")
+            spec.append((name, selected[0], selected[1], int(steps)))
+    
+    points = math.prod(steps for _, _, _, steps in spec)
+    if not spec:
+        st.info("Pick at least one feature to vary.")
+    elif points > SCENARIO_CONFIG['max_points']:
+        st.warning(f"The grid has {points:,} points; reduce the steps below {SCENARIO_CONFIG['max_points']:,}.")
+    else:
+        axes, grid = scenario_grid(data_version, tuple(spec))
+        names = list(axes)
+        
+        if len(names) == 1:
+            fig = px.line(x=axes[names[0]], y=grid, markers=True,
+                          labels={'x': names[0], 'y': 'Predicted Energy (Wh)'},
+                          title=f"Predicted consumption by {names[0]}")
+        else:
+            plane, title = grid, f"Predicted consumption: {names[0]} × {names[1]}"
+            if len(names) == 3:
+                # The full cube is cached; the slider only picks a slice
+                third = axes[names[2]]
+                index = st.select_slider(names[2], options=list(range(len(third))),
+                                         format_func=lambda i: f"{third[i]:.2f}")
+                plane = grid[:, :, index]
+                title += f" at {names[2]} = {third[index]:.2f}"
+            fig = go.Figure(go.Heatmap(x=axes[names[1]], y=axes[names[0]], z=plane,
+                                       colorscale='Viridis', colorbar=dict(title='Wh')))
+            fig.update_layout(title=title, xaxis_title=names[1], yaxis_title=names[0], height=500)
+        st.plotly_chart(fig, use_container_width=True)
+        st.caption(f"{grid.size:,} scenarios, {grid.min():.1f} to {grid.max():.1f} Wh "
+                   f"(mean {grid.mean():.1f} Wh)")
+
 elif view == "🔍 Deep Dive":
+    deep_dive = deep_dive_data(data_version)
+    
     st.header("🔍 Deep Analysis")
     
     # Distribution analysis
@@ -412,15 +590,13 @@ elif view == "🔍 Deep Dive":
     col1, col2 = st.columns(2)
     
     with col1:
-        fig = px.histogram(df, x='Appliances', nbins=50,
-                          title="Appliances Energy Distribution",
-                          color_discrete_sequence=['#2563eb'])
+        fig = histogram_figure(deep_dive['histograms']['Appliances'],
+                               "Appliances Energy Distribution", '#2563eb')
         st.plotly_chart(fig, use_container_width=True)
     
     with col2:
-        fig = px.histogram(df, x='lights', nbins=50,
-                          title="Lights Energy Distribution",
-                          color_discrete_sequence=['#f59e0b'])
+        fig = histogram_figure(deep_dive['histograms']['lights'],
+                               "Lights Energy Distribution", '#f59e0b')
         st.plotly_chart(fig, use_container_width=True)
     
     # Scatter plots
@@ -429,28 +605,19 @@ elif view == "🔍 Deep Dive":
     col1, col2 = st.columns(2)
     
     with col1:
-        fig = px.scatter(df.sample(min(1000, len(df))), 
-                        x='T1', y='Appliances',
-                        title="Temperature vs Appliances Energy",
-                        trendline="ols",
-                        color='hour',
-                        color_continuous_scale='Viridis')
+        fig = relationship_figure(deep_dive, ('T1', 'Appliances'),
+                                  "Temperature vs Appliances Energy", 'Viridis')
         st.plotly_chart(fig, use_container_width=True)
     
     with col2:
-        fig = px.scatter(df.sample(min(1000, len(df))), 
-                        x='RH_1', y='lights',
-                        title="Humidity vs Lights Energy",
-                        trendline="ols",
-                        color='hour',
-                        color_continuous_scale='Plasma')
+        fig = relationship_figure(deep_dive, ('RH_1', 'lights'),
+                                  "Humidity vs Lights Energy", 'Plasma')
         st.plotly_chart(fig, use_container_width=True)
     
     # Data statistics
     st.subheader("Data Statistics")
     
-    stats_df = df[['Appliances', 'lights', 'T1', 'RH_1', 'T_out', 'Press_mm_hg']].describe()
-    st.dataframe(stats_df.round(3), use_container_width=True)
+    st.dataframe(deep_dive['stats'], use_container_width=True)
 
 # Footer
 st.divider()
@@ -4,130 +4,269 @@ A lightweight analytics dashboard without pandas/streamlit dependencies
 """
 
 from flask import Flask, render_template
+from concurrent.futures import ThreadPoolExecutor, wait
+import datetime
 import json
 import os
-import urllib.request
-import urllib.error
+import threading
+import time
 
-try:
-    import requests  # type: ignore
-except Exception:
-    requests = None
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import LITE_DASHBOARD_CONFIG, SNAPSHOT_CONFIG
+from snapshot import build_lite_analytics, load_snapshot
 
 app = Flask(__name__, static_folder='static_dashboard', template_folder='templates_dashboard')
 
+# Upstream endpoints fetched when the API has no combined /api/dashboard.
+# Only what the lite page renders: model info is not shown, so it is never requested
+API_ENDPOINTS = {
+    'summary': '/api/summary',
+    'hourly': '/api/hourly-avg',
+    'daily': '/api/daily-avg',
+    'alerts': f"/api/alerts?limit={LITE_DASHBOARD_CONFIG['alerts']}"
+}
+# The same parts from the combined payload
+LITE_FIELDS = 'summary,hourly,daily'
+# Prediction cards, for the hours after the current one
+PREDICTION_LABELS = ('Next Hour', 'In 2 Hours', 'In 3 Hours')
+
+_executor = ThreadPoolExecutor(
+    max_workers=LITE_DASHBOARD_CONFIG['max_workers'],
+    thread_name_prefix='lite-fetch'
+)
+_session = None
+_session_lock = threading.Lock()
+
 
-def fetch_json(url, timeout=3):
-    """Try to fetch JSON from a URL. Use requests if available, otherwise urllib.
-    Returns parsed JSON on success, or None on failure.
+def get_session():
+    """Shared keep-alive requests session"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            pool_size = LITE_DASHBOARD_CONFIG['max_workers']
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            _session = requests.Session()
+            _session.mount('http://', adapter)
+            _session.mount('https://', adapter)
+        return _session
+
+
+def fetch_json(url, timeout=3, body=None):
+    """Fetch JSON from a URL over the pooled session, POSTing `body` as JSON when
+    given. Returns parsed JSON on success, or None on failure, so a dead API
+    costs one timeout at most.
     """
-    global requests
-    if requests is not None:
-        try:
-            resp = requests.get(url, timeout=timeout)
-            resp.raise_for_status()
-            return resp.json()
-        except Exception:
-            pass
-    # fallback to urllib
     try:
-        with urllib.request.urlopen(url, timeout=timeout) as r:
-            raw = r.read()
-            return json.loads(raw.decode('utf-8'))
+        if body is None:
+            resp = get_session().get(url, timeout=timeout)
+        else:
+            resp = get_session().post(url, json=body, timeout=timeout)
+        resp.raise_for_status()
+        return resp.json()
     except Exception:
         return None
 
 
-def build_analytics_from_api(base_url='http://127.0.0.1:5000'):
-    """Aggregate data from the Flask API endpoints. If any endpoint is unavailable,
-    return None to indicate the caller should fall back to static data.
+def fetch_many(urls, deadline, bodies=None):
+    """Fetch several URLs concurrently, POSTing bodies[key] where given. Results
+    for calls that have not finished when `deadline` seconds have elapsed are
+    returned as None.
     """
+    timeout = min(LITE_DASHBOARD_CONFIG['request_timeout'], deadline)
+    bodies = bodies or {}
+    futures = {key: _executor.submit(fetch_json, url, timeout, bodies.get(key))
+               for key, url in urls.items()}
+    done, _ = wait(futures.values(), timeout=deadline)
+    return {key: (future.result() if future in done else None) for key, future in futures.items()}
+
+
+def prediction_hours(now=None):
+    """(label, hour of day) of each prediction card"""
+    hour = (now or datetime.datetime.now()).hour
+    return [(label, (hour + i + 1) % 24) for i, label in enumerate(PREDICTION_LABELS)]
+
+
+def live_predictions(responses):
+    """Prediction cards from /api/predict responses, or None if any is missing"""
+    predictions = []
+    for label, response in responses:
+        if not isinstance(response, dict) or 'interval' not in response:
+            return None
+        interval = response['interval']
+        predictions.append({'time': label, 'predicted': round(response['prediction'], 2),
+                            'lower': round(interval['lower'], 2), 'upper': round(interval['upper'], 2),
+                            'coverage': round(interval['coverage'] * 100)})
+    return predictions
+
+
+def build_analytics_from_api(base_url='http://127.0.0.1:5000', deadline=None, now=None):
+    """Aggregate data from the Flask API. Uses the combined /api/dashboard
+    payload when available and fetches the individual endpoints concurrently
+    otherwise, all within an overall `deadline` in seconds. Returns None when
+    the aggregates could not be fetched so the caller can fall back to the
+    snapshot.
+    """
+    if deadline is None:
+        deadline = LITE_DASHBOARD_CONFIG['deadline']
+    started = time.monotonic()
     try:
-        summary = fetch_json(f"{base_url}/api/summary") or {}
-        hourly = fetch_json(f"{base_url}/api/hourly-avg") or {}
-        daily = fetch_json(f"{base_url}/api/daily-avg") or {}
-        top = fetch_json(f"{base_url}/api/top-consumers") or []
-        model = fetch_json(f"{base_url}/api/model-info") or {}
-
-        analytics = {
-            'overview': summary,
-            'hourly_breakdown': [],
-            'daily_breakdown': [],
-            'room_analysis': top,
-            'predictions': [
-                {'time': 'Next Hour', 'predicted': model.get('test_score', 100), 'confidence': 80}
-            ],
-            'alerts': []
-        }
-
-        # convert hourly
-        if 'hours' in hourly and 'appliances' in hourly:
-            for h, a in zip(hourly.get('hours', []), hourly.get('appliances', [])):
-                analytics['hourly_breakdown'].append({'hour': int(h), 'consumption': a, 'lights': 0})
-
-        # convert daily
-        if 'dates' in daily and 'appliances' in daily:
-            for d, a in zip(daily.get('dates', []), daily.get('appliances', [])):
-                analytics['daily_breakdown'].append({'date': d, 'consumption': a, 'lights': 0})
-
-        # fill overview defaults if missing
-        if not analytics['overview']:
-            analytics['overview'] = {
-                'total_records': 0,
-                'date_range': {'start': '', 'end': ''},
-                'appliances': {'mean': 0, 'min': 0, 'max': 0, 'std': 0},
-                'lights': {'mean': 0, 'min': 0, 'max': 0},
-                'temperature': {'mean': 0, 'min': 0, 'max': 0}
-            }
+        # One round trip on APIs that provide the combined payload; alerts and
+        # the model's predictions for the next hours are fetched alongside
+        hours = prediction_hours(now)
+        urls = {'dashboard': f"{base_url}/api/dashboard?fields={LITE_FIELDS}",
+                'alerts': f"{base_url}{API_ENDPOINTS['alerts']}"}
+        bodies = {}
+        for label, hour in hours:
+            urls[label] = f"{base_url}/api/predict"
+            bodies[label] = {'hour': hour}
+        first = fetch_many(urls, deadline, bodies)
+
+        combined = first['dashboard']
+        if isinstance(combined, dict) and 'summary' in combined:
+            results = {key: combined.get(key) for key in ('summary', 'hourly', 'daily')}
+        else:
+            remaining = deadline - (time.monotonic() - started)
+            if remaining <= 0:
+                return None
+            urls = {key: f"{base_url}{path}" for key, path in API_ENDPOINTS.items() if key != 'alerts'}
+            results = fetch_many(urls, remaining)
+
+        summary, hourly = results['summary'], results['hourly']
+        if not isinstance(summary, dict) or not isinstance(hourly, dict) or not hourly.get('hours'):
+            return None
+        daily = results['daily'] or {'dates': [], 'appliances': [], 'lights': []}
+        alerts = first['alerts'] or {}
 
+        analytics = build_lite_analytics(summary, hourly, daily, SNAPSHOT_CONFIG['cost_per_kwh'],
+                                         alerts.get('alerts', []))
+        analytics['predictions'] = (live_predictions([(label, first[label]) for label, _ in hours])
+                                    or snapshot_predictions(now))
         return analytics
     except Exception:
         return None
 
 
-# Pre-calculated fallback analytics data (used if API is unavailable)
-STATIC_ANALYTICS = {
+class AnalyticsCache:
+    """TTL cache for the assembled analytics with stale-while-revalidate.
+
+    Fresh values are served directly. Values older than `ttl` but younger than
+    `ttl + stale_ttl` are served immediately while a single background refresh
+    runs. Anything older is rebuilt synchronously by one caller only; callers
+    arriving while that refresh runs get None and fall back to the snapshot
+    instead of piling onto the API. A failed load is remembered for
+    `failure_ttl` seconds, during which the API is not retried.
+    """
+
+    def __init__(self, loader, ttl, stale_ttl, failure_ttl):
+        self.loader = loader
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.failure_ttl = failure_ttl
+        self._value = None
+        self._loaded_at = 0.0
+        self._failed_at = None
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        try:
+            value = self.loader()
+        except Exception:
+            value = None
+        with self._lock:
+            if value is not None:
+                self._value = value
+                self._loaded_at = time.monotonic()
+                self._failed_at = None
+            else:
+                self._failed_at = time.monotonic()
+            self._refreshing = False
+        return value
+
+    def get(self):
+        """Return cached analytics, or None if they cannot be loaded right now"""
+        with self._lock:
+            now = time.monotonic()
+            age = now - self._loaded_at
+            if self._value is not None and age < self.ttl:
+                return self._value
+            stale = self._value if age < self.ttl + self.stale_ttl else None
+            failed = self._failed_at is not None and now - self._failed_at < self.failure_ttl
+            if self._refreshing or failed:
+                return stale
+            self._refreshing = True
+            if stale is not None:
+                threading.Thread(target=self._refresh, daemon=True).start()
+                return stale
+        return self._refresh()
+
+
+analytics_cache = AnalyticsCache(
+    lambda: build_analytics_from_api(os.environ.get('API_BASE', 'http://127.0.0.1:5000')),
+    ttl=LITE_DASHBOARD_CONFIG['cache_ttl'],
+    stale_ttl=LITE_DASHBOARD_CONFIG['stale_ttl'],
+    failure_ttl=LITE_DASHBOARD_CONFIG['failure_ttl']
+)
+
+
+# Fallback analytics precomputed from the dataset by snapshot.py
+try:
+    SNAPSHOT = load_snapshot(SNAPSHOT_CONFIG['path'])
+except Exception as e:
+    print(f"Snapshot unavailable ({e}); build it with: python snapshot.py")
+    SNAPSHOT = None
+
+EMPTY_ANALYTICS = {
     'overview': {
-        'total_energy_consumed': 1932456.78,
-        'average_daily_consumption': 97.69,
-        'peak_hour': 18,
-        'peak_consumption': 125.78,
-        'efficiency_score': 87.5,
-        'cost_per_kwh': 0.12,
-        'estimated_monthly_cost': 1542.50
+        'total_energy_consumed': 0,
+        'average_daily_consumption': 0,
+        'peak_hour': 0,
+        'peak_consumption': 0,
+        'efficiency_score': 0,
+        'cost_per_kwh': SNAPSHOT_CONFIG['cost_per_kwh'],
+        'estimated_monthly_cost': 0
     },
-    'daily_breakdown': [
-        {'date': '2016-01-11', 'consumption': 95.4, 'lights': 3.2, 'temp': 21.5},
-        {'date': '2016-01-12', 'consumption': 97.2, 'lights': 3.5, 'temp': 21.8},
-        {'date': '2016-01-13', 'consumption': 93.8, 'lights': 3.1, 'temp': 20.9},
-    ],
-    'hourly_breakdown': [
-        {'hour': 0, 'consumption': 74.56, 'lights': 2.34},
-        {'hour': 1, 'consumption': 68.92, 'lights': 1.87},
-        {'hour': 2, 'consumption': 67.34, 'lights': 1.56},
-    ],
-    'room_analysis': [
-        {'room': 'Kitchen', 'consumption': 285.4, 'percentage': 28.5, 'efficiency': 'Good'},
-        {'room': 'Living Room', 'consumption': 215.3, 'percentage': 21.5, 'efficiency': 'Good'},
-    ],
-    'predictions': [
-        {'time': 'Next Hour', 'predicted': 105.3, 'confidence': 92},
-    ],
-    'alerts': [
-        {'level': 'warning', 'message': 'Peak consumption detected at 18:00 (125.78 kWh)', 'time': '2 hours ago'},
-    ]
+    'daily_breakdown': [],
+    'hourly_breakdown': [],
+    'room_analysis': [],
+    'predictions': [{'time': 'Next Hour', 'predicted': 0, 'lower': 0, 'upper': 0, 'coverage': 0}],
+    'alerts': [{'level': 'warning', 'message': 'No API and no snapshot available', 'time': 'now'}]
 }
 
 
+def snapshot_predictions(now=None):
+    """Snapshot predictions and intervals for the next hours of the current day"""
+    if SNAPSHOT is None:
+        return EMPTY_ANALYTICS['predictions']
+    by_hour = SNAPSHOT['prediction_by_hour']
+    # Snapshots written before intervals existed carry point predictions only
+    intervals = SNAPSHOT.get('interval_by_hour') or [[value, value] for value in by_hour]
+    coverage = round(SNAPSHOT.get('interval_coverage', 0) * 100)
+    predictions = []
+    for label, at in prediction_hours(now):
+        lower, upper = intervals[at]
+        predictions.append({'time': label, 'predicted': by_hour[at],
+                            'lower': lower, 'upper': upper, 'coverage': coverage})
+    return predictions
+
+
+def snapshot_analytics(now=None):
+    """Snapshot analytics with predictions for the next hours of the current day"""
+    if SNAPSHOT is None:
+        return EMPTY_ANALYTICS
+    return dict(SNAPSHOT['lite_analytics'], predictions=snapshot_predictions(now))
+
+
 @app.route('/dashboard')
 def dashboard():
     """Render the advanced analytics dashboard. Try to use live API data and
-    fall back to static analytics if the API cannot be reached."""
-    # Prefer local API
-    api_base = os.environ.get('API_BASE', 'http://127.0.0.1:5000')
-    analytics = build_analytics_from_api(api_base)
+    fall back to the precomputed snapshot if the API cannot be reached."""
+    # Prefer local API, served from the TTL cache when possible
+    analytics = analytics_cache.get()
     if analytics is None:
-        analytics = STATIC_ANALYTICS
+        analytics = snapshot_analytics()
 
     return render_template('advanced_dashboard.html', data=json.dumps(analytics))
 
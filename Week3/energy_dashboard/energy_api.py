@@ -0,0 +1,583 @@
+"""
+Shared state, model plumbing and routes of the Energy Dashboard API
+
+app.py and app_enhanced.py are thin entry points around this module: each
+creates its Flask app and calls init_app(), and app_asgi serves the same
+state, so the three cannot drift apart.
+"""
+
+from concurrent.futures import TimeoutError as FutureTimeout
+from flask import Blueprint, Response, render_template, jsonify, request
+import logging
+import os
+import threading
+import time
+from lazy_imports import lazy_import
+from serialization import json_response, columnar_response
+from http_cache import HttpCache, file_fingerprint
+from config import DATA_PATH, HTTP_CACHE_CONFIG, BATCHING_CONFIG, READINGS_CONFIG, PROFILING_CONFIG, READINESS_CONFIG, IMPORTANCE_CONFIG, INTERVAL_CONFIG, ANOMALY_CONFIG, SCENARIO_CONFIG
+from aggregates import (
+    AggregateCache, DASHBOARD_FIELDS, build_summary, build_hourly, build_daily,
+    build_top_consumers, build_model_info, parse_fields
+)
+from live_updates import UpdateHub, readings_frame
+from batching import MicroBatcher
+from metrics import AppMetrics
+from profiling import Profiler
+from readiness import NotReady, Readiness
+from correlation import CorrelationStore
+from explain import ForestExplainer
+from importance import permutation_importance
+from anomalies import AnomalyDetector
+from scenarios import ScenarioSweeper
+
+# Loaded on first use so the server starts before pandas/numpy are imported
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
+
+logger = logging.getLogger(__name__)
+
+api = Blueprint('energy', __name__)
+
+# Global variables
+df = None
+model = None
+intervals = None  # ForestIntervals of the current model
+scaler = None
+feature_columns = None
+feature_means = None
+dataset_version = None
+model_version = 0
+model_metrics = None
+correlation_store = None
+explainer = None  # (model_version, ForestExplainer)
+explainer_lock = threading.Lock()
+holdout = None  # (scaled X_test, y_test) of the current model
+importances = None  # (model_version, permutation importance payload)
+importance_lock = threading.Lock()
+anomaly_detector = None  # AnomalyDetector warmed on the loaded history
+anomaly_lock = threading.Lock()
+readings_ingested = 0
+pending_readings = []  # reading frames not yet appended to df
+pending_rows = 0
+ingest_lock = threading.RLock()
+publish_timer = None  # threading.Timer of the next debounced publish_aggregates
+publish_lock = threading.Lock()
+aggregate_decimals = None  # rounding of the hourly and daily aggregates, set by init_app
+aggregate_cache = AggregateCache()
+update_hub = UpdateHub()
+readiness = Readiness(['data', 'model', 'aggregates'], **READINESS_CONFIG)
+
+def current_version():
+    """Version string used to derive ETags for cached endpoints"""
+    return f"{dataset_version}.{readings_ingested}:{model_version}"
+
+profiler = Profiler(**PROFILING_CONFIG)
+metrics = AppMetrics()
+http_cache = HttpCache(version=current_version, **HTTP_CACHE_CONFIG)
+
+def init_app(app, decimals=None):
+    """Register the hooks, /healthz, /readyz, /metrics and every API route on `app`.
+
+    `decimals` rounds the hourly and daily aggregates.
+    """
+    global aggregate_decimals
+    aggregate_decimals = decimals
+    readiness.init_app(app)
+    # Registered first so its hooks wrap metrics and compression; no-op unless enabled
+    profiler.init_app(app)
+    # Registered before the cache so request timings include compression
+    metrics.init_app(app)
+    http_cache.init_app(app)
+    app.register_blueprint(api)
+    return app
+
+def current_frame():
+    """df including every ingested reading; buffered readings are appended in one concat"""
+    global df, pending_readings, pending_rows
+    if pending_readings:
+        with ingest_lock:
+            if pending_readings:
+                df = pd.concat([df, *pending_readings], ignore_index=True)
+                pending_readings = []
+                pending_rows = 0
+    return df
+
+def predict_rows(X):
+    """Vectorized (prediction, lower, upper) rows for a batch of feature rows"""
+    with metrics.model_latency.time('transform'):
+        X_scaled = scaler.transform(X)
+    with metrics.model_latency.time('predict'):
+        # One traversal of the forest gives the point estimate and its interval
+        return np.maximum(np.column_stack(intervals.predict(X_scaled)), 0)
+
+prediction_batcher = MicroBatcher(predict_rows, **BATCHING_CONFIG)
+scenarios = ScenarioSweeper(**SCENARIO_CONFIG)
+
+def predict_points(X):
+    """Point predictions without intervals for bulk scoring (readings, scenario grids)"""
+    return np.maximum(model.predict(scaler.transform(X)), 0)
+
+def get_explainer():
+    """TreeSHAP explainer for the current model, built once per model version"""
+    global explainer
+    with explainer_lock:
+        if explainer is None or explainer[0] != model_version:
+            explainer = (model_version, ForestExplainer(model, feature_columns))
+        return explainer[1]
+
+def get_permutation_importance():
+    """Held-out permutation importance of the current model, computed once per model version"""
+    global importances
+    with importance_lock:
+        if importances is None or importances[0] != model_version:
+            version = model_version
+            result = permutation_importance(model, holdout[0], holdout[1], feature_columns,
+                                            **IMPORTANCE_CONFIG)
+            importances = (version, dict(result, model_version=version))
+        return importances[1]
+
+def score_readings(detector, frame):
+    """Feed readings to the anomaly detector with one vectorized prediction; returns new alerts"""
+    # The scaler was fitted on an array, so it gets one here too
+    predictions = predict_points(frame[feature_columns].fillna(feature_means).to_numpy())
+    times = frame['date'].dt.strftime('%Y-%m-%d %H:%M').tolist()
+    return detector.update(times, frame['hour'].to_numpy(), frame['Appliances'].to_numpy(), predictions)
+
+def get_anomaly_detector():
+    """Anomaly detector backfilled over the loaded history once, then fed each new reading"""
+    global anomaly_detector
+    # Taken before anomaly_lock, which /api/readings acquires while holding ingest_lock
+    history = current_frame() if anomaly_detector is None else None
+    with anomaly_lock:
+        if anomaly_detector is None:
+            detector = AnomalyDetector(**ANOMALY_CONFIG)
+            score_readings(detector, history)
+            anomaly_detector = detector
+        return anomaly_detector
+
+# Read at scrape time only
+metrics.gauge('energy_dataset_rows', 'Rows in the loaded dataset, including buffered readings',
+              function=lambda: 0 if df is None else len(df) + pending_rows)
+metrics.gauge('energy_dataset_memory_bytes', 'Shallow memory usage of the dataset frame',
+              function=lambda: 0 if df is None else int(df.memory_usage(index=True).sum()))
+metrics.gauge('energy_model_version', 'Models trained since startup',
+              function=lambda: model_version)
+metrics.counter('energy_aggregate_cache_hits_total', 'Aggregates served from the cache',
+                function=lambda: aggregate_cache.hits)
+metrics.counter('energy_aggregate_cache_misses_total', 'Aggregates computed',
+                function=lambda: aggregate_cache.misses)
+metrics.counter('energy_http_not_modified_total', 'Conditional GETs answered with 304',
+                function=lambda: http_cache.not_modified)
+metrics.counter('energy_compressed_cache_hits_total', 'Compressed bodies reused',
+                function=lambda: http_cache.compressed_hits)
+metrics.counter('energy_compressed_cache_misses_total', 'Bodies compressed',
+                function=lambda: http_cache.compressed_misses)
+metrics.gauge('energy_stream_clients', 'Connected live update clients',
+              function=lambda: update_hub.client_count)
+metrics.counter('energy_anomaly_alerts_total', 'Anomaly alerts raised on readings',
+                function=lambda: 0 if anomaly_detector is None else anomaly_detector.stats()['alerts_total'])
+metrics.gauge('energy_prediction_queue_rows', 'Rows waiting for the next prediction batch',
+              function=lambda: prediction_batcher.pending)
+
+@readiness.tracks('data')
+def load_and_prepare_data():
+    """Load and preprocess the energy data"""
+    global df, dataset_version, correlation_store, pending_readings, pending_rows
+
+    try:
+        csv_path = DATA_PATH
+
+        if not os.path.exists(csv_path):
+            raise FileNotFoundError(f"Data file not found at {csv_path}")
+
+        logger.info(f"Loading data from {csv_path}")
+        started = time.perf_counter()
+        df = pd.read_csv(csv_path)
+        pending_readings, pending_rows = [], 0
+        dataset_version = file_fingerprint(csv_path)
+
+        # Parse date
+        df['date'] = pd.to_datetime(df['date'], format='%d-%m-%Y %H:%M')
+
+        # Sort by date
+        df = df.sort_values('date').reset_index(drop=True)
+
+        # Create time-based features
+        df['hour'] = df['date'].dt.hour
+        df['day'] = df['date'].dt.day
+        df['month'] = df['date'].dt.month
+        df['weekday'] = df['date'].dt.dayofweek
+        correlation_store = CorrelationStore.from_frame(df)
+        metrics.data_load_duration.observe(time.perf_counter() - started)
+
+        logger.info(f"Data loaded successfully. Shape: {df.shape}")
+        return df
+
+    except Exception as e:
+        logger.error(f"Error loading data: {str(e)}")
+        raise
+
+@readiness.tracks('model')
+@profiler.profiled('train_model')
+def train_model():
+    """Train the energy consumption prediction model"""
+    global model, scaler, feature_columns, feature_means, model_version, model_metrics, holdout, intervals
+
+    # Imported here so startup does not pay for scikit-learn
+    from utils import EnergyPredictionModel
+
+    try:
+        logger.info("Starting model training...")
+        started = time.perf_counter()
+
+        # Float32 feature matrix, scaled in place, with the forest's interval index
+        trained = EnergyPredictionModel(current_frame())
+        scores = trained.train()
+        model, scaler, intervals, holdout = trained.model, trained.scaler, trained.intervals, trained.holdout
+        feature_columns = trained.feature_columns
+        feature_means = trained.feature_means.to_dict()
+        model_version += 1
+
+        train_score = scores['train_r2']
+        test_score = scores['test_r2']
+        metrics.training_duration.observe(time.perf_counter() - started)
+
+        logger.info(f"Model training completed. Train Score: {train_score:.4f}, Test Score: {test_score:.4f}")
+
+        model_metrics = {
+            'train_score': float(train_score),
+            'test_score': float(test_score)
+        }
+        return model_metrics
+
+    except Exception as e:
+        logger.error(f"Error training model: {str(e)}")
+        raise
+
+def get_data_summary():
+    """Get summary statistics of the data"""
+    return build_summary(current_frame())
+
+def get_model_info():
+    """Model information; never trains, /api/model-info waits for the model stage instead"""
+    if model_metrics is None:
+        raise NotReady("Still starting up: waiting for model")
+    return build_model_info(model_metrics)
+
+AGGREGATE_BUILDERS = {
+    'summary': get_data_summary,
+    'hourly': lambda: build_hourly(current_frame(), decimals=aggregate_decimals),
+    'daily': lambda: build_daily(current_frame(), decimals=aggregate_decimals),
+    'top_consumers': lambda: build_top_consumers(current_frame()),
+    'model_info': get_model_info
+}
+
+def get_aggregate(name):
+    """Return an aggregate payload, computed once per dataset/model version"""
+    return aggregate_cache.get(current_version(), name, AGGREGATE_BUILDERS[name])
+
+@readiness.tracks('aggregates')
+def precompute_aggregates():
+    """Warm the aggregate cache so the first dashboard load is served from memory"""
+    for field in DASHBOARD_FIELDS:
+        get_aggregate(field)
+
+def publish_aggregates():
+    """Push the live aggregates to stream clients when they changed"""
+    for field in ('summary', 'hourly', 'daily'):
+        update_hub.publish(field, get_aggregate(field), only_if_changed=True)
+
+def schedule_publish():
+    """Publish the aggregates once READINGS_CONFIG['publish_interval_s'] from now,
+    however many readings arrive in between"""
+    global publish_timer
+    with publish_lock:
+        if publish_timer is None:
+            publish_timer = threading.Timer(READINGS_CONFIG['publish_interval_s'], debounced_publish)
+            publish_timer.daemon = True
+            publish_timer.start()
+
+def debounced_publish():
+    """Timer callback of schedule_publish"""
+    global publish_timer
+    with publish_lock:
+        # Cleared first so readings arriving during the publish schedule the next one
+        publish_timer = None
+    try:
+        publish_aggregates()
+    except Exception as e:
+        logger.error(f"Error publishing aggregates: {str(e)}")
+
+def warm_up():
+    """Load data, train the model and warm the caches"""
+    try:
+        load_and_prepare_data()
+        train_model()
+        precompute_aggregates()
+        publish_aggregates()
+        get_explainer()
+        get_permutation_importance()
+        get_anomaly_detector()
+    except Exception as e:
+        # The failed stage is reported by /healthz and /readyz
+        logger.error(f"Warm-up failed: {str(e)}")
+
+def start_warm_up():
+    """Run warm_up on a background thread so the server accepts requests at once"""
+    thread = threading.Thread(target=warm_up, name='warm-up', daemon=True)
+    thread.start()
+    return thread
+
+def prediction_row(data):
+    """Feature row for a prediction request, using training means for missing features.
+
+    Raises ValueError or TypeError for values that cannot be batched.
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Expected a JSON object of feature values')
+    row = []
+    for col in feature_columns:
+        if col in data:
+            row.append(float(data[col]))
+        else:
+            row.append(feature_means[col])
+    return prediction_batcher.validate(row)
+
+def prediction_result(data, row, values, explain=False):
+    """Response body for a predicted row (shared with app_asgi); publishes it to stream clients"""
+    prediction, lower, upper = values
+    result = {
+        'prediction': prediction,
+        'interval': {'lower': lower, 'upper': upper, 'coverage': INTERVAL_CONFIG['coverage']},
+        'status': 'success'
+    }
+    if explain:
+        with metrics.model_latency.time('explain'):
+            result['explanation'] = get_explainer().explain(scaler.transform([row])[0], row)
+    update_hub.publish('prediction', {'inputs': data, 'prediction': result['prediction']})
+    return result
+
+# Routes
+@api.route('/')
+def index():
+    """Home page"""
+    try:
+        return render_template('index.html')
+    except Exception as e:
+        logger.error(f"Error rendering index: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/summary')
+@readiness.require('data')
+@http_cache.cached
+def api_summary():
+    """API endpoint for data summary"""
+    try:
+        summary = get_aggregate('summary')
+        return json_response(summary)
+    except Exception as e:
+        logger.error(f"Error in api_summary: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/hourly-avg')
+@readiness.require('data')
+@http_cache.cached
+def api_hourly_avg():
+    """API endpoint for hourly average consumption"""
+    try:
+        return columnar_response(get_aggregate('hourly'))
+    except Exception as e:
+        logger.error(f"Error in api_hourly_avg: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/daily-avg')
+@readiness.require('data')
+@http_cache.cached
+def api_daily_avg():
+    """API endpoint for daily average consumption"""
+    try:
+        return columnar_response(get_aggregate('daily'))
+    except Exception as e:
+        logger.error(f"Error in api_daily_avg: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/top-consumers')
+@readiness.require('data')
+@http_cache.cached
+def api_top_consumers():
+    """API endpoint for top energy consumers"""
+    try:
+        return json_response(get_aggregate('top_consumers'))
+    except Exception as e:
+        logger.error(f"Error in api_top_consumers: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/predict', methods=['POST'])
+@readiness.require('model')
+def api_predict():
+    """API endpoint for energy prediction"""
+    try:
+        data = request.get_json(silent=True)
+        try:
+            row = prediction_row(data)
+        except (ValueError, TypeError) as e:
+            return jsonify({'error': str(e)}), 400
+
+        # Scale and predict, batched with concurrent requests
+        try:
+            values = prediction_batcher.predict(row, timeout=BATCHING_CONFIG['timeout_s'])
+        except FutureTimeout:
+            logger.error(f"Prediction timed out after {BATCHING_CONFIG['timeout_s']}s")
+            return (jsonify({'error': 'Prediction timed out, retry shortly'}), 503,
+                    {'Retry-After': str(readiness.retry_after)})
+        return json_response(prediction_result(data, row, values, request.args.get('explain') in ('1', 'true')))
+    except Exception as e:
+        logger.error(f"Error in api_predict: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/predict/batching')
+def api_predict_batching():
+    """API endpoint for prediction batch size and queue wait statistics"""
+    try:
+        return json_response(prediction_batcher.stats())
+    except Exception as e:
+        logger.error(f"Error in api_predict_batching: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/model-info')
+@readiness.require('model')
+@http_cache.cached
+def api_model_info():
+    """API endpoint for model information"""
+    try:
+        return json_response(get_aggregate('model_info'))
+    except Exception as e:
+        logger.error(f"Error in api_model_info: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/feature-importance')
+@readiness.require('model')
+@http_cache.cached
+def api_feature_importance():
+    """API endpoint for held-out permutation importance (with impurity importance for comparison)"""
+    try:
+        return json_response(get_permutation_importance())
+    except Exception as e:
+        logger.error(f"Error in api_feature_importance: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/dashboard')
+@readiness.require('data', 'model')
+@http_cache.cached
+def api_dashboard():
+    """API endpoint combining summary, hourly, daily, top consumers and model info"""
+    try:
+        fields = parse_fields(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        return json_response({field: get_aggregate(field) for field in fields})
+    except Exception as e:
+        logger.error(f"Error in api_dashboard: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/correlation')
+@readiness.require('data')
+@http_cache.cached
+def api_correlation():
+    """API endpoint for the correlation matrix of ?cols= (all numeric columns by default)"""
+    raw = request.args.get('cols')
+    columns = [col.strip() for col in raw.split(',') if col.strip()] if raw else None
+    try:
+        return json_response(correlation_store.payload(columns))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error in api_correlation: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/scenarios')
+@readiness.require('model')
+@http_cache.cached
+def api_scenarios():
+    """API endpoint for predictions over a grid of up to three features
+    (?T_out=0:20:11&hour=0:23:24&lights=0,10,20), others at their training means"""
+    try:
+        axes = scenarios.parse(request.args, feature_columns)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        with metrics.model_latency.time('scenario'):
+            payload = scenarios.run(model_version, axes, predict_points,
+                                    [feature_means[col] for col in feature_columns], feature_columns)
+        return json_response(payload)
+    except Exception as e:
+        logger.error(f"Error in api_scenarios: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/alerts')
+@readiness.require('model')
+@http_cache.cached
+def api_alerts():
+    """API endpoint for recent anomaly alerts, newest first (?limit=), with detector statistics"""
+    try:
+        limit = int(request.args.get('limit', 50))
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    if limit < 0:
+        return jsonify({'error': 'limit must not be negative'}), 400
+    try:
+        detector = get_anomaly_detector()
+        return json_response(dict(detector.stats(), alerts=detector.recent(limit)))
+    except Exception as e:
+        logger.error(f"Error in api_alerts: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/readings', methods=['POST'])
+@readiness.require('data')
+def api_readings():
+    """API endpoint to append new readings and push live updates"""
+    global pending_rows, readings_ingested
+    try:
+        new_rows = readings_frame(request.get_json(silent=True), list(df.columns))
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        with ingest_lock:
+            # Scored before the rows join df, so a detector built now backfills without them
+            alerts = score_readings(get_anomaly_detector(), new_rows) if model is not None else []
+            pending_readings.append(new_rows)
+            pending_rows += len(new_rows)
+            correlation_store.update(new_rows)
+            readings_ingested += len(new_rows)
+            total_records = len(df) + pending_rows
+            if pending_rows >= READINGS_CONFIG['consolidate_rows']:
+                current_frame()
+
+        readings = new_rows.assign(date=new_rows['date'].dt.strftime('%Y-%m-%d %H:%M'))
+        update_hub.publish('reading', readings.to_dict('records'))
+        if alerts:
+            update_hub.publish('alerts', alerts)
+        schedule_publish()
+
+        return json_response({
+            'ingested': int(len(new_rows)),
+            'total_records': int(total_records),
+            'alerts': alerts,
+            'status': 'success'
+        })
+    except Exception as e:
+        logger.error(f"Error in api_readings: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/stream')
+def api_stream():
+    """Server-sent events with new readings, changed aggregates and predictions"""
+    return Response(
+        update_hub.stream(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
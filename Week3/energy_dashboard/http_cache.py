@@ -0,0 +1,148 @@
+"""
+HTTP caching helpers for the Energy Dashboard API
+
+Aggregate endpoints only change when the dataset or the model changes, so
+their ETag is derived from those versions instead of hashing the body. That
+lets a matching If-None-Match be answered with 304 before the view runs.
+Larger responses are compressed with brotli (when installed) or gzip.
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from flask import make_response, request
+
+try:
+    import brotli  # type: ignore
+except Exception:
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    'application/json',
+    'application/vnd.apache.arrow.stream',
+    'text/html',
+    'text/css',
+    'text/plain',
+    'application/javascript',
+    'text/javascript'
+)
+
+
+def file_fingerprint(path):
+    """Cheap dataset version based on the file's size and modification time"""
+    stat = os.stat(path)
+    return f"{stat.st_size:x}-{int(stat.st_mtime):x}"
+
+
+class HttpCache:
+    """Conditional GET and response compression for a Flask app"""
+
+    def __init__(self, app=None, version=None, max_age=0, compress_min_bytes=1024,
+                 compress_level=6, compressed_cache_size=64):
+        self.version = version or (lambda: '0')
+        self.max_age = max_age
+        self.compress_min_bytes = compress_min_bytes
+        self.compress_level = compress_level
+        self.compressed_cache_size = compressed_cache_size
+        self._compressed = OrderedDict()
+        self._lock = threading.Lock()
+        self.not_modified = 0
+        self.compressed_hits = 0
+        self.compressed_misses = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Register the compression hook on the app"""
+        app.after_request(self.compress)
+
+    def etag_for_request(self):
+        """Weak ETag for the current request's path, query and negotiated type"""
+        key = '|'.join([
+            str(self.version()),
+            request.path,
+            request.query_string.decode('latin-1'),
+            request.headers.get('Accept', '')
+        ])
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()[:20]
+
+    def cache_control(self):
+        """Cache-Control value for cached endpoints"""
+        if self.max_age > 0:
+            return f"public, max-age={self.max_age}"
+        return 'no-cache'
+
+    def cached(self, view):
+        """Decorate a GET view so it honours If-None-Match and sets ETag/Cache-Control"""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = self.etag_for_request()
+            if request.if_none_match.contains_weak(etag):
+                response = make_response('', 304)
+                self.not_modified += 1
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                # The view may have bumped the model version (e.g. retraining)
+                etag = self.etag_for_request()
+            response.set_etag(etag, weak=True)
+            response.headers['Cache-Control'] = self.cache_control()
+            response.vary.add('Accept')
+            return response
+
+        return wrapper
+
+    def _choose_encoding(self):
+        offered = ['br', 'gzip'] if brotli is not None else ['gzip']
+        return request.accept_encodings.best_match(offered)
+
+    def _encode(self, body, encoding):
+        if encoding == 'br':
+            return brotli.compress(body, quality=min(self.compress_level, 11))
+        return gzip.compress(body, compresslevel=self.compress_level)
+
+    def compress(self, response):
+        """after_request hook: negotiate brotli/gzip for large text responses"""
+        if (response.status_code != 200
+                or response.direct_passthrough
+                or response.is_streamed
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_TYPES):
+            return response
+
+        body = response.get_data()
+        if len(body) < self.compress_min_bytes:
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = self._choose_encoding()
+        if encoding is None:
+            return response
+
+        etag, _ = response.get_etag()
+        key = (etag, encoding) if etag else None
+        compressed = None
+        if key is not None:
+            with self._lock:
+                compressed = self._compressed.get(key)
+                if compressed is not None:
+                    self._compressed.move_to_end(key)
+                    self.compressed_hits += 1
+
+        if compressed is None:
+            compressed = self._encode(body, encoding)
+            self.compressed_misses += 1
+            if key is not None:
+                with self._lock:
+                    self._compressed[key] = compressed
+                    while len(self._compressed) > self.compressed_cache_size:
+                        self._compressed.popitem(last=False)
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        return response
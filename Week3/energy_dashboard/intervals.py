@@ -0,0 +1,115 @@
+"""
+Prediction intervals from the forest's own leaves
+
+A quantile regression forest (Meinshausen, 2006) reuses the fitted trees:
+every training row is dropped down every tree once, when the model is
+trained, and the targets landing in each leaf are indexed. To predict, a
+query row's leaves give both the point estimate (the mean of the leaf
+values, as model.predict) and a weight for every indexed target sharing one
+of those leaves. Weighted quantiles of those targets bound the prediction,
+so the interval costs one traversal of the forest, not one model call per
+quantile or per tree.
+
+The index is capped: a leaf keeps at most `max_leaf_values` targets, and a
+larger leaf is summarised by that many evenly spaced order statistics of its
+targets. Memory is therefore bounded by leaves x max_leaf_values per tree
+instead of growing with the training rows, and small leaves stay exact.
+
+A forest grown in rounds on different samples (out_of_core.py) indexes each
+round's trees with that round's sample via add_sample, so every leaf holds
+targets of the sample its tree was fitted on.
+"""
+
+from lazy_imports import lazy_import
+
+np = lazy_import('numpy')
+
+
+class ForestIntervals:
+    """Point predictions with quantile intervals for a fitted scikit-learn forest regressor"""
+
+    def __init__(self, model, X_train=None, y_train=None, coverage=0.8, max_leaf_values=32):
+        self.model = model
+        self.coverage = coverage
+        self.max_leaf_values = max_leaf_values
+        self.n_trees = 0
+        self._counts = []
+        self._values = []
+        if X_train is not None:
+            self.add_sample(X_train, y_train)
+
+    def add_sample(self, X_train, y_train):
+        """Index the trees fitted since the previous call with the rows they were fitted on"""
+        # Targets grouped by leaf: values of node k are values[starts[k]:starts[k + 1]].
+        # Built one tree at a time so no (rows x trees) leaf matrix is materialised;
+        # each tree's node ids are one contiguous range, so its values form one block.
+        X_train = np.asarray(X_train, dtype=np.float32)
+        y_train = np.asarray(y_train, dtype=np.float64)
+        cap = self.max_leaf_values
+        for est in self.model.estimators_[self.n_trees:]:
+            leaves = est.apply(X_train)
+            counts = np.bincount(leaves, minlength=est.tree_.node_count)
+            # Rows sorted by leaf, then by target within the leaf
+            order = np.lexsort((y_train, leaves))
+            kept = counts if cap is None else np.minimum(counts, cap)
+            size = np.repeat(counts, kept)
+            slot = np.arange(kept.sum()) - np.repeat(np.cumsum(kept) - kept, kept)
+            if cap is not None:
+                # Leaves over the cap keep evenly spaced order statistics of their targets
+                slot = np.where(size > cap, ((slot + 0.5) * size / cap).astype(np.int64), slot)
+            position = np.repeat(np.cumsum(counts) - counts, kept) + slot
+            self._counts.append(kept)
+            self._values.append(y_train[order[position]].astype(np.float32))
+
+        estimators = self.model.estimators_
+        self.n_trees = len(estimators)
+        node_counts = np.array([est.tree_.node_count for est in estimators])
+        # Node ids of tree t are shifted by offsets[t] so all trees share flat arrays
+        self.offsets = np.concatenate([[0], np.cumsum(node_counts)[:-1]])
+        self.node_values = np.concatenate([est.tree_.value[:, 0, 0] for est in estimators])
+        self.starts = np.concatenate([[0], np.cumsum(np.concatenate(self._counts))])
+        self.values = np.concatenate(self._values)
+
+    def predict(self, X):
+        """(prediction, lower, upper) arrays for a batch of model-space (scaled) rows"""
+        leaves = self.model.apply(X) + self.offsets
+        n = len(leaves)
+        prediction = self.node_values[leaves].mean(axis=1)
+
+        # Every indexed target in a query row's leaves, weighted 1 / (leaf size * trees).
+        # Leaves without indexed targets are skipped and the weights renormalised over
+        # the remaining trees, so each query row's weights still sum to 1.
+        starts = self.starts[leaves]
+        sizes = self.starts[leaves + 1] - starts
+        trees = np.count_nonzero(sizes, axis=1)
+        tree_weight = np.divide(1.0, sizes * trees[:, None], out=np.zeros(sizes.shape), where=sizes > 0)
+        counts = sizes.sum(axis=1)
+        width = int(counts.max()) if n else 0
+        if width == 0:
+            return prediction, prediction.copy(), prediction.copy()
+
+        # One row of members per query row, padded with +inf values of weight 0 that
+        # sort last, so a row's sorted values and cumulative weights (and therefore
+        # its bounds) do not depend on the rest of the batch
+        starts, sizes = starts.ravel(), sizes.ravel()
+        first = np.cumsum(sizes) - sizes
+        members = np.repeat(starts - first, sizes) + np.arange(sizes.sum())
+        row = np.repeat(np.arange(n), counts)
+        column = np.arange(len(members)) - np.repeat(np.cumsum(counts) - counts, counts)
+        values = np.full((n, width), np.inf)
+        weights = np.zeros((n, width))
+        values[row, column] = self.values[members]
+        weights[row, column] = np.repeat(tree_weight.ravel(), sizes)
+
+        order = np.argsort(values, axis=1, kind='stable')
+        values = np.take_along_axis(values, order, axis=1)
+        cumulative = np.cumsum(np.take_along_axis(weights, order, axis=1), axis=1)
+        tail = (1 - self.coverage) / 2
+        targets = np.outer(cumulative[:, -1], [tail, 1 - tail]) - 1e-12
+        index = (cumulative[:, None, :] < targets[:, :, None]).sum(axis=2)
+        bounds = np.take_along_axis(values, np.minimum(index, np.maximum(counts, 1)[:, None] - 1), axis=1)
+        found = counts > 0
+        lower = np.where(found, bounds[:, 0], prediction)
+        upper = np.where(found, bounds[:, 1], prediction)
+        # The interval always contains the point estimate
+        return prediction, np.minimum(lower, prediction), np.maximum(upper, prediction)
@@ -0,0 +1,40 @@
+"""
+Deferred imports for heavy modules
+
+`pd = lazy_import('pandas')` binds a stand-in that performs the real import
+on first attribute access, so an entry point can bind its socket and serve
+static routes before pandas, numpy or scikit-learn have been loaded.
+"""
+
+import importlib
+
+
+class LazyModule:
+    """Module proxy that imports its target on first attribute access"""
+
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            # importlib holds a per-module lock, so concurrent first use is safe
+            module = importlib.import_module(self._name)
+            self.__dict__['_module'] = module
+        return module
+
+    def __getattr__(self, attr):
+        value = getattr(self._load(), attr)
+        # Cache on the proxy so later lookups skip __getattr__ entirely
+        self.__dict__[attr] = value
+        return value
+
+    def __repr__(self):
+        state = 'loaded' if self.__dict__['_module'] is not None else 'not loaded'
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name):
+    """Return a LazyModule for `name`"""
+    return LazyModule(name)
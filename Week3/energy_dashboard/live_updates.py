@@ -0,0 +1,193 @@
+"""
+Live dashboard updates over Server-Sent Events
+
+UpdateHub fans one serialized event out to every connected client, so a new
+reading or a recomputed aggregate is encoded once no matter how many
+dashboards are listening. Events are only published when their payload
+actually changed.
+"""
+
+import asyncio
+import hashlib
+import queue
+import threading
+import time
+
+from lazy_imports import lazy_import
+from serialization import dumps
+
+pd = lazy_import('pandas')
+
+DATE_FORMAT = '%d-%m-%Y %H:%M'
+
+
+def format_event(event, body, event_id=None):
+    """Encode one SSE frame from an already serialized JSON body"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    for line in body.decode('utf-8').splitlines() or ['']:
+        lines.append(f"data: {line}")
+    return ('\n'.join(lines) + '\n\n').encode('utf-8')
+
+
+class LoopQueue(queue.Queue):
+    """Client queue read from an event loop; puts from any thread wake the reader"""
+
+    def __init__(self, loop, maxsize=0):
+        super().__init__(maxsize)
+        self.loop = loop
+        self.ready = asyncio.Event()
+
+    def put_nowait(self, item):
+        super().put_nowait(item)
+        try:
+            self.loop.call_soon_threadsafe(self.ready.set)
+        except RuntimeError:
+            # The loop has closed; the client is gone
+            pass
+
+
+class UpdateHub:
+    """Broadcast hub for server-sent events"""
+
+    def __init__(self, client_queue_size=256, heartbeat_seconds=15):
+        self.client_queue_size = client_queue_size
+        self.heartbeat_seconds = heartbeat_seconds
+        self._subscribers = set()
+        self._last_frames = {}
+        self._last_digests = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    @property
+    def client_count(self):
+        """Number of connected clients"""
+        return len(self._subscribers)
+
+    def subscribe(self, client=None):
+        """Register a client queue primed with the latest frame of each event"""
+        if client is None:
+            client = queue.Queue(maxsize=self.client_queue_size)
+        with self._lock:
+            for frame in self._last_frames.values():
+                client.put_nowait(frame)
+            self._subscribers.add(client)
+        return client
+
+    def unsubscribe(self, client):
+        """Remove a client queue"""
+        with self._lock:
+            self._subscribers.discard(client)
+
+    def publish(self, event, data, only_if_changed=False):
+        """Serialize `data` once and queue it for every subscriber.
+
+        With `only_if_changed`, nothing is sent when the payload matches the
+        last one published for this event. Returns True if an event was sent.
+        """
+        body = dumps(data)
+        digest = hashlib.sha1(body).digest()
+        with self._lock:
+            if only_if_changed and self._last_digests.get(event) == digest:
+                return False
+            self._next_id += 1
+            frame = format_event(event, body, event_id=self._next_id)
+            self._last_digests[event] = digest
+            self._last_frames[event] = frame
+            subscribers = list(self._subscribers)
+
+        for client in subscribers:
+            try:
+                client.put_nowait(frame)
+            except queue.Full:
+                # Slow consumer: disconnect it rather than buffering without bound
+                self._disconnect(client)
+        return True
+
+    def _disconnect(self, client):
+        self.unsubscribe(client)
+        try:
+            while True:
+                client.get_nowait()
+        except queue.Empty:
+            pass
+        client.put_nowait(None)
+
+    def stream(self):
+        """Generator of SSE frames for one client, with periodic heartbeats"""
+        client = self.subscribe()
+        try:
+            yield b'retry: 3000\n\n'
+            while True:
+                try:
+                    frame = client.get(timeout=self.heartbeat_seconds)
+                except queue.Empty:
+                    yield f": heartbeat {int(time.time())}\n\n".encode('utf-8')
+                    continue
+                if frame is None:
+                    break
+                yield frame
+        finally:
+            self.unsubscribe(client)
+
+    async def astream(self):
+        """Async generator of SSE frames for one client, without holding a thread"""
+        client = self.subscribe(LoopQueue(asyncio.get_running_loop(), self.client_queue_size))
+        try:
+            yield b'retry: 3000\n\n'
+            while True:
+                try:
+                    frame = client.get_nowait()
+                except queue.Empty:
+                    client.ready.clear()
+                    # A frame queued between get_nowait and clear() must not be missed
+                    if client.empty():
+                        try:
+                            await asyncio.wait_for(client.ready.wait(), self.heartbeat_seconds)
+                        except asyncio.TimeoutError:
+                            yield f": heartbeat {int(time.time())}\n\n".encode('utf-8')
+                    continue
+                if frame is None:
+                    break
+                yield frame
+        finally:
+            self.unsubscribe(client)
+
+
+def readings_frame(records, columns):
+    """Build a DataFrame from posted readings with the same derived time
+    features the loaders add. Raises ValueError for unusable input.
+    """
+    if isinstance(records, dict):
+        records = [records]
+    if not isinstance(records, list) or not records:
+        raise ValueError("Expected a reading object or a non-empty list of readings")
+
+    frame = pd.DataFrame.from_records(records)
+    if 'date' not in frame or 'Appliances' not in frame:
+        raise ValueError("Readings need at least 'date' and 'Appliances'")
+
+    dates = pd.to_datetime(frame['date'], format=DATE_FORMAT, errors='coerce')
+    missing = dates.isna()
+    if missing.any():
+        dates[missing] = pd.to_datetime(frame.loc[missing, 'date'], errors='coerce')
+    if dates.isna().any():
+        raise ValueError("Could not parse reading dates")
+    frame['date'] = dates
+
+    frame['hour'] = frame['date'].dt.hour
+    frame['day'] = frame['date'].dt.day
+    frame['month'] = frame['date'].dt.month
+    frame['weekday'] = frame['date'].dt.dayofweek
+
+    unknown = [col for col in frame.columns if col not in columns]
+    if unknown:
+        raise ValueError(f"Unknown reading fields: {', '.join(unknown)}")
+
+    frame = frame.reindex(columns=columns)
+    for col in columns:
+        if col not in ('date', 'hour', 'day', 'month', 'weekday'):
+            frame[col] = pd.to_numeric(frame[col], errors='raise').astype('float64')
+    return frame
@@ -0,0 +1,232 @@
+"""
+Prometheus-style metrics for the Flask apps
+
+A tiny in-process registry of counters, gauges and histograms rendered in
+the Prometheus text exposition format at /metrics. Recording a sample is a
+dict lookup and a few integer increments under a lock; values that already
+live elsewhere (row counts, cache hit counters, memory) are read through
+callbacks only when /metrics is scraped.
+"""
+
+import bisect
+import os
+import threading
+import time
+
+from flask import Response, g, request
+
+try:
+    import resource  # not available on Windows
+except Exception:
+    resource = None
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MODEL_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+SLOW_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=(), function=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.function = function
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def samples(self):
+        """(suffix, label string, value) tuples for rendering"""
+        if self.function is not None:
+            return [('', '', self.function())]
+        with self._lock:
+            items = list(self._values.items())
+        return [('', _format_labels(self.labelnames, labels), value) for labels, value in items]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return '\n'.join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, optionally read from a callback"""
+    kind = 'counter'
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, optionally read from a callback"""
+    kind = 'gauge'
+
+    def set(self, value, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+
+class _Timer:
+    __slots__ = ('histogram', 'labels', 'start')
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+        return False
+
+
+class Histogram(_Metric):
+    """Cumulative bucketed distribution with sum and count"""
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def time(self, *labels):
+        """Context manager observing the elapsed seconds of its block"""
+        return _Timer(self, labels)
+
+    def samples(self):
+        with self._lock:
+            items = [(labels, list(counts), total, count)
+                     for labels, (counts, total, count) in self._values.items()]
+        samples = []
+        for labels, counts, total, count in items:
+            cumulative = 0
+            for edge, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(edge)}"'
+                samples.append(('_bucket', _format_labels(self.labelnames, labels, le), cumulative))
+            label_str = _format_labels(self.labelnames, labels)
+            samples.append(('_sum', label_str, total))
+            samples.append(('_count', label_str, count))
+        return samples
+
+
+def resident_memory_bytes():
+    """Current resident set size of this process, or 0 if unknown"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except Exception:
+        return 0
+
+
+def peak_memory_bytes():
+    """Peak resident set size of this process, or 0 if unknown"""
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if os.uname().sysname == 'Darwin' else peak * 1024
+
+
+class AppMetrics:
+    """Metrics registry plus request instrumentation and /metrics for a Flask app"""
+
+    def __init__(self, app=None, path='/metrics'):
+        self.path = path
+        self._metrics = []
+        self.requests = self.counter(
+            'energy_http_requests_total', 'HTTP requests by method, route and status',
+            ['method', 'endpoint', 'status'])
+        self.request_latency = self.histogram(
+            'energy_http_request_duration_seconds', 'HTTP request latency by method and route',
+            ['method', 'endpoint'])
+        self.model_latency = self.histogram(
+            'energy_model_inference_seconds', 'Scaler transform and model predict time per batch',
+            ['stage'], buckets=MODEL_BUCKETS)
+        self.training_duration = self.histogram(
+            'energy_model_training_seconds', 'Model training duration', buckets=SLOW_BUCKETS)
+        self.data_load_duration = self.histogram(
+            'energy_data_load_seconds', 'Dataset load and preprocessing duration', buckets=SLOW_BUCKETS)
+        self.gauge('process_resident_memory_bytes', 'Resident memory size in bytes',
+                   function=resident_memory_bytes)
+        self.gauge('process_peak_resident_memory_bytes', 'Peak resident memory size in bytes',
+                   function=peak_memory_bytes)
+        if app is not None:
+            self.init_app(app)
+
+    def counter(self, name, documentation, labelnames=(), function=None):
+        """Register a counter; with `function`, its value is read at scrape time"""
+        return self._register(Counter(name, documentation, labelnames, function))
+
+    def gauge(self, name, documentation, labelnames=(), function=None):
+        """Register a gauge; with `function`, its value is read at scrape time"""
+        return self._register(Gauge(name, documentation, labelnames, function))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        """Register a histogram"""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def init_app(self, app):
+        """Time every request and serve the registry at `path`"""
+        app.before_request(self._start_timer)
+        app.after_request(self._record_request)
+        app.add_url_rule(self.path, 'metrics', self.metrics_view)
+
+    def _start_timer(self):
+        g.metrics_start = time.perf_counter()
+
+    def _record_request(self, response):
+        start = g.get('metrics_start')
+        if start is not None:
+            # Route templates, not raw paths, keep label cardinality bounded
+            endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+            self.request_latency.observe(time.perf_counter() - start, request.method, endpoint)
+            self.requests.inc(request.method, endpoint, str(response.status_code))
+        return response
+
+    def render(self):
+        """All metrics in the Prometheus text format"""
+        return '\n'.join(metric.render() for metric in self._metrics) + '\n'
+
+    def metrics_view(self):
+        """GET /metrics"""
+        return Response(self.render(), content_type=CONTENT_TYPE)
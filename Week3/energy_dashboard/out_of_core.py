@@ -0,0 +1,254 @@
+"""
+Out-of-core training for datasets larger than memory
+
+train_out_of_core streams the CSV in chunks of `chunk_rows` rows:
+
+1. a statistics pass sums every feature column to get the imputation means;
+2. a training pass imputes each chunk, updates the StandardScaler with
+   partial_fit and splits rows into train/test with a seeded draw. Training
+   rows feed a fixed-size reservoir sample, held-out rows a second one for
+   evaluation. The scaler sees training rows only;
+3. with `rounds` > 1, further passes draw fresh training reservoirs.
+
+Each round adds n_estimators / rounds trees to a warm-started forest fitted
+on that round's reservoir, and indexes those trees' leaves with the same
+reservoir for the prediction intervals (only its targets are kept). A share
+of every round's reservoir, eval_rows in total, is kept to score the final
+forest on training rows. No tree sees more than `sample_rows` rows and
+peak memory is bounded by chunk_rows + sample_rows + 2 * eval_rows rows
+whatever the file size. High-water marks of traced memory (numpy and pandas buffers)
+are reported per pass, with the process peak RSS where available.
+
+Run from the energy_dashboard directory:
+    python out_of_core.py --data ../synthetic_energy.csv --rounds 4
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+from lazy_imports import lazy_import
+from config import DATA_PATH, INTERVAL_CONFIG, MODEL_CONFIG, OUT_OF_CORE_CONFIG
+from intervals import ForestIntervals
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# Default of train_out_of_core's max_depth, where None already means unlimited depth
+MODEL_DEFAULT = object()
+
+DATE_FORMAT = '%d-%m-%Y %H:%M'
+TIME_FEATURES = ['hour', 'day', 'month', 'weekday']
+
+
+def read_chunks(csv_path, chunk_rows):
+    """CSV chunks with the same derived time features as EnergyDataHandler.load_data"""
+    for chunk in pd.read_csv(csv_path, chunksize=chunk_rows):
+        dates = pd.to_datetime(chunk['date'], format=DATE_FORMAT)
+        chunk['hour'] = dates.dt.hour
+        chunk['day'] = dates.dt.day
+        chunk['month'] = dates.dt.month
+        chunk['weekday'] = dates.dt.dayofweek
+        yield chunk.dropna(subset=['Appliances'])
+
+
+class Reservoir:
+    """Uniform fixed-size sample of rows from a stream (Algorithm R, vectorized per chunk)"""
+
+    def __init__(self, size, n_columns, rng):
+        self.size = size
+        self.rng = rng
+        self.X = np.empty((size, n_columns), dtype=np.float32)
+        self.y = np.empty(size)
+        self.seen = 0
+
+    def add(self, X, y):
+        n, m = self.seen, len(X)
+        fill = max(0, min(self.size - n, m))
+        self.X[n:n + fill] = X[:fill]
+        self.y[n:n + fill] = y[:fill]
+        rest = np.arange(fill, m)
+        if len(rest):
+            # Row i of the stream replaces a random slot with probability size / (i + 1)
+            slots = self.rng.integers(0, n + rest + 1)
+            keep = slots < self.size
+            rows, slots = rest[keep], slots[keep]
+            # When rows draw the same slot the later one wins, as in the sequential algorithm
+            slots, last = np.unique(slots[::-1], return_index=True)
+            rows = rows[::-1][last]
+            self.X[slots] = X[rows]
+            self.y[slots] = y[rows]
+        self.seen += m
+
+    def sample(self):
+        """(X, y) views of the rows kept so far"""
+        n = min(self.seen, self.size)
+        return self.X[:n], self.y[:n]
+
+
+class MemoryTracker:
+    """Per-phase high-water marks of traced allocations and the process peak RSS"""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.phases = []
+        self._started_tracing = False
+
+    def __enter__(self):
+        if self.enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self._started_tracing:
+            tracemalloc.stop()
+
+    def mark(self, phase):
+        """Record the peak since the previous mark and start a new interval"""
+        entry = {'phase': phase, 'seconds': round(time.perf_counter() - self._t0, 3)}
+        if tracemalloc.is_tracing():
+            entry['peak_traced_mib'] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 2)
+            # An outer tracer (e.g. a benchmark) keeps its own peak; phases then report running peaks
+            if self._started_tracing:
+                tracemalloc.reset_peak()
+        self.phases.append(entry)
+        self._t0 = time.perf_counter()
+
+    def report(self):
+        traced = [phase['peak_traced_mib'] for phase in self.phases if 'peak_traced_mib' in phase]
+        report = {'phases': self.phases, 'peak_traced_mib': max(traced) if traced else None}
+        if resource is not None:
+            # ru_maxrss is KiB on Linux; it covers the whole process lifetime
+            report['peak_rss_mib'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 2)
+        return report
+
+
+def train_out_of_core(csv_path=None, chunk_rows=100000, sample_rows=200000, eval_rows=50000, rounds=1,
+                      track_memory=True, n_estimators=None, max_depth=MODEL_DEFAULT, random_state=None,
+                      test_size=None):
+    """Fit the scaler and forest from a CSV streamed in chunks.
+
+    Returns a dict with model, scaler, feature_columns, feature_means,
+    metrics, the scaled evaluation sample (holdout), the ForestIntervals
+    index over every round's sample and the memory report. Forest settings
+    default to MODEL_CONFIG; max_depth=None grows trees to full depth.
+    """
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
+    from sklearn.preprocessing import StandardScaler
+
+    csv_path = csv_path or DATA_PATH
+    n_estimators = n_estimators or MODEL_CONFIG['n_estimators']
+    max_depth = MODEL_CONFIG['max_depth'] if max_depth is MODEL_DEFAULT else max_depth
+    random_state = MODEL_CONFIG['random_state'] if random_state is None else random_state
+    test_size = MODEL_CONFIG['test_size'] if test_size is None else test_size
+    rounds = max(1, min(rounds, n_estimators))
+
+    with MemoryTracker(track_memory) as memory:
+        # Pass 1: means for imputation
+        sums = counts = None
+        rows = 0
+        for chunk in read_chunks(csv_path, chunk_rows):
+            if sums is None:
+                feature_columns = [col for col in chunk.columns if col not in ('date', 'Appliances')]
+                sums = pd.Series(0.0, index=feature_columns)
+                counts = pd.Series(0, index=feature_columns)
+            sums += chunk[feature_columns].sum()
+            counts += chunk[feature_columns].count()
+            rows += len(chunk)
+        if not rows:
+            raise ValueError(f"No readings in {csv_path}")
+        feature_means = sums / counts
+        memory.mark('statistics')
+
+        scaler = StandardScaler()
+        model = RandomForestRegressor(n_estimators=0, max_depth=max_depth, random_state=random_state,
+                                      n_jobs=-1, warm_start=True)
+        intervals = ForestIntervals(model, **INTERVAL_CONFIG)
+        evaluation = Reservoir(eval_rows, len(feature_columns), np.random.default_rng([random_state, 0]))
+        # Training rows the final forest is scored on, an equal share from every round
+        check_rng = np.random.default_rng([random_state, 3])
+        check_X, check_y = [], []
+        for round_number in range(1, rounds + 1):
+            # The split draw is reseeded every pass so each row stays on the same side
+            split_rng = np.random.default_rng([random_state, 1])
+            training = Reservoir(sample_rows, len(feature_columns),
+                                 np.random.default_rng([random_state, 2, round_number]))
+            for chunk in read_chunks(csv_path, chunk_rows):
+                X = chunk[feature_columns].fillna(feature_means).to_numpy(dtype=np.float32)
+                y = chunk['Appliances'].to_numpy(dtype=np.float64)
+                test = split_rng.random(len(X)) < test_size
+                if round_number == 1:
+                    scaler.partial_fit(X[~test])
+                    evaluation.add(X[test], y[test])
+                training.add(X[~test], y[~test])
+                del chunk, X, y
+
+            X_train, y_train = training.sample()
+            scaler.transform(X_train, copy=False)
+            model.set_params(n_estimators=n_estimators * round_number // rounds)
+            model.fit(X_train, y_train)
+            intervals.add_sample(X_train, y_train)
+            keep = check_rng.choice(len(X_train), min(len(X_train), max(1, eval_rows // rounds)), replace=False)
+            check_X.append(X_train[keep])
+            check_y.append(y_train[keep])
+            memory.mark(f'round {round_number}')
+
+        del X_train
+        X_train, y_train = np.concatenate(check_X), np.concatenate(check_y)
+        X_test, y_test = evaluation.sample()
+        scaler.transform(X_test, copy=False)
+        train_pred = model.predict(X_train)
+        test_pred = model.predict(X_test)
+        metrics = {
+            # Scored on rows from every round's sample, not just the last one
+            'train_r2': r2_score(y_train, train_pred),
+            'test_r2': r2_score(y_test, test_pred),
+            'train_mae': mean_absolute_error(y_train, train_pred),
+            'test_mae': mean_absolute_error(y_test, test_pred),
+            'train_rmse': np.sqrt(mean_squared_error(y_train, train_pred)),
+            'test_rmse': np.sqrt(mean_squared_error(y_test, test_pred)),
+            'rows': rows
+        }
+        memory.mark('evaluation')
+
+    return {
+        'model': model,
+        'scaler': scaler,
+        'feature_columns': feature_columns,
+        'feature_means': feature_means,
+        'metrics': metrics,
+        'holdout': (X_test, y_test),
+        'intervals': intervals,
+        'memory': dict(memory.report(), bound_rows=chunk_rows + sample_rows + 2 * eval_rows)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--data', default=DATA_PATH, help='CSV with the UCI columns')
+    for name, value in OUT_OF_CORE_CONFIG.items():
+        if name != 'track_memory':
+            parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=value)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    result = train_out_of_core(args.data, chunk_rows=args.chunk_rows, sample_rows=args.sample_rows,
+                               eval_rows=args.eval_rows, rounds=args.rounds)
+    print(json.dumps({
+        'seconds': round(time.perf_counter() - started, 2),
+        'metrics': {key: float(value) for key, value in result['metrics'].items()},
+        'memory': result['memory']
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,246 @@
+"""
+Opt-in profiling for slow requests and model training
+
+When enabled in PROFILING_CONFIG (or with ENERGY_PROFILING=1), a request
+carrying the profiling header is run under a statistical stack sampler and a
+tracemalloc window. Profiles are kept in memory and served from
+/debug/profiles in the collapsed-stack format flamegraph.pl, speedscope and
+inferno read directly. When disabled, no hooks or routes are registered and
+decorated functions are returned unchanged.
+"""
+
+import itertools
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, OrderedDict
+from functools import wraps
+
+from flask import Response, g, jsonify, request
+
+# Frames from these files are the profiler itself, not the code under test
+_OWN_FILES = (os.path.abspath(__file__), tracemalloc.__file__, threading.__file__)
+
+
+def _frame_label(filename, name, lineno):
+    return f"{name} ({os.path.basename(filename)}:{lineno})"
+
+
+def _stack(frame):
+    """Root-first collapsed stack for a live frame"""
+    labels = []
+    while frame is not None:
+        code = frame.f_code
+        if code.co_filename not in _OWN_FILES:
+            labels.append(_frame_label(code.co_filename, code.co_name, code.co_firstlineno))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+class StackSampler:
+    """Sample the Python stacks of some or all threads on a background thread
+
+    With `thread_id` set, only that thread and the threads named in
+    `thread_names` (looked up at every sample, so threads started later are
+    included) are sampled; otherwise every thread is.
+    """
+
+    def __init__(self, interval=0.002, thread_id=None, thread_names=()):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.thread_names = set(thread_names)
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            if self.thread_id is not None:
+                idents = {self.thread_id} | {thread.ident for thread in threading.enumerate()
+                                             if thread.name in self.thread_names}
+                for ident in idents:
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        self.samples[_stack(frame)] += 1
+                continue
+            for ident, frame in frames.items():
+                if ident != own:
+                    stack = _stack(frame)
+                    if stack:
+                        self.samples[stack] += 1
+
+
+class Profile:
+    """One captured CPU sample set and allocation snapshot"""
+
+    def __init__(self, profile_id, label):
+        self.id = profile_id
+        self.label = label
+        self.created = time.time()
+        self.duration = 0.0
+        self.cpu = Counter()
+        self.memory = Counter()
+        self.memory_peak = 0
+        self.top_allocations = []
+
+    def collapsed(self, kind='cpu'):
+        """Flamegraph collapsed-stack text: one 'frame;frame;frame count' per line"""
+        stacks = self.memory if kind == 'memory' else self.cpu
+        return ''.join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+    def summary(self):
+        return {
+            'id': self.id,
+            'label': self.label,
+            'created': self.created,
+            'duration_ms': round(self.duration * 1000, 3),
+            'samples': sum(self.cpu.values()),
+            'memory_peak_bytes': self.memory_peak,
+            'top_allocations': self.top_allocations
+        }
+
+
+class Profiler:
+    """Request and function profiling with an in-memory store of recent profiles"""
+
+    def __init__(self, app=None, enabled=False, header='X-Profile', sample_interval_ms=2.0,
+                 memory_frames=16, max_profiles=20, profile_training=False,
+                 request_threads=('predict-batcher',)):
+        self.enabled = enabled
+        self.header = header
+        self.interval = sample_interval_ms / 1000.0
+        self.memory_frames = memory_frames
+        self.max_profiles = max_profiles
+        self.profile_training = profile_training
+        self.request_threads = request_threads
+        self._profiles = OrderedDict()
+        self._ids = itertools.count(1)
+        # tracemalloc is process wide, so only one capture runs at a time
+        self._capture_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Register the request hooks and debug routes when profiling is enabled"""
+        if not self.enabled:
+            return
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        app.add_url_rule('/debug/profiles', 'debug_profiles', self.list_view)
+        app.add_url_rule('/debug/profiles/<int:profile_id>', 'debug_profile', self.profile_view)
+
+    def start(self, label, all_threads=False, thread_names=()):
+        """Begin a capture; returns None if another capture is running
+
+        Samples the calling thread plus the threads named in `thread_names`,
+        or every thread with `all_threads`.
+        """
+        if not self._capture_lock.acquire(blocking=False):
+            return None
+        profile = Profile(next(self._ids), label)
+        tracemalloc.start(self.memory_frames)
+        sampler = StackSampler(self.interval, None if all_threads else threading.get_ident(), thread_names)
+        return profile, sampler.start(), time.perf_counter()
+
+    def finish(self, capture):
+        """End a capture started with start() and store the profile"""
+        profile, sampler, started = capture
+        try:
+            profile.duration = time.perf_counter() - started
+            profile.cpu = sampler.stop()
+            snapshot = tracemalloc.take_snapshot()
+            profile.memory_peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+            self._capture_lock.release()
+
+        snapshot = snapshot.filter_traces([
+            tracemalloc.Filter(False, path) for path in _OWN_FILES
+        ])
+        stats = snapshot.statistics('traceback')
+        for stat in stats:
+            stack = ';'.join(f"{os.path.basename(f.filename)}:{f.lineno}" for f in stat.traceback)
+            profile.memory[stack] += stat.size
+        profile.top_allocations = [
+            {'location': f"{os.path.basename(stat.traceback[-1].filename)}:{stat.traceback[-1].lineno}",
+             'bytes': stat.size, 'count': stat.count}
+            for stat in stats[:10]
+        ]
+
+        self._profiles[profile.id] = profile
+        while len(self._profiles) > self.max_profiles:
+            self._profiles.popitem(last=False)
+        return profile
+
+    def profiled(self, label):
+        """Decorator capturing every call of a function (used for training)
+
+        Returns the function unchanged unless profiling and profile_training
+        are both enabled.
+        """
+        def decorator(fn):
+            if not (self.enabled and self.profile_training):
+                return fn
+
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                # Forest fitting runs on joblib worker threads, so sample them all
+                capture = self.start(label, all_threads=True)
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    if capture is not None:
+                        self.finish(capture)
+            return wrapper
+        return decorator
+
+    def _before_request(self):
+        if request.headers.get(self.header) and not request.path.startswith('/debug/profiles'):
+            # Predictions run on the micro-batcher thread, so it is sampled with the request
+            g.profile_capture = self.start(f"{request.method} {request.path}",
+                                           all_threads=self.request_threads is None,
+                                           thread_names=self.request_threads or ())
+
+    def _after_request(self, response):
+        capture = g.pop('profile_capture', None)
+        if capture is not None:
+            profile = self.finish(capture)
+            response.headers['X-Profile-Id'] = str(profile.id)
+        return response
+
+    def _teardown_request(self, error):
+        # after_request is skipped on unhandled errors; never leave a capture running
+        capture = g.pop('profile_capture', None)
+        if capture is not None:
+            self.finish(capture)
+
+    def list_view(self):
+        """GET /debug/profiles: summaries of the stored profiles, newest first"""
+        return jsonify([profile.summary() for profile in reversed(self._profiles.values())])
+
+    def profile_view(self, profile_id):
+        """GET /debug/profiles/<id>?format=collapsed|memory|json"""
+        profile = self._profiles.get(profile_id)
+        if profile is None:
+            return jsonify({'error': 'Profile not found'}), 404
+        fmt = request.args.get('format', 'collapsed')
+        if fmt == 'json':
+            return jsonify(profile.summary())
+        if fmt not in ('collapsed', 'memory'):
+            return jsonify({'error': f"Unknown format '{fmt}'"}), 400
+        kind = 'memory' if fmt == 'memory' else 'cpu'
+        return Response(profile.collapsed(kind), mimetype='text/plain')
@@ -0,0 +1,148 @@
+"""
+Startup readiness tracking for the Flask apps
+
+The apps bind their socket first and load data, train the model and warm the
+aggregate cache in the background. Readiness records each of those stages,
+serves /healthz (liveness) and /readyz (readiness with per-stage progress),
+and lets data endpoints answer 503 with Retry-After until their stage is done.
+"""
+
+import threading
+import time
+from functools import wraps
+
+from flask import jsonify
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class NotReady(Exception):
+    """Raised when a required startup stage has not completed"""
+
+
+class Readiness:
+    """Per-stage startup progress plus /healthz and /readyz"""
+
+    def __init__(self, stages, app=None, retry_after=5):
+        self.stage_names = tuple(stages)
+        self.retry_after = retry_after
+        self.started_at = time.time()
+        self._stages = {name: {'status': PENDING} for name in self.stage_names}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Register /healthz and /readyz"""
+        app.add_url_rule('/healthz', 'healthz', self.healthz)
+        app.add_url_rule('/readyz', 'readyz', self.readyz)
+
+    def start(self, name):
+        """Mark a stage as running (a completed stage stays completed on re-runs)"""
+        with self._lock:
+            stage = self._stages[name]
+            if stage['status'] != DONE:
+                stage.update(status=RUNNING, started=time.time(), error=None)
+            stage['_t0'] = time.perf_counter()
+
+    def finish(self, name):
+        """Mark a stage as done and record how long it took"""
+        with self._lock:
+            stage = self._stages[name]
+            stage.update(status=DONE, finished=time.time())
+            stage['duration_ms'] = round((time.perf_counter() - stage.pop('_t0')) * 1000, 1)
+
+    def fail(self, name, error):
+        """Record a failed stage, unless an earlier run already completed it"""
+        with self._lock:
+            stage = self._stages[name]
+            stage.pop('_t0', None)
+            if stage['status'] != DONE:
+                stage.update(status=FAILED, finished=time.time(), error=str(error))
+
+    def tracks(self, name):
+        """Decorator recording every call of a function as stage `name`"""
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                self.start(name)
+                try:
+                    result = fn(*args, **kwargs)
+                except Exception as e:
+                    self.fail(name, e)
+                    raise
+                self.finish(name)
+                return result
+            return wrapper
+        return decorator
+
+    def is_done(self, *names):
+        """True when every named stage (all stages by default) has completed"""
+        names = names or self.stage_names
+        return all(self._stages[name]['status'] == DONE for name in names)
+
+    @property
+    def failed(self):
+        return any(stage['status'] == FAILED for stage in self._stages.values())
+
+    def check(self, *names):
+        """Raise NotReady unless the named stages have completed"""
+        if not self.is_done(*names):
+            pending = [name for name in names if self._stages[name]['status'] != DONE]
+            raise NotReady(f"Still starting up: waiting for {', '.join(pending)}")
+
+    def unavailable(self, message):
+        """503 response telling the client when to retry"""
+        response = jsonify({'error': message, 'ready': False})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(self.retry_after)
+        return response
+
+    def require(self, *names):
+        """Decorate a view so it answers 503 + Retry-After until `names` are done"""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                try:
+                    self.check(*names)
+                except NotReady as e:
+                    return self.unavailable(str(e))
+                return view(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def status(self):
+        """Snapshot of every stage with timings"""
+        now = time.time()
+        with self._lock:
+            stages = {}
+            for name in self.stage_names:
+                stage = {k: v for k, v in self._stages[name].items() if not k.startswith('_')}
+                if stage['status'] == RUNNING:
+                    stage['elapsed_ms'] = round((now - stage['started']) * 1000, 1)
+                stages[name] = stage
+        return {
+            'ready': self.is_done(),
+            'uptime_s': round(now - self.started_at, 3),
+            'stages': stages
+        }
+
+    def healthz(self):
+        """Liveness: the process is serving and warm-up has not failed"""
+        body = {'status': 'failed' if self.failed else 'ok',
+                'uptime_s': round(time.time() - self.started_at, 3)}
+        return jsonify(body), 503 if self.failed else 200
+
+    def readyz(self):
+        """Readiness: 200 once every stage is done, otherwise 503 with progress"""
+        body = self.status()
+        if body['ready']:
+            return jsonify(body)
+        response = jsonify(body)
+        response.status_code = 503
+        if not self.failed:
+            response.headers['Retry-After'] = str(self.retry_after)
+        return response
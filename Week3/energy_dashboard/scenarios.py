@@ -0,0 +1,141 @@
+"""
+What-if scenario sweeps over feature grids
+
+A scenario varies up to `max_features` features over ranges while every
+other feature stays at its training mean. Grid points are generated chunk
+by chunk from their flat index, so memory is bounded by `chunk_rows` rows
+however large the grid, and each chunk is one vectorized prediction. Results
+are kept in a small LRU keyed by model version and the normalised grid.
+Axes of integer-valued features only take whole values, as in training.
+"""
+
+import math
+import threading
+from collections import OrderedDict
+
+from lazy_imports import lazy_import
+
+np = lazy_import('numpy')
+
+# Features that only take whole values in the data (time parts and the lights meter)
+INTEGER_FEATURES = ('lights', 'hour', 'day', 'month', 'weekday')
+
+
+def axis_values(low, high, steps, integer=False):
+    """`steps` evenly spaced values from low to high; rounded and deduplicated for integer axes"""
+    values = np.linspace(low, high, steps)
+    if integer:
+        values = np.array(list(dict.fromkeys(np.round(values).tolist())))
+    return values
+
+
+def parse_axis(spec, default_steps=10, integer=False, max_points=None):
+    """Values of one axis from 'min:max:steps', 'min:max' or 'v1,v2,...'
+
+    With `integer`, range points are rounded to whole values and listed
+    values must already be whole. Axes longer than `max_points` and
+    non-finite values are rejected before anything is allocated.
+    """
+    spec = spec.strip()
+    if ':' in spec:
+        parts = spec.split(':')
+        if len(parts) not in (2, 3):
+            raise ValueError(f"Expected min:max[:steps], got '{spec}'")
+        low, high = float(parts[0]), float(parts[1])
+        if not (math.isfinite(low) and math.isfinite(high)):
+            raise ValueError(f"Range bounds must be finite, got '{spec}'")
+        steps = int(parts[2]) if len(parts) == 3 else default_steps
+        if steps < 1:
+            raise ValueError(f"Steps must be positive, got {steps}")
+        if max_points is not None and steps > max_points:
+            raise ValueError(f"Axis has {steps} points; at most {max_points} fit in the grid")
+        return axis_values(low, high, steps, integer)
+    values = [float(value) for value in spec.split(',') if value.strip()]
+    if not values:
+        raise ValueError("Empty axis")
+    if not all(math.isfinite(value) for value in values):
+        raise ValueError(f"Values must be finite, got '{spec}'")
+    if max_points is not None and len(values) > max_points:
+        raise ValueError(f"Axis has {len(values)} points; at most {max_points} fit in the grid")
+    if integer and not all(value.is_integer() for value in values):
+        raise ValueError(f"Expected whole values, got '{spec}'")
+    return np.array(values)
+
+
+def evaluate_grid(predict_fn, base_row, feature_columns, axes, chunk_rows=10000):
+    """`predict_fn` over every combination of `axes` ({feature: values}),
+    with the remaining columns taken from `base_row`. Returns an array shaped
+    like the grid (axis order as in `axes`).
+    """
+    columns = [feature_columns.index(name) for name in axes]
+    values = [np.asarray(axis, dtype=np.float64) for axis in axes.values()]
+    shape = tuple(len(axis) for axis in values)
+    total = math.prod(shape)
+    base = np.asarray(base_row, dtype=np.float64)
+    predictions = np.empty(total)
+    for start in range(0, total, chunk_rows):
+        flat = np.arange(start, min(start + chunk_rows, total))
+        chunk = np.tile(base, (len(flat), 1))
+        for column, axis, positions in zip(columns, values, np.unravel_index(flat, shape)):
+            chunk[:, column] = axis[positions]
+        predictions[start:start + len(flat)] = predict_fn(chunk)
+    return predictions.reshape(shape)
+
+
+class ScenarioSweeper:
+    """Parse, evaluate and cache scenario grids"""
+
+    def __init__(self, max_features=3, max_points=100000, default_steps=10, chunk_rows=10000, cache_size=64):
+        self.max_features = max_features
+        self.max_points = max_points
+        self.default_steps = default_steps
+        self.chunk_rows = chunk_rows
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def parse(self, args, feature_columns):
+        """{feature: values} from query arguments; raises ValueError for unusable grids"""
+        if len(args) > self.max_features:
+            raise ValueError(f"At most {self.max_features} features can vary, got {len(args)}")
+        axes = {}
+        points = 1
+        for name, spec in args.items():
+            if name not in feature_columns:
+                raise ValueError(f"Unknown feature: {name}")
+            # Each axis may only use what the axes before it left of the budget
+            axes[name] = parse_axis(spec, self.default_steps, name in INTEGER_FEATURES,
+                                    max_points=self.max_points // points)
+            points *= len(axes[name])
+        if not axes:
+            raise ValueError("Give a range for at least one feature, e.g. ?T_out=0:20:11&hour=0:23:24")
+        return axes
+
+    def run(self, version, axes, predict_fn, base_row, feature_columns):
+        """Scenario payload for `axes`, computed once per model version"""
+        key = (version,) + tuple((name, tuple(values.tolist())) for name, values in axes.items())
+        with self._lock:
+            if key in self._cache:
+                self.hits += 1
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        predictions = evaluate_grid(predict_fn, base_row, feature_columns, axes, self.chunk_rows)
+        payload = {
+            'features': list(axes),
+            'axes': {name: values.tolist() for name, values in axes.items()},
+            'shape': list(predictions.shape),
+            'points': int(predictions.size),
+            'predictions': predictions.tolist(),
+            'min': float(predictions.min()),
+            'max': float(predictions.max()),
+            'mean': float(predictions.mean()),
+            'model_version': version
+        }
+        with self._lock:
+            self.misses += 1
+            self._cache[key] = payload
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return payload
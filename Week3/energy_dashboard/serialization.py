@@ -0,0 +1,104 @@
+"""
+Fast response serialization for the Energy Dashboard API
+
+Endpoints hand NumPy arrays straight to this module instead of building
+Python lists with ``.tolist()``. orjson encodes the arrays natively when it
+is installed, and clients that send ``Accept: application/vnd.apache.arrow.stream``
+get columnar payloads as an Arrow IPC stream when pyarrow is available.
+pyarrow is imported on the first Arrow request; if that import fails (for
+example a wheel built against a newer NumPy), every request gets JSON.
+"""
+
+import datetime
+import importlib
+import importlib.util
+import json
+import threading
+
+from flask import Response, request
+
+from lazy_imports import lazy_import
+
+try:
+    import orjson  # type: ignore
+except Exception:
+    orjson = None
+
+np = lazy_import('numpy')
+# Only check that pyarrow is installed; it is imported on first Arrow response
+pa = None
+_arrow_installed = importlib.util.find_spec('pyarrow') is not None
+_arrow_lock = threading.Lock()
+
+JSON_MIMETYPE = 'application/json'
+ARROW_MIMETYPE = 'application/vnd.apache.arrow.stream'
+
+
+def _default(obj):
+    """Encode the NumPy/pandas values that orjson or json cannot handle natively"""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (datetime.date, datetime.datetime)):
+        return obj.isoformat()
+    if hasattr(obj, 'to_numpy'):
+        return obj.to_numpy().tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(payload):
+    """Serialize a payload to JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(
+            payload,
+            default=_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
+    return json.dumps(payload, default=_default, separators=(',', ':')).encode('utf-8')
+
+
+def json_response(payload, status=200):
+    """Build a JSON response without going through jsonify"""
+    return Response(dumps(payload), status=status, mimetype=JSON_MIMETYPE)
+
+
+def arrow_available():
+    """Import pyarrow on first use; False if it is missing or fails to import"""
+    global pa, _arrow_installed
+    if pa is None and _arrow_installed:
+        with _arrow_lock:
+            if pa is None and _arrow_installed:
+                try:
+                    pa = importlib.import_module('pyarrow')
+                except Exception:
+                    # Installed but unusable; fall back to JSON from now on
+                    _arrow_installed = False
+    return pa is not None
+
+
+def wants_arrow():
+    """Check whether the client negotiated an Arrow IPC stream that can be served"""
+    if pa is None and not _arrow_installed:
+        return False
+    best = request.accept_mimetypes.best_match([JSON_MIMETYPE, ARROW_MIMETYPE])
+    return best == ARROW_MIMETYPE and arrow_available()
+
+
+def arrow_bytes(columns):
+    """Encode equal-length columns as an Arrow IPC stream"""
+    table = pa.table({name: np.asarray(values) for name, values in columns.items()})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def columnar_response(columns, status=200):
+    """Respond with equal-length columns as Arrow or JSON, depending on Accept"""
+    if wants_arrow():
+        response = Response(arrow_bytes(columns), status=status, mimetype=ARROW_MIMETYPE)
+    else:
+        response = json_response(columns, status=status)
+    response.vary.add('Accept')
+    return response
@@ -0,0 +1,203 @@
+"""
+Precomputed dashboard snapshot
+
+`python snapshot.py` loads the real dataset once, trains the model and writes
+every dashboard aggregate, the model metadata, an hour-of-day prediction table
+and the lite dashboard analytics to one compact JSON artifact. The standalone
+and lite apps read it back with load_snapshot(), which needs only the standard
+library, so they start in milliseconds and still show the dataset's numbers.
+
+Run from the energy_dashboard directory:
+    python snapshot.py
+    python snapshot.py --data ../energydata_complete.csv --output dashboard_snapshot.json
+"""
+
+import argparse
+import datetime
+import gzip
+import json
+import os
+import time
+
+from config import DATA_PATH, MODEL_CONFIG, SNAPSHOT_CONFIG, ANOMALY_CONFIG, LITE_DASHBOARD_CONFIG
+
+SNAPSHOT_VERSION = 1
+
+# Readings are taken every 10 minutes
+READINGS_PER_DAY = 6 * 24
+
+# Time-of-day bands used for the lite dashboard breakdown (the dataset has
+# whole-house appliance energy only, not per-room consumption)
+PERIODS = (
+    ('Night (00-06)', 0, 6),
+    ('Morning (06-12)', 6, 12),
+    ('Afternoon (12-18)', 12, 18),
+    ('Evening (18-24)', 18, 24)
+)
+
+
+def load_snapshot(path=None):
+    """Read a snapshot written by build_snapshot(); .gz paths are decompressed"""
+    path = path or SNAPSHOT_CONFIG['path']
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        snapshot = json.load(f)
+    if snapshot.get('version') != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {snapshot.get('version')} in {path}")
+    return snapshot
+
+
+def predict_by_hour(model):
+    """Model prediction and [lower, upper] interval for each hour of the day with
+    every other feature at its mean"""
+    import pandas as pd
+
+    rows = pd.DataFrame([model.feature_vector({'hour': hour}) for hour in range(24)],
+                        columns=model.feature_columns)
+    prediction, lower, upper = model.predict_interval(rows)
+    return ([round(float(value), 2) for value in prediction],
+            [[round(float(lo), 2), round(float(hi), 2)] for lo, hi in zip(lower, upper)])
+
+
+def detect_anomalies(df, model):
+    """Anomaly detector run over the whole history with one batch prediction"""
+    from anomalies import AnomalyDetector
+
+    detector = AnomalyDetector(**ANOMALY_CONFIG)
+    predictions = model.predict_batch(df[model.feature_columns].fillna(model.feature_means))
+    detector.update(df['date'].dt.strftime('%Y-%m-%d %H:%M').tolist(), df['hour'].to_numpy(),
+                    df['Appliances'].to_numpy(), predictions)
+    return detector
+
+
+def lite_alerts(alerts):
+    """Detector alerts in the shape advanced_dashboard.html renders"""
+    return [
+        {'level': 'warning' if alert['kind'] == 'residual' else 'info',
+         'message': alert['message'], 'time': alert['time']}
+        for alert in alerts
+    ]
+
+
+def build_lite_analytics(summary, hourly, daily, cost_per_kwh, alerts):
+    """Overview, breakdowns and alerts in the shape advanced_dashboard.html renders
+
+    Built from the /api/summary, /api/hourly-avg and /api/daily-avg bodies, so the
+    snapshot and the lite dashboard's live view are shaped by the same code.
+    """
+    mean_wh = float(summary['appliances']['mean'])
+    total_wh = mean_wh * summary['total_records']
+    hourly_means = dict(zip(hourly['hours'], hourly['appliances']))
+    peak_hour = max(hourly_means, key=hourly_means.get)
+
+    # Every hour holds the same number of readings, so a band's share of the
+    # energy is its share of the summed hourly means
+    all_hours = sum(hourly_means.values()) or 1.0
+    periods = []
+    for name, start, end in PERIODS:
+        band = [value for hour, value in hourly_means.items() if start <= hour < end]
+        share = sum(band) / all_hours
+        periods.append({
+            'room': name,
+            'consumption': round(total_wh * share / 1000, 1),
+            'percentage': round(100 * share, 1),
+            'efficiency': 'Good' if band and sum(band) / len(band) <= mean_wh else 'High'
+        })
+
+    return {
+        'overview': {
+            'total_energy_consumed': round(total_wh / 1000, 2),
+            'average_daily_consumption': round(mean_wh * READINGS_PER_DAY / 1000, 2),
+            'peak_hour': int(peak_hour),
+            'peak_consumption': round(float(hourly_means[peak_hour]), 2),
+            # Share of hours whose average use stays at or below the overall mean
+            'efficiency_score': round(100 * sum(v <= mean_wh for v in hourly_means.values()) / 24, 1),
+            'cost_per_kwh': cost_per_kwh,
+            'estimated_monthly_cost': round(mean_wh * READINGS_PER_DAY * 30 / 1000 * cost_per_kwh, 2)
+        },
+        'daily_breakdown': [
+            {'date': d, 'consumption': float(a), 'lights': float(l)}
+            for d, a, l in zip(daily['dates'], daily['appliances'], daily['lights'])
+        ],
+        'hourly_breakdown': [
+            {'hour': int(h), 'consumption': float(a), 'lights': float(l)}
+            for h, a, l in zip(hourly['hours'], hourly['appliances'], hourly['lights'])
+        ],
+        'room_analysis': periods,
+        'alerts': lite_alerts(alerts)
+    }
+
+
+def build_snapshot(data_path=None):
+    """Compute the snapshot dict from the dataset (needs pandas and scikit-learn)"""
+    from aggregates import (
+        build_summary, build_hourly, build_daily, build_top_consumers, build_model_info
+    )
+    from http_cache import file_fingerprint
+    from serialization import dumps
+    from utils import EnergyDataHandler, EnergyPredictionModel
+
+    data_path = data_path or DATA_PATH
+    df = EnergyDataHandler(data_path).load_data()
+    model = EnergyPredictionModel(df)
+    metrics = model.train()
+
+    decimals = SNAPSHOT_CONFIG['decimals']
+    hourly = build_hourly(df, decimals=decimals)
+    snapshot = {
+        'version': SNAPSHOT_VERSION,
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'source': {
+            'path': os.path.basename(data_path),
+            'fingerprint': file_fingerprint(data_path),
+            'rows': int(len(df))
+        },
+        'summary': build_summary(df),
+        'hourly': hourly,
+        'daily': build_daily(df, decimals=decimals),
+        'top_consumers': build_top_consumers(df),
+        'model_info': build_model_info(
+            {'train_score': float(metrics['train_r2']), 'test_score': float(metrics['test_r2'])},
+            MODEL_CONFIG['n_estimators']
+        ),
+        'interval_coverage': model.intervals.coverage
+    }
+    snapshot['prediction_by_hour'], snapshot['interval_by_hour'] = predict_by_hour(model)
+    # Round-trip through the app serializer so numpy arrays become plain lists
+    snapshot = json.loads(dumps(snapshot))
+    alerts = detect_anomalies(df, model).recent(LITE_DASHBOARD_CONFIG['alerts'])
+    snapshot['lite_analytics'] = build_lite_analytics(
+        snapshot['summary'], snapshot['hourly'], snapshot['daily'], SNAPSHOT_CONFIG['cost_per_kwh'], alerts
+    )
+    return snapshot
+
+
+def write_snapshot(snapshot, path):
+    """Write compact JSON, gzip-compressed when `path` ends in .gz"""
+    opener = gzip.open if path.endswith('.gz') else open
+    tmp_path = path + '.tmp'
+    with opener(tmp_path, 'wt', encoding='utf-8') as f:
+        json.dump(snapshot, f, separators=(',', ':'))
+    # Readers never see a half-written file
+    os.replace(tmp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--data', default=DATA_PATH, help='Source CSV')
+    parser.add_argument('--output', default=SNAPSHOT_CONFIG['path'], help='Snapshot path (.json or .json.gz)')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    snapshot = build_snapshot(args.data)
+    write_snapshot(snapshot, args.output)
+    print(f"Snapshot of {snapshot['source']['rows']} rows written to {args.output} "
+          f"({os.path.getsize(args.output) / 1024:.1f} KiB) in {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    load_snapshot(args.output)
+    print(f"Loads in {(time.perf_counter() - started) * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
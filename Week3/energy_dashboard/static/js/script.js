@@ -4,11 +4,8 @@ let dailyChart = null;
 
 // Initialize on page load
 document.addEventListener('DOMContentLoaded', () => {
-    loadSummary();
-    loadHourlyData();
-    loadDailyData();
-    loadTopConsumers();
-    loadModelInfo();
+    loadDashboard();
+    setupLiveUpdates();
     setupNavigation();
     setupPredictionForm();
 });
@@ -44,12 +41,54 @@ function scrollToSection(sectionId) {
     }
 }
 
+// Load every section from the combined /api/dashboard payload in one round
+// trip; fall back to the per-section endpoints if it is unavailable
+async function loadDashboard() {
+    let data;
+    try {
+        const response = await axios.get('/api/dashboard');
+        data = response.data;
+    } catch (error) {
+        console.error('Error loading dashboard, falling back to per-section requests:', error);
+        loadSummary();
+        loadHourlyData();
+        loadDailyData();
+        loadTopConsumers();
+        loadModelInfo();
+        return;
+    }
+
+    renderSummary(data.summary);
+    renderHourlyData(data.hourly);
+    renderDailyData(data.daily);
+    renderTopConsumers(data.top_consumers);
+    renderModelInfo(data.model_info);
+}
+
+// Re-render sections when the server pushes changed aggregates
+function setupLiveUpdates() {
+    if (!window.EventSource) {
+        return;
+    }
+
+    const source = new EventSource('/api/stream');
+    source.addEventListener('summary', (event) => renderSummary(JSON.parse(event.data)));
+    source.addEventListener('hourly', (event) => renderHourlyData(JSON.parse(event.data)));
+    source.addEventListener('daily', (event) => renderDailyData(JSON.parse(event.data)));
+}
+
 // Load summary data
 async function loadSummary() {
     try {
         const response = await axios.get('/api/summary');
-        const data = response.data;
+        renderSummary(response.data);
+    } catch (error) {
+        console.error('Error loading summary:', error);
+    }
+}
 
+function renderSummary(data) {
+    try {
         // Update stat cards
         document.getElementById('avgAppliances').textContent = data.appliances.mean.toFixed(2);
         document.getElementById('avgLights').textContent = data.lights.mean.toFixed(2);
@@ -81,7 +120,7 @@ async function loadSummary() {
             </div>
         `;
     } catch (error) {
-        console.error('Error loading summary:', error);
+        console.error('Error rendering summary:', error);
     }
 }
 
@@ -89,8 +128,14 @@ async function loadSummary() {
 async function loadHourlyData() {
     try {
         const response = await axios.get('/api/hourly-avg');
-        const data = response.data;
+        renderHourlyData(response.data);
+    } catch (error) {
+        console.error('Error loading hourly data:', error);
+    }
+}
 
+function renderHourlyData(data) {
+    try {
         const ctx = document.getElementById('hourlyChart').getContext('2d');
 
         if (hourlyChart) {
@@ -152,7 +197,7 @@ async function loadHourlyData() {
             }
         });
     } catch (error) {
-        console.error('Error loading hourly data:', error);
+        console.error('Error rendering hourly data:', error);
     }
 }
 
@@ -160,8 +205,14 @@ async function loadHourlyData() {
 async function loadDailyData() {
     try {
         const response = await axios.get('/api/daily-avg');
-        const data = response.data;
+        renderDailyData(response.data);
+    } catch (error) {
+        console.error('Error loading daily data:', error);
+    }
+}
 
+function renderDailyData(data) {
+    try {
         // Show only last 30 days
         const lastDays = 30;
         const dates = data.dates.slice(-lastDays);
@@ -219,7 +270,7 @@ async function loadDailyData() {
             }
         });
     } catch (error) {
-        console.error('Error loading daily data:', error);
+        console.error('Error rendering daily data:', error);
     }
 }
 
@@ -227,8 +278,14 @@ async function loadDailyData() {
 async function loadTopConsumers() {
     try {
         const response = await axios.get('/api/top-consumers');
-        const data = response.data;
+        renderTopConsumers(response.data);
+    } catch (error) {
+        console.error('Error loading top consumers:', error);
+    }
+}
 
+function renderTopConsumers(data) {
+    try {
         const consumersGrid = document.getElementById('consumersGrid');
         consumersGrid.innerHTML = data.map((room, index) => `
             <div class="consumer-card" style="animation-delay: ${index * 0.1}s;">
@@ -239,7 +296,7 @@ async function loadTopConsumers() {
             </div>
         `).join('');
     } catch (error) {
-        console.error('Error loading top consumers:', error);
+        console.error('Error rendering top consumers:', error);
     }
 }
 
@@ -285,8 +342,14 @@ function setupPredictionForm() {
 async function loadModelInfo() {
     try {
         const response = await axios.get('/api/model-info');
-        const data = response.data;
+        renderModelInfo(response.data);
+    } catch (error) {
+        console.error('Error loading model info:', error);
+    }
+}
 
+function renderModelInfo(data) {
+    try {
         const modelInfo = document.getElementById('modelInfo');
         modelInfo.innerHTML = `
             <p><strong>Model Type:</strong> ${data.model_type}</p>
@@ -296,6 +359,6 @@ async function loadModelInfo() {
             <p><small>Using Random Forest with 100 trees for accurate predictions</small></p>
         `;
     } catch (error) {
-        console.error('Error loading model info:', error);
+        console.error('Error rendering model info:', error);
     }
 }
@@ -0,0 +1,252 @@
+"""
+Synthetic energy dataset generator for scale testing
+
+Fits per-column annual seasonality, hour-of-day x weekday profiles and
+correlated AR(1) residuals from energydata_complete.csv, then writes
+multi-house, multi-year datasets with the same schema in chunks, so memory
+stays flat however many rows are produced. Without a house_id column the
+houses are written one after another in time, so timestamps stay unique.
+
+Run from the energy_dashboard directory:
+    python synthetic_data.py --houses 20 --years 5 --output ../synthetic_energy.csv
+    python synthetic_data.py --rows 10000000 --format parquet --output ../synthetic_energy.parquet
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.parquet as pq  # type: ignore
+except Exception:
+    pa = pq = None
+
+from config import DATA_PATH
+
+logger = logging.getLogger(__name__)
+
+DATE_FORMAT = '%d-%m-%Y %H:%M'
+STEP = pd.Timedelta(minutes=10)
+ROWS_PER_YEAR = 52560  # 10-minute readings in 365 days
+
+SCHEMA = [
+    'date', 'Appliances', 'lights',
+    'T1', 'RH_1', 'T2', 'RH_2', 'T3', 'RH_3', 'T4', 'RH_4', 'T5', 'RH_5',
+    'T6', 'RH_6', 'T7', 'RH_7', 'T8', 'RH_8', 'T9', 'RH_9',
+    'T_out', 'Press_mm_hg', 'RH_out', 'Windspeed', 'Visibility', 'Tdewpoint',
+    'rv1', 'rv2'
+]
+
+# Outdoor readings are shared climate, so houses do not get their own offset
+WEATHER_COLUMNS = {'T6', 'RH_6', 'T_out', 'Press_mm_hg', 'RH_out', 'Windspeed', 'Visibility', 'Tdewpoint'}
+
+# Physical quantities that cannot go below zero (temperatures and dew point can)
+NON_NEGATIVE_COLUMNS = {'lights', 'Press_mm_hg', 'Windspeed', 'Visibility'} | {
+    col for col in SCHEMA if col.startswith('RH_')}
+
+
+def seasonal_design(dates):
+    """Annual harmonic regressors for a DatetimeIndex or datetime Series"""
+    doy = pd.DatetimeIndex(dates).dayofyear.to_numpy(dtype=np.float64)
+    angle = 2 * np.pi * doy / 365.25
+    return np.column_stack([np.ones_like(angle), np.cos(angle), np.sin(angle)])
+
+
+def ar1_filter(shocks, phi, state, block=32):
+    """AR(1) residuals r[t] = phi * r[t - 1] + shocks[t] per column, from r[-1] = state.
+
+    Rows are filtered in blocks: each column's blocks from a zero start with
+    one matrix product, then the state carried between blocks is added.
+    """
+    n, m = shocks.shape
+    blocks = -(-n // block)
+    padded = np.zeros((m, blocks * block))
+    padded[:, :n] = shocks.T
+    lag = np.arange(block)[:, None] - np.arange(block)
+    local = np.empty((m, blocks, block))
+    for j in range(m):
+        # kernel[i, k] = phi ** (i - k) on and below the diagonal
+        kernel = np.where(lag >= 0, phi[j] ** np.maximum(lag, 0), 0.0)
+        local[j] = padded[j].reshape(blocks, block) @ kernel.T
+
+    # State entering each block, then its decayed effect on every row of the block
+    carries = np.empty((blocks, m))
+    carry = np.asarray(state, dtype=np.float64)
+    phi_block = phi ** block
+    for b in range(blocks):
+        carries[b] = carry
+        carry = phi_block * carry + local[:, b, -1]
+    decay = phi[:, None] ** np.arange(1, block + 1)
+    local += carries.T[:, :, None] * decay[:, None, :]
+    return local.reshape(m, -1)[:, :n].T
+
+
+def profile_index(dates):
+    """Hour-of-day x weekday cell for each timestamp"""
+    index = pd.DatetimeIndex(dates)
+    return index.hour.to_numpy() * 7 + index.dayofweek.to_numpy()
+
+
+class SyntheticEnergyGenerator:
+    """Generate realistic energy readings fitted on a source dataset"""
+
+    def __init__(self, source, seed=42):
+        self.seed = seed
+        self.columns = [col for col in SCHEMA if col not in ('date', 'rv1', 'rv2')]
+        self._fit(source)
+
+    def _fit(self, df):
+        """Fit seasonality, daily/weekly profiles and residual dynamics"""
+        dates = df['date']
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates = pd.to_datetime(dates, format=DATE_FORMAT)
+        values = df[self.columns].astype(np.float64).to_numpy().copy()
+        # Appliances is heavy tailed; model it on the log scale
+        values[:, 0] = np.log(np.maximum(values[:, 0], 10))
+
+        design = seasonal_design(dates)
+        self.seasonal_coef = np.linalg.lstsq(design, values, rcond=None)[0]
+        resid = values - design @ self.seasonal_coef
+
+        cells = profile_index(dates)
+        self.profile = np.zeros((24 * 7, len(self.columns)))
+        counts = np.bincount(cells, minlength=24 * 7)
+        for j in range(len(self.columns)):
+            sums = np.bincount(cells, weights=resid[:, j], minlength=24 * 7)
+            self.profile[:, j] = np.divide(sums, counts, out=np.zeros(24 * 7), where=counts > 0)
+        resid = resid - self.profile[cells]
+
+        lagged, current = resid[:-1], resid[1:]
+        std = resid.std(axis=0)
+        self.phi = np.clip(
+            ((lagged - lagged.mean(0)) * (current - current.mean(0))).mean(0) / np.maximum(std ** 2, 1e-12),
+            0.0, 0.999
+        )
+        innovations = current - self.phi * lagged
+        self.innovation_chol = np.linalg.cholesky(
+            np.cov(innovations, rowvar=False) + np.eye(len(self.columns)) * 1e-9
+        )
+        self.resid_std = std
+
+        low, high = values.min(axis=0), values.max(axis=0)
+        margin = (high - low) * 0.1
+        self.bounds = (low - margin, high + margin)
+        for j, col in enumerate(self.columns):
+            if col in NON_NEGATIVE_COLUMNS:
+                self.bounds[0][j] = max(self.bounds[0][j], 0.0)
+            if col.startswith('RH_'):
+                self.bounds[1][j] = min(self.bounds[1][j], 100.0)
+
+    def _house_offsets(self, rng):
+        """Per-house level shifts: building size, thermostat and humidity habits"""
+        offsets = rng.normal(0, 0.25 * self.resid_std)
+        offsets[0] = rng.normal(0, 0.3)  # log-scale consumption multiplier
+        for j, col in enumerate(self.columns):
+            if col in WEATHER_COLUMNS:
+                offsets[j] = 0.0
+        return offsets
+
+    def generate_house(self, house, start, periods, chunk_rows=500000):
+        """Yield DataFrames of `chunk_rows` readings for one house"""
+        rng = np.random.default_rng([self.seed, house])
+        offsets = self._house_offsets(rng)
+        state = rng.normal(0, self.resid_std)
+        start = pd.Timestamp(start)
+
+        for first in range(0, periods, chunk_rows):
+            n = min(chunk_rows, periods - first)
+            dates = pd.date_range(start + STEP * first, periods=n, freq=STEP)
+
+            shocks = rng.standard_normal((n, len(self.columns))) @ self.innovation_chol.T
+            resid = ar1_filter(shocks, self.phi, state)
+            state = resid[-1]
+
+            values = (seasonal_design(dates) @ self.seasonal_coef
+                      + self.profile[profile_index(dates)] + offsets + resid)
+            values = np.clip(values, *self.bounds)
+
+            chunk = pd.DataFrame(np.round(values, 4), columns=self.columns)
+            chunk['Appliances'] = (np.round(np.exp(values[:, 0]) / 10) * 10).clip(10).astype(np.int64)
+            chunk['lights'] = (np.round(values[:, 1] / 10) * 10).astype(np.int64)
+            chunk['rv1'] = np.round(rng.uniform(0, 50, n), 4)
+            chunk['rv2'] = chunk['rv1']
+            chunk.insert(0, 'date', dates)
+            yield chunk[SCHEMA]
+
+    def write(self, path, houses=1, periods=ROWS_PER_YEAR, start='2016-01-11 17:00', fmt='csv',
+              chunk_rows=500000, house_column=False):
+        """Write `periods` readings for each of `houses` houses; returns rows written.
+
+        With `house_column` every house covers the same period from `start`;
+        without it, house h starts where house h - 1 ended, so no timestamp repeats.
+        """
+        if fmt == 'parquet' and pq is None:
+            raise RuntimeError("Parquet output needs pyarrow: python -m pip install pyarrow")
+        writer = None
+        total = 0
+        try:
+            for house in range(houses):
+                house_start = pd.Timestamp(start) + (0 if house_column else house * periods) * STEP
+                for chunk in self.generate_house(house, house_start, periods, chunk_rows):
+                    if house_column:
+                        chunk.insert(1, 'house_id', house)
+                    if fmt == 'parquet':
+                        table = pa.Table.from_pandas(chunk, preserve_index=False)
+                        if writer is None:
+                            writer = pq.ParquetWriter(path, table.schema)
+                        writer.write_table(table)
+                    else:
+                        chunk['date'] = chunk['date'].dt.strftime(DATE_FORMAT)
+                        chunk.to_csv(path, mode='w' if total == 0 else 'a',
+                                     header=total == 0, index=False)
+                    total += len(chunk)
+                    logger.info(f"House {house}: {total:,} rows written")
+        finally:
+            if writer is not None:
+                writer.close()
+        return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic energy dataset')
+    parser.add_argument('--source', default=DATA_PATH, help='CSV to fit profiles from')
+    parser.add_argument('--output', required=True)
+    parser.add_argument('--houses', type=int, default=1)
+    parser.add_argument('--years', type=float, default=1.0, help='Years of readings per house')
+    parser.add_argument('--rows', type=int, help='Total rows (rounded up to whole houses); overrides --years')
+    parser.add_argument('--start', default='2016-01-11 17:00')
+    parser.add_argument('--format', default=None, choices=['csv', 'parquet'],
+                        help='Defaults to the output file extension')
+    parser.add_argument('--chunk-rows', type=int, default=500000)
+    parser.add_argument('--house-column', action='store_true',
+                        help="Add a 'house_id' column (changes the schema)")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    fmt = args.format or ('parquet' if args.output.endswith('.parquet') else 'csv')
+    if args.rows:
+        periods = -(-args.rows // args.houses)
+    else:
+        periods = int(round(args.years * ROWS_PER_YEAR))
+
+    if not os.path.exists(args.source):
+        print(f"Error: source data not found at {args.source}")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    generator = SyntheticEnergyGenerator(pd.read_csv(args.source), seed=args.seed)
+    rows = generator.write(args.output, houses=args.houses, periods=periods, start=args.start,
+                           fmt=fmt, chunk_rows=args.chunk_rows, house_column=args.house_column)
+    print(f"Wrote {rows:,} rows to {args.output} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+"""Shared fixtures; tests import the dashboard modules from the parent directory"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic_data import SCHEMA, DATE_FORMAT  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def energy_frame():
+    """Small random frame with the UCI schema and a learnable Appliances target"""
+    rng = np.random.default_rng(0)
+    n = 3000
+    dates = pd.date_range('2016-01-11 17:00', periods=n, freq='10min')
+    frame = pd.DataFrame({col: rng.normal(20, 5, n) for col in SCHEMA[2:]})
+    frame['lights'] = rng.integers(0, 8, n) * 10
+    frame['Appliances'] = (50 + 40 * np.sin(dates.hour.to_numpy() / 24 * 2 * np.pi)
+                           + 3 * frame['T1'] + rng.gamma(2, 20, n)).round()
+    frame['date'] = dates.strftime(DATE_FORMAT)
+    return frame[SCHEMA]
+
+
+@pytest.fixture(scope='session')
+def energy_csv(energy_frame, tmp_path_factory):
+    path = tmp_path_factory.mktemp('data') / 'energy.csv'
+    energy_frame.to_csv(path, index=False)
+    return str(path)
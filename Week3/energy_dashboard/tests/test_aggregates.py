@@ -0,0 +1,46 @@
+import threading
+
+import pytest
+
+from aggregates import AggregateCache
+
+
+def test_builds_once_per_version_and_outside_the_lock():
+    cache = AggregateCache()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append('slow')
+        started.set()
+        release.wait(5)
+        return 'slow value'
+
+    results = []
+    waiters = [threading.Thread(target=lambda: results.append(cache.get('v1', 'slow', slow)))
+               for _ in range(4)]
+    for thread in waiters:
+        thread.start()
+    assert started.wait(5)
+    # Another aggregate is served while the slow one is still building
+    assert cache.get('v1', 'fast', lambda: 'fast value') == 'fast value'
+
+    release.set()
+    for thread in waiters:
+        thread.join(5)
+    assert results == ['slow value'] * 4
+    assert calls == ['slow']
+    assert cache.get('v1', 'slow', slow) == 'slow value'
+    assert cache.get('v2', 'slow', lambda: 'rebuilt') == 'rebuilt'
+
+
+def test_failed_build_is_not_cached():
+    cache = AggregateCache()
+
+    def broken():
+        raise RuntimeError('boom')
+
+    with pytest.raises(RuntimeError):
+        cache.get('v1', 'summary', broken)
+    assert cache.get('v1', 'summary', lambda: 'ok') == 'ok'
@@ -0,0 +1,146 @@
+import asyncio
+import json
+
+import pytest
+from starlette.routing import Match, Mount
+
+import app as flask_app
+import app_asgi
+import energy_api
+
+
+@pytest.fixture(scope='module')
+def warmed(energy_csv):
+    energy_api.DATA_PATH = energy_csv
+    energy_api.load_and_prepare_data()
+    energy_api.train_model()
+    energy_api.precompute_aggregates()
+    return flask_app.app.test_client()
+
+
+def asgi_request(method, path, body=None, headers=()):
+    """(status, parsed JSON body) of one request to the ASGI app, without a server"""
+    return asgi_response(method, path, body, headers)[::2]
+
+
+def asgi_response(method, path, body=None, headers=()):
+    """(status, headers, parsed JSON body) of one request to the ASGI app"""
+    payload = b'' if body is None else json.dumps(body).encode()
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': method, 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+        'root_path': '', 'query_string': b'', 'server': ('testserver', 80), 'client': ('127.0.0.1', 1),
+        'headers': [(b'host', b'testserver'), (b'content-type', b'application/json'),
+                    (b'content-length', str(len(payload)).encode()), *headers]
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': payload, 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app_asgi.app(scope, receive, send))
+    start = next(m for m in messages if m['type'] == 'http.response.start')
+    content = b''.join(m.get('body', b'') for m in messages if m['type'] == 'http.response.body')
+    response_headers = {k.decode(): v.decode() for k, v in start['headers']}
+    return start['status'], response_headers, json.loads(content) if content else None
+
+
+def flask_routes():
+    return {rule.rule: rule.methods - {'HEAD', 'OPTIONS'}
+            for rule in flask_app.app.url_map.iter_rules() if rule.endpoint != 'static'}
+
+
+def test_asgi_serves_every_flask_route():
+    routes = flask_routes()
+    native = {route.path: route.methods - {'HEAD'}
+              for route in app_asgi.app.routes if not isinstance(route, Mount)}
+    for path, methods in native.items():
+        assert routes.get(path) == methods, path
+
+    for path, methods in routes.items():
+        for method in methods:
+            scope = {'type': 'http', 'path': path, 'method': method}
+            matched = next(route for route in app_asgi.app.routes
+                           if route.matches(scope)[0] == Match.FULL)
+            assert isinstance(matched, Mount) or matched.path == path, (method, path)
+
+
+def test_predict_response_matches(warmed):
+    body = {'T1': 21.5, 'hour': 18}
+    expected = warmed.post('/api/predict', json=body).get_json()
+    status, result = asgi_request('POST', '/api/predict', body)
+
+    assert status == 200
+    assert result.keys() == expected.keys()
+    assert result['interval'].keys() == expected['interval'].keys()
+    assert result['prediction'] == pytest.approx(expected['prediction'])
+
+
+def test_delegated_routes_and_bad_rows(warmed):
+    for path in ('/readyz', '/api/alerts', '/api/correlation'):
+        status, _ = asgi_request('GET', path)
+        assert status == warmed.get(path).status_code == 200, path
+
+    assert warmed.get('/api/alerts?limit=-1').status_code == 400
+    assert len(warmed.get('/api/alerts?limit=0').get_json()['alerts']) == 0
+
+    bad = {'T1': 'inf'}
+    assert warmed.post('/api/predict', json=bad).status_code == 400
+    assert asgi_request('POST', '/api/predict', bad)[0] == 400
+
+
+def test_aggregates_keep_http_caching_and_metrics(warmed):
+    status, headers, body = asgi_response('GET', '/api/summary')
+    assert status == 200 and body == warmed.get('/api/summary').get_json()
+    etag = headers['etag']
+    status, _, _ = asgi_response('GET', '/api/summary', headers=[(b'if-none-match', etag.encode())])
+    assert status == 304
+
+    asgi_request('POST', '/api/predict', {'T1': 20.0})
+    scrape = warmed.get('/metrics').get_data(as_text=True)
+    assert 'endpoint="/api/predict",status="200"' in scrape
+
+
+def test_native_stream_receives_published_events():
+    hub = energy_api.update_hub
+
+    async def first_event():
+        stream = hub.astream()
+        assert (await stream.__anext__()).startswith(b'retry:')
+        # Published from another thread, as the Flask handlers do
+        await asyncio.get_running_loop().run_in_executor(None, hub.publish, 'probe', {'n': 1})
+        while True:
+            frame = await asyncio.wait_for(stream.__anext__(), 5)
+            if b'event: probe' in frame:
+                break
+        clients = hub.client_count
+        await stream.aclose()
+        return frame, clients
+
+    frame, clients = asyncio.run(first_event())
+    assert b'data: {"n":1}' in frame
+    assert clients >= 1
+    assert hub.client_count == clients - 1
+
+
+def test_readings_are_buffered_and_published_once(warmed, monkeypatch):
+    published = []
+    monkeypatch.setattr(energy_api, 'publish_aggregates', lambda: published.append(1))
+    monkeypatch.setitem(energy_api.READINGS_CONFIG, 'publish_interval_s', 0.2)
+    before = warmed.get('/api/summary').get_json()['total_records']
+    frame = energy_api.df
+
+    for minute in range(3):
+        body = warmed.post('/api/readings', json={'date': f'01-02-2016 10:0{minute}',
+                                                  'Appliances': 60.0, 'T1': 21.0}).get_json()
+        assert body['total_records'] == before + minute + 1
+    # Buffered, not concatenated per reading
+    assert energy_api.df is frame and energy_api.pending_rows == 3
+
+    energy_api.publish_timer.join(5)
+    assert published == [1]
+    assert warmed.get('/api/summary').get_json()['total_records'] == before + 3
+    assert energy_api.pending_rows == 0
@@ -0,0 +1,12 @@
+import app_standalone
+
+
+def test_predict_rejects_missing_or_non_object_bodies():
+    client = app_standalone.app.test_client()
+
+    assert client.post('/api/predict').status_code == 400
+    assert client.post('/api/predict', json=[1, 2]).status_code == 400
+    assert client.post('/api/predict', json={'hour': 'noon'}).status_code == 400
+
+    body = client.post('/api/predict', json={'hour': 18}).get_json()
+    assert body['prediction'] == app_standalone.SNAPSHOT['prediction_by_hour'][18]
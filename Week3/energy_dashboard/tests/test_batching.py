@@ -0,0 +1,68 @@
+import threading
+from concurrent.futures import TimeoutError as FutureTimeout
+
+import numpy as np
+import pytest
+
+from batching import MicroBatcher
+
+
+def predict_sum(X):
+    if (X < 0).any():
+        raise ValueError("negative feature")
+    return X.sum(axis=1)
+
+
+def test_bad_row_fails_only_its_own_request():
+    batcher = MicroBatcher(predict_sum, max_batch_size=2, max_wait_ms=1000)
+    good = batcher.submit([1.0, 2.0])
+    bad = batcher.submit([-1.0, 2.0])
+
+    assert good.result(timeout=5) == 3.0
+    with pytest.raises(ValueError, match='negative feature'):
+        bad.result(timeout=5)
+    assert batcher.stats()['batches'] == 1
+
+
+@pytest.mark.parametrize('row', [[1.0, np.inf], [1.0, np.nan], [1.0, 'abc'], [[1.0, 2.0]]])
+def test_submit_rejects_unusable_rows(row):
+    batcher = MicroBatcher(predict_sum)
+    with pytest.raises(ValueError):
+        batcher.submit(row)
+    assert batcher.pending == 0
+
+
+def test_batcher_survives_results_it_cannot_convert():
+    calls = []
+
+    def predict_broken(X):
+        calls.append(len(X))
+        # First call returns the wrong number of results, later ones are fine
+        return X.sum(axis=1)[:1] if len(calls) == 1 else X.sum(axis=1)
+
+    batcher = MicroBatcher(predict_broken, max_batch_size=2, max_wait_ms=1000)
+    first = batcher.submit([1.0, 1.0])
+    second = batcher.submit([2.0, 2.0])
+    assert first.result(timeout=5) == 2.0
+    assert second.result(timeout=5) == 4.0
+    assert batcher.predict([3.0, 3.0], timeout=5) == 6.0
+
+
+def test_cancelled_request_does_not_stop_the_batcher():
+    batcher = MicroBatcher(predict_sum, max_batch_size=2, max_wait_ms=200)
+    cancelled = batcher.submit([1.0, 1.0])
+    assert cancelled.cancel()
+    assert batcher.predict([2.0, 2.0], timeout=5) == 4.0
+
+
+def test_predict_times_out():
+    gate = threading.Event()
+
+    def predict_slow(X):
+        gate.wait(5)
+        return X.sum(axis=1)
+
+    batcher = MicroBatcher(predict_slow, max_wait_ms=0, timeout_s=0.05)
+    with pytest.raises(FutureTimeout):
+        batcher.predict([1.0, 1.0])
+    gate.set()
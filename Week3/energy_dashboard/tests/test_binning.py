@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from binning import density_grid, histogram, linear_fit
+
+
+def test_histogram_counts_every_finite_value():
+    values = np.array([0.0, 1.0, 1.0, 2.0, 4.0, np.nan, np.inf])
+    result = histogram(values, bins=4)
+
+    assert result['counts'].tolist() == [1, 2, 1, 1]
+    np.testing.assert_allclose(result['edges'], [0, 1, 2, 3, 4])
+    np.testing.assert_allclose(result['centers'], [0.5, 1.5, 2.5, 3.5])
+    np.testing.assert_allclose(result['widths'], 1.0)
+
+
+def test_density_grid_is_indexed_by_y_then_x():
+    x = np.array([0.0, 0.0, 1.0, np.nan])
+    y = np.array([0.0, 1.0, 1.0, 5.0])
+    result = density_grid(x, y, bins=2)
+
+    assert result['counts'].shape == (2, 2)
+    # Rows are y bins, columns x bins; the row with a NaN x is dropped
+    assert result['counts'].tolist() == [[1, 0], [1, 1]]
+    assert result['counts'].sum() == 3
+
+
+def test_linear_fit_recovers_the_line_and_ignores_non_finite_rows():
+    x = np.linspace(0, 10, 50)
+    y = 3 * x - 2
+    fit = linear_fit(np.append(x, np.nan), np.append(y, 1.0))
+
+    assert fit['slope'] == pytest.approx(3)
+    assert fit['intercept'] == pytest.approx(-2)
+    assert fit['r2'] == pytest.approx(1)
+    assert fit['x_range'] == [0.0, 10.0]
+    assert linear_fit(x, np.full_like(x, 4.0))['r2'] == 0.0
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from correlation import CorrelationStore
+
+
+def test_incremental_updates_match_dataframe_corr(energy_frame):
+    frame = energy_frame.drop(columns='date').copy()
+    # A large mean exercises the shifted accumulation
+    frame['Press_mm_hg'] += 750
+
+    store = CorrelationStore.from_frame(frame.iloc[:1000])
+    for start in range(1000, len(frame), 700):
+        store.update(frame.iloc[start:start + 700])
+
+    assert store.n == len(frame)
+    np.testing.assert_allclose(store.frame().to_numpy(), frame.corr().to_numpy(), atol=1e-10)
+
+    subset = ['T1', 'Appliances', 'Press_mm_hg']
+    np.testing.assert_allclose(store.corr(subset), frame[subset].corr().to_numpy(), atol=1e-10)
+
+
+def test_incomplete_rows_are_skipped(energy_frame):
+    frame = energy_frame.drop(columns='date').copy()
+    frame.loc[frame.index[:10], 'T2'] = np.nan
+
+    store = CorrelationStore.from_frame(frame)
+    assert store.skipped == 10
+    np.testing.assert_allclose(store.frame().to_numpy(), frame.dropna().corr().to_numpy(), atol=1e-10)
+
+
+def test_constant_columns_and_unknown_columns(energy_frame):
+    frame = energy_frame[['T1', 'Appliances']].assign(flat=1.0)
+    store = CorrelationStore.from_frame(frame)
+
+    payload = store.payload()
+    assert payload['matrix'][2] == [None, None, None]
+    assert payload['matrix'][0][0] == 1.0
+    with pytest.raises(ValueError):
+        store.corr(['T1', 'date'])
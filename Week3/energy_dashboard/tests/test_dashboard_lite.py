@@ -0,0 +1,81 @@
+import datetime
+import threading
+
+import dashboard_lite
+
+
+def test_fallback_fetches_only_rendered_endpoints(monkeypatch):
+    requested = []
+    snapshot = dashboard_lite.SNAPSHOT
+    endpoints = {'/api/summary': snapshot['summary'], '/api/hourly-avg': snapshot['hourly'],
+                 '/api/daily-avg': snapshot['daily']}
+
+    def fake_fetch(url, timeout=3, body=None):
+        requested.append(url)
+        return next((payload for path, payload in endpoints.items() if url.endswith(path)), None)
+
+    monkeypatch.setattr(dashboard_lite, 'fetch_json', fake_fetch)
+    analytics = dashboard_lite.build_analytics_from_api('http://api', deadline=5)
+
+    # Shaped like the snapshot's analytics, which the template renders
+    for key in ('overview', 'daily_breakdown', 'hourly_breakdown', 'room_analysis'):
+        assert analytics[key] == snapshot['lite_analytics'][key], key
+    assert not any('model-info' in url or 'model_info' in url for url in requested)
+    assert 'http://api/api/dashboard?fields=summary,hourly,daily' in requested
+
+
+def test_live_predictions_come_from_the_api(monkeypatch):
+    snapshot = dashboard_lite.SNAPSHOT
+    posted = []
+
+    def fake_fetch(url, timeout=3, body=None):
+        if body is not None:
+            posted.append(body['hour'])
+            return {'prediction': 100.0 + body['hour'], 'status': 'success',
+                    'interval': {'lower': 50.0, 'upper': 150.0, 'coverage': 0.8}}
+        if '/api/dashboard' in url:
+            return {key: snapshot[key] for key in ('summary', 'hourly', 'daily')}
+        return {'alerts': []}
+
+    monkeypatch.setattr(dashboard_lite, 'fetch_json', fake_fetch)
+    now = datetime.datetime(2016, 3, 1, 23, 30)
+    analytics = dashboard_lite.build_analytics_from_api('http://api', deadline=5, now=now)
+
+    assert posted and sorted(posted) == [0, 1, 2]
+    first = analytics['predictions'][0]
+    assert first == {'time': 'Next Hour', 'predicted': 100.0, 'lower': 50.0, 'upper': 150.0, 'coverage': 80}
+    assert analytics['alerts'] == []
+
+
+def test_failed_loads_are_cached():
+    calls = []
+    cache = dashboard_lite.AnalyticsCache(lambda: calls.append(1), ttl=30, stale_ttl=300, failure_ttl=60)
+
+    assert cache.get() is None
+    assert cache.get() is None
+    assert len(calls) == 1
+
+
+def test_cold_cache_has_a_single_refresher():
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow_loader():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {'overview': {}}
+
+    cache = dashboard_lite.AnalyticsCache(slow_loader, ttl=30, stale_ttl=300, failure_ttl=10)
+    results = []
+    first = threading.Thread(target=lambda: results.append(cache.get()))
+    first.start()
+    assert started.wait(5)
+    # Arrives while the first caller is loading: served the fallback, no second load
+    assert cache.get() is None
+    release.set()
+    first.join(5)
+
+    assert results == [{'overview': {}}]
+    assert cache.get() == {'overview': {}}
+    assert len(calls) == 1
@@ -0,0 +1,24 @@
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+
+from explain import ForestExplainer
+
+
+def test_contributions_sum_to_prediction_next_to_thresholds():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(500, 4))
+    y = X[:, 0] * 3 + X[:, 1] + rng.normal(size=500)
+    model = RandomForestRegressor(n_estimators=10, max_depth=6, random_state=0).fit(X, y)
+    explainer = ForestExplainer(model)
+
+    # Rows just above a split threshold in float64 that round onto it in float32
+    tree = model.estimators_[0].tree_
+    rows = []
+    for node in np.flatnonzero(tree.children_left != -1)[:20]:
+        row = X[0].copy()
+        row[tree.feature[node]] = np.nextafter(tree.threshold[node], np.inf)
+        rows.append(row)
+
+    for row in rows:
+        phi = explainer.shap_values(row)
+        assert np.isclose(explainer.expected_value + phi.sum(), model.predict([row])[0])
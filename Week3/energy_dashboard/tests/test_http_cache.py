@@ -0,0 +1,70 @@
+import gzip
+
+from flask import Flask, jsonify
+
+from http_cache import HttpCache
+
+
+def make_client(version):
+    app = Flask(__name__)
+    cache = HttpCache(app, version=lambda: version[0], compress_min_bytes=100)
+    calls = []
+
+    @app.route('/big')
+    @cache.cached
+    def big():
+        calls.append(1)
+        return jsonify({'values': list(range(200))})
+
+    @app.route('/small')
+    @cache.cached
+    def small():
+        return jsonify({'ok': True})
+
+    return app.test_client(), cache, calls
+
+
+def test_etag_answers_304_until_the_version_changes():
+    version = ['v1']
+    client, cache, _ = make_client(version)
+
+    first = client.get('/small')
+    etag = first.headers['ETag']
+    assert first.status_code == 200 and etag.startswith('W/')
+    assert 'Accept' in first.headers['Vary']
+
+    again = client.get('/small', headers={'If-None-Match': etag})
+    assert again.status_code == 304 and again.data == b''
+    assert again.headers['ETag'] == etag
+    assert cache.not_modified == 1
+
+    # Another representation of the same path has another ETag
+    assert client.get('/small', headers={'Accept': 'application/vnd.apache.arrow.stream'}).headers['ETag'] != etag
+
+    version[0] = 'v2'
+    changed = client.get('/small', headers={'If-None-Match': etag})
+    assert changed.status_code == 200 and changed.headers['ETag'] != etag
+
+
+def test_304_skips_the_view():
+    client, _, calls = make_client(['v1'])
+    etag = client.get('/big').headers['ETag']
+    client.get('/big', headers={'If-None-Match': etag})
+    assert len(calls) == 1
+
+
+def test_large_bodies_are_gzipped_once_per_etag():
+    client, cache, _ = make_client(['v1'])
+    plain = client.get('/big')
+    assert 'Content-Encoding' not in plain.headers
+    assert 'Accept-Encoding' in plain.headers['Vary']
+
+    for _ in range(2):
+        response = client.get('/big', headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert gzip.decompress(response.data) == plain.data
+    assert (cache.compressed_misses, cache.compressed_hits) == (1, 1)
+
+    small = client.get('/small', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in small.headers
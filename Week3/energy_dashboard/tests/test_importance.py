@@ -0,0 +1,19 @@
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+
+from importance import permutation_importance
+
+
+def test_pool_matches_in_process_and_leaves_input_unchanged():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 4)).astype(np.float32)
+    y = X[:, 0] * 3 + X[:, 1] + rng.normal(size=300)
+    model = RandomForestRegressor(n_estimators=10, max_depth=5, random_state=0).fit(X, y)
+    original = X.copy()
+
+    serial = permutation_importance(model, X, y, n_repeats=3, n_jobs=1)
+    pooled = permutation_importance(model, X, y, n_repeats=3, n_jobs=2)
+
+    assert serial == pooled
+    assert serial['features'][0]['feature'] == 'x0'
+    np.testing.assert_array_equal(X, original)
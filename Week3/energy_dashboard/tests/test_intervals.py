@@ -0,0 +1,43 @@
+import numpy as np
+
+from out_of_core import train_out_of_core
+
+
+def test_out_of_core_rounds_intervals_bracket_prediction(energy_csv):
+    result = train_out_of_core(energy_csv, chunk_rows=700, sample_rows=500, eval_rows=300, rounds=4,
+                               track_memory=False, n_estimators=20, max_depth=8, random_state=0)
+    intervals = result['intervals']
+    X = result['holdout'][0][:200]
+
+    point, lower, upper = intervals.predict(X)
+    np.testing.assert_allclose(point, result['model'].predict(X))
+    assert np.all(lower <= point) and np.all(point <= upper)
+
+    for i in range(50):
+        single = intervals.predict(X[i:i + 1])
+        np.testing.assert_allclose(single[0], point[i:i + 1])
+        assert (single[1][0], single[2][0]) == (lower[i], upper[i])
+
+
+def test_index_is_capped_per_leaf():
+    from sklearn.ensemble import RandomForestRegressor
+
+    from intervals import ForestIntervals
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(5000, 3)).astype(np.float32)
+    y = np.round(X[:, 0] * 30 + rng.normal(size=5000) * 10)
+    model = RandomForestRegressor(n_estimators=5, max_depth=3, random_state=0).fit(X, y)
+
+    capped = ForestIntervals(model, X, y, max_leaf_values=16)
+    exact = ForestIntervals(model, X, y, max_leaf_values=None)
+    leaves = sum(est.get_n_leaves() for est in model.estimators_)
+    assert len(capped.values) <= 16 * leaves < len(exact.values)
+
+    Q = rng.normal(size=(100, 3)).astype(np.float32)
+    point, lower, upper = capped.predict(Q)
+    _, exact_lower, exact_upper = exact.predict(Q)
+    assert np.all(lower <= point) and np.all(point <= upper)
+    # A 16-point summary of each leaf stays close to its exact quantiles
+    assert np.abs(lower - exact_lower).max() <= 0.1 * np.ptp(y)
+    assert np.abs(upper - exact_upper).max() <= 0.1 * np.ptp(y)
@@ -0,0 +1,54 @@
+from flask import Flask
+
+from metrics import CONTENT_TYPE, AppMetrics, Counter, Histogram
+
+
+def test_counter_renders_escaped_labels():
+    counter = Counter('jobs_total', 'Jobs run', ['queue'])
+    counter.inc('a"b\\c')
+    counter.inc('a"b\\c', amount=2)
+
+    assert counter.render().splitlines() == [
+        '# HELP jobs_total Jobs run',
+        '# TYPE jobs_total counter',
+        'jobs_total{queue="a\\"b\\\\c"} 3',
+    ]
+
+
+def test_histogram_buckets_are_cumulative_and_inclusive():
+    histogram = Histogram('latency_seconds', 'Latency', buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+
+    lines = histogram.render().splitlines()
+    assert lines[1] == '# TYPE latency_seconds histogram'
+    assert lines[2:] == [
+        'latency_seconds_bucket{le="0.1"} 2',
+        'latency_seconds_bucket{le="1"} 3',
+        'latency_seconds_bucket{le="+Inf"} 4',
+        'latency_seconds_sum 3.65',
+        'latency_seconds_count 4',
+    ]
+
+
+def test_requests_are_recorded_under_the_route_template():
+    app = Flask(__name__)
+    metrics = AppMetrics(app)
+
+    @app.route('/items/<int:item_id>')
+    def item(item_id):
+        return {'id': item_id}
+
+    client = app.test_client()
+    client.get('/items/1')
+    client.get('/items/2')
+    client.get('/missing')
+    response = client.get('/metrics')
+
+    assert response.headers['Content-Type'] == CONTENT_TYPE
+    scrape = response.get_data(as_text=True)
+    assert 'energy_http_requests_total{method="GET",endpoint="/items/<int:item_id>",status="200"} 2' in scrape
+    assert 'energy_http_requests_total{method="GET",endpoint="unmatched",status="404"} 1' in scrape
+    assert ('energy_http_request_duration_seconds_count'
+            '{method="GET",endpoint="/items/<int:item_id>"} 2') in scrape
+    assert 'process_resident_memory_bytes ' in scrape
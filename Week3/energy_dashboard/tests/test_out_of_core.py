@@ -0,0 +1,12 @@
+from out_of_core import train_out_of_core
+
+
+def test_max_depth_none_grows_full_trees(energy_csv):
+    options = dict(chunk_rows=1000, sample_rows=800, eval_rows=300, rounds=2,
+                   track_memory=False, n_estimators=4, random_state=0)
+    default = train_out_of_core(energy_csv, **options)
+    unlimited = train_out_of_core(energy_csv, max_depth=None, **options)
+
+    assert default['model'].max_depth == 15
+    assert unlimited['model'].max_depth is None
+    assert max(est.get_depth() for est in unlimited['model'].estimators_) > 15
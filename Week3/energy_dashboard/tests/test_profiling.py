@@ -0,0 +1,29 @@
+import time
+
+from flask import Flask, jsonify
+
+from batching import MicroBatcher
+from profiling import Profiler
+
+
+def slow_predict(X):
+    deadline = time.perf_counter() + 0.1
+    while time.perf_counter() < deadline:
+        pass
+    return X.sum(axis=1)
+
+
+def test_request_profile_samples_the_batcher_thread():
+    app = Flask(__name__)
+    profiler = Profiler(app, enabled=True, sample_interval_ms=1.0)
+    batcher = MicroBatcher(slow_predict)
+
+    @app.route('/predict')
+    def predict():
+        return jsonify(batcher.predict([1.0, 2.0]))
+
+    response = app.test_client().get('/predict', headers={'X-Profile': '1'})
+    profile = profiler._profiles[int(response.headers['X-Profile-Id'])]
+
+    assert response.get_json() == 3.0
+    assert any('slow_predict' in stack for stack in profile.cpu)
@@ -0,0 +1,51 @@
+import pytest
+from flask import Flask
+
+from readiness import Readiness
+
+
+def make_app():
+    app = Flask(__name__)
+    readiness = Readiness(['data', 'model'], app, retry_after=7)
+
+    @app.route('/data')
+    @readiness.require('data')
+    def data():
+        return {'ok': True}
+
+    return app.test_client(), readiness
+
+
+def test_views_answer_503_with_retry_after_until_their_stage_is_done():
+    client, readiness = make_app()
+
+    response = client.get('/data')
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '7'
+    assert response.get_json() == {'error': 'Still starting up: waiting for data', 'ready': False}
+
+    readiness.tracks('data')(lambda: None)()
+    assert client.get('/data').status_code == 200
+    # The model is still pending, so the app as a whole is not ready
+    ready = client.get('/readyz')
+    assert ready.status_code == 503 and ready.headers['Retry-After'] == '7'
+    assert ready.get_json()['stages']['data']['status'] == 'done'
+
+    readiness.tracks('model')(lambda: None)()
+    assert client.get('/readyz').status_code == 200
+    assert client.get('/healthz').status_code == 200
+
+
+def test_failed_stage_is_not_retried_by_clients():
+    client, readiness = make_app()
+
+    def broken():
+        raise RuntimeError('no dataset')
+
+    with pytest.raises(RuntimeError):
+        readiness.tracks('data')(broken)()
+
+    ready = client.get('/readyz')
+    assert ready.status_code == 503 and 'Retry-After' not in ready.headers
+    assert ready.get_json()['stages']['data']['error'] == 'no dataset'
+    assert client.get('/healthz').status_code == 503
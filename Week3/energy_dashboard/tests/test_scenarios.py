@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from scenarios import ScenarioSweeper, parse_axis
+
+
+def test_integer_axes_take_whole_values():
+    axes = ScenarioSweeper().parse({'hour': '0:23:10', 'lights': '0:70:4', 'T_out': '0:1:3'},
+                                   ['hour', 'lights', 'T_out'])
+
+    assert axes['hour'].tolist() == [0, 3, 5, 8, 10, 13, 15, 18, 20, 23]
+    assert axes['lights'].tolist() == [0, 23, 47, 70]
+    assert axes['T_out'].tolist() == [0, 0.5, 1]
+
+
+def test_integer_axis_ranges_drop_duplicates_and_reject_fractions():
+    assert parse_axis('0:2:5', integer=True).tolist() == [0, 1, 2]
+    assert parse_axis('10,20', integer=True).tolist() == [10, 20]
+    with pytest.raises(ValueError):
+        parse_axis('2.5,3', integer=True)
+    assert np.allclose(parse_axis('2.5,3'), [2.5, 3])
+
+
+@pytest.mark.parametrize('args', [
+    {'hour': '0:23:20000000'},
+    {'T_out': '0:20:400', 'hour': '0:23:400'},
+    {'T_out': 'nan:inf:3'},
+    {'T_out': '1,inf'},
+])
+def test_oversized_and_non_finite_axes_are_rejected(args):
+    with pytest.raises(ValueError):
+        ScenarioSweeper(max_points=100000).parse(args, ['hour', 'T_out'])
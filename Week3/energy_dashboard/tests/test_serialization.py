@@ -0,0 +1,21 @@
+import sys
+
+from flask import Flask
+
+import serialization
+
+
+def test_unusable_pyarrow_falls_back_to_json(monkeypatch):
+    # Installed but failing to import, as with a wheel built against a newer NumPy
+    monkeypatch.setattr(serialization, 'pa', None)
+    monkeypatch.setattr(serialization, '_arrow_installed', True)
+    monkeypatch.setitem(sys.modules, 'pyarrow', None)
+
+    app = Flask(__name__)
+    with app.test_request_context(headers={'Accept': serialization.ARROW_MIMETYPE}):
+        response = serialization.columnar_response({'hours': [0, 1], 'appliances': [50.0, 60.0]})
+
+    assert response.status_code == 200
+    assert response.mimetype == serialization.JSON_MIMETYPE
+    assert response.get_json() == {'hours': [0, 1], 'appliances': [50.0, 60.0]}
+    assert not serialization.arrow_available()
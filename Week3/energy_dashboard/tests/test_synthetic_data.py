@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from synthetic_data import NON_NEGATIVE_COLUMNS, SCHEMA, SyntheticEnergyGenerator, ar1_filter
+
+
+def test_ar1_filter_matches_the_recursion():
+    rng = np.random.default_rng(0)
+    shocks = rng.normal(size=(101, 3))
+    phi = np.array([0.0, 0.5, 0.999])
+    state = rng.normal(size=3)
+
+    expected = np.empty_like(shocks)
+    previous = state
+    for t, shock in enumerate(shocks):
+        previous = expected[t] = phi * previous + shock
+
+    np.testing.assert_allclose(ar1_filter(shocks, phi, state), expected, atol=1e-12)
+
+
+def test_generated_chunks_keep_the_schema(energy_frame):
+    generator = SyntheticEnergyGenerator(energy_frame)
+    chunks = list(generator.generate_house(0, '2016-01-11 17:00', 250, chunk_rows=100))
+
+    assert [len(chunk) for chunk in chunks] == [100, 100, 50]
+    assert all(list(chunk.columns) == SCHEMA for chunk in chunks)
+
+
+def test_physical_columns_stay_non_negative_and_dates_unique(energy_frame, tmp_path):
+    frame = energy_frame.copy()
+    # Near-zero readings would put the fitted lower bounds below zero
+    frame.loc[::50, ['Windspeed', 'Visibility']] = 0.0
+    generator = SyntheticEnergyGenerator(frame)
+    path = tmp_path / 'synthetic.csv'
+    generator.write(path, houses=3, periods=500, chunk_rows=200)
+
+    written = pd.read_csv(path)
+    assert len(written) == 1500
+    assert written['date'].is_unique
+    for col in NON_NEGATIVE_COLUMNS:
+        assert (written[col] >= 0).all(), col
@@ -4,11 +4,9 @@ Utility functions for the Energy Dashboard
 
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
 import logging
+from config import INTERVAL_CONFIG, OUT_OF_CORE_CONFIG
+from intervals import ForestIntervals
 
 logger = logging.getLogger(__name__)
 
@@ -87,32 +85,58 @@ class EnergyPredictionModel:
         self.model = None
         self.scaler = None
         self.feature_columns = None
+        self.feature_means = None
         self.metrics = {}
+        self.holdout = None
+        self.intervals = None
+        self._permutation_importance = None
     
-    def prepare_features(self):
-        """Prepare features for model training"""
+    def prepare_features(self, order=None):
+        """Prepare features for model training.
+        
+        Returns one C-ordered float32 matrix, filled a column at a time and
+        imputed in place, so no full-size float64 intermediate is created.
+        `order` optionally permutes the rows while they are copied in.
+        """
         self.feature_columns = [col for col in self.data.columns 
                                if col not in ['date', 'Appliances', 'date_only']]
         
-        X = self.data[self.feature_columns].fillna(self.data[self.feature_columns].mean())
-        y = self.data['Appliances']
+        rows = np.arange(len(self.data)) if order is None else np.asarray(order)
+        X = np.empty((len(rows), len(self.feature_columns)), dtype=np.float32)
+        means = []
+        for j, col in enumerate(self.feature_columns):
+            values = self.data[col].to_numpy()
+            means.append(float(np.nanmean(values)))
+            column = X[:, j]
+            column[:] = values[rows]
+            column[np.isnan(column)] = means[-1]
+        self.feature_means = pd.Series(means, index=self.feature_columns)
+        y = self.data['Appliances'].to_numpy(dtype=np.float64)[rows]
         
         return X, y
     
     def train(self):
         """Train the prediction model"""
+        # Imported here so importing utils does not pay for scikit-learn
+        from sklearn.preprocessing import StandardScaler
+        from sklearn.model_selection import train_test_split
+        from sklearn.ensemble import RandomForestRegressor
+        from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
+        
         try:
-            X, y = self.prepare_features()
-            
-            # Split data
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=0.2, random_state=42
+            # Split index arrays, then build the matrix with training rows first
+            # so both splits are views of it
+            train_idx, test_idx = train_test_split(
+                np.arange(len(self.data)), test_size=0.2, random_state=42
             )
+            X, y = self.prepare_features(np.concatenate([train_idx, test_idx]))
+            X_train_scaled, X_test_scaled = X[:len(train_idx)], X[len(train_idx):]
+            y_train, y_test = y[:len(train_idx)], y[len(train_idx):]
             
-            # Scale features
+            # Scale features in place
             self.scaler = StandardScaler()
-            X_train_scaled = self.scaler.fit_transform(X_train)
-            X_test_scaled = self.scaler.transform(X_test)
+            self.scaler.fit(X_train_scaled)
+            self.scaler.transform(X, copy=False)
             
             # Train model
             self.model = RandomForestRegressor(
@@ -122,6 +146,10 @@ class EnergyPredictionModel:
                 n_jobs=-1
             )
             self.model.fit(X_train_scaled, y_train)
+            # Copied so the held-out split does not keep the whole matrix alive
+            self.holdout = (X_test_scaled.copy(), y_test.copy())
+            self.intervals = ForestIntervals(self.model, X_train_scaled, y_train, **INTERVAL_CONFIG)
+            self._permutation_importance = None
             
             # Calculate metrics
             train_pred = self.model.predict(X_train_scaled)
@@ -143,25 +171,62 @@ class EnergyPredictionModel:
             logger.error(f"Error training model: {str(e)}")
             raise
     
+    def train_out_of_core(self, csv_path, **kwargs):
+        """Train from a CSV streamed in chunks instead of self.data (see out_of_core.py).
+
+        Keyword arguments override OUT_OF_CORE_CONFIG. Returns the metrics,
+        with the memory high-water marks under 'memory'.
+        """
+        from out_of_core import train_out_of_core
+        
+        try:
+            result = train_out_of_core(csv_path, **dict(OUT_OF_CORE_CONFIG, **kwargs))
+            self.model = result['model']
+            self.scaler = result['scaler']
+            self.feature_columns = result['feature_columns']
+            self.feature_means = result['feature_means']
+            self.holdout = result['holdout']
+            self.intervals = result['intervals']
+            self._permutation_importance = None
+            self.metrics = dict(result['metrics'], memory=result['memory'])
+            
+            logger.info(f"Model trained out of core on {self.metrics['rows']} rows. "
+                        f"Test R²: {self.metrics['test_r2']:.4f}")
+            return self.metrics
+        
+        except Exception as e:
+            logger.error(f"Error training model out of core: {str(e)}")
+            raise
+    
+    def feature_vector(self, features_dict):
+        """Feature row for a prediction, using training means for missing features"""
+        return [
+            float(features_dict[col]) if col in features_dict else self.feature_means[col]
+            for col in self.feature_columns
+        ]
+    
+    def predict_batch(self, X):
+        """Vectorized predictions for a 2-D array of feature rows"""
+        if self.model is None:
+            raise ValueError("Model not trained")
+        
+        return np.maximum(self.model.predict(self.scaler.transform(X)), 0)
+    
+    def predict_interval(self, X):
+        """(prediction, lower, upper) arrays for a 2-D array of feature rows"""
+        if self.model is None:
+            raise ValueError("Model not trained")
+        
+        return tuple(np.maximum(values, 0) for values in self.intervals.predict(self.scaler.transform(X)))
+    
     def predict(self, features_dict):
         """Make prediction for given features"""
         if self.model is None:
             raise ValueError("Model not trained")
         
         try:
-            # Prepare input
-            input_data = []
-            for col in self.feature_columns:
-                if col in features_dict:
-                    input_data.append(float(features_dict[col]))
-                else:
-                    input_data.append(self.data[col].mean())
-            
-            # Scale and predict
-            input_scaled = self.scaler.transform([input_data])
-            prediction = self.model.predict(input_scaled)[0]
-            
-            return max(0, prediction)
+            input_data = self.feature_vector(features_dict)
+            return self.predict_batch([input_data])[0]
         
         except Exception as e:
             logger.error(f"Error making prediction: {str(e)}")
@@ -178,6 +243,20 @@ class EnergyPredictionModel:
         }).sort_values('importance', ascending=False).head(top_n)
         
         return importance_df
+    
+    def get_permutation_importance(self, top_n=10, **kwargs):
+        """Top N features by held-out permutation importance (cached per trained model)"""
+        if self.model is None:
+            raise ValueError("Model not trained")
+        
+        from importance import permutation_importance
+        
+        if self._permutation_importance is None:
+            self._permutation_importance = permutation_importance(
+                self.model, self.holdout[0], self.holdout[1], self.feature_columns, **kwargs
+            )
+        
+        return pd.DataFrame(self._permutation_importance['features']).head(top_n)
 
 def create_visualizations(data):
     """Helper function to create visualization data"""